@@ -1,3 +1,3 @@
-from .api_key import verify_api_key
+from .api_key import verify_admin_key, verify_api_key
 
-__all__ = ["verify_api_key"]
+__all__ = ["verify_api_key", "verify_admin_key"]
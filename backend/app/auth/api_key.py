@@ -6,6 +6,7 @@ from fastapi import HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 
 from ..config import get_settings
+from ..services import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,7 @@ async def verify_api_key(
 ) -> str:
     """Verify the API key from the request header."""
     if not api_key:
+        metrics.auth_requests.labels("missing").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing API key. Provide X-API-Key header.",
@@ -24,10 +26,35 @@ async def verify_api_key(
 
     settings = get_settings()
     if not secrets.compare_digest(api_key, settings.claude_api_key):
+        metrics.auth_requests.labels("invalid").inc()
         logger.warning(f"Invalid API key attempt: {api_key[:8]}...")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API key",
         )
 
+    metrics.auth_requests.labels("ok").inc()
     return api_key
+
+
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+
+async def verify_admin_key(
+    admin_key: Annotated[str | None, Security(admin_key_header)]
+) -> str:
+    """Verify the admin key for diagnostic endpoints (disabled without ADMIN_API_KEY)."""
+    settings = get_settings()
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Admin endpoints are disabled. Set ADMIN_API_KEY to enable.",
+        )
+    if not admin_key or not secrets.compare_digest(admin_key, settings.admin_api_key):
+        metrics.auth_requests.labels("admin_denied").inc()
+        logger.warning("Rejected admin request")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key",
+        )
+    return admin_key
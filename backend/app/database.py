@@ -1,7 +1,12 @@
+import asyncio
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from typing import Any, Callable, List, Optional
 
-from .config import get_settings
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+from .config import Settings, get_settings
+from .storage import EmbeddedDatabase, open_embedded
 
 logger = logging.getLogger(__name__)
 
@@ -9,14 +14,37 @@ logger = logging.getLogger(__name__)
 class Database:
     client: AsyncIOMotorClient = None
     db: AsyncIOMotorDatabase = None
+    # True when `logs` is a MongoDB time-series collection
+    logs_timeseries: bool = False
 
 
 db = Database()
 
+# Full-text search, prompt matches rank above result matches. Compressed
+# and blob-stored values are searched through their `_terms` (distinct
+# words); `_excerpt`/`result_preview` cover documents written before those.
+TASKS_TEXT_KEYS = [
+    ("prompt", "text"),
+    ("prompt_terms", "text"),
+    ("prompt_excerpt", "text"),
+    ("result", "text"),
+    ("result_terms", "text"),
+    ("result_excerpt", "text"),
+    ("result_preview", "text"),
+]
+TASKS_TEXT_WEIGHTS = {
+    "prompt": 5, "prompt_terms": 5, "prompt_excerpt": 5,
+    "result": 1, "result_terms": 1, "result_excerpt": 1, "result_preview": 1,
+}
+
 
 async def connect_to_mongo():
-    """Connect to MongoDB on startup."""
+    """Connect to MongoDB (or open the embedded storage) on startup."""
     settings = get_settings()
+    if settings.storage_backend != "mongo":
+        await open_embedded_storage(settings)
+        return
+
     logger.info(f"Connecting to MongoDB at {settings.mongodb_url.split('@')[-1]}...")
 
     db.client = AsyncIOMotorClient(settings.mongodb_url)
@@ -25,22 +53,191 @@ async def connect_to_mongo():
     # Test connection
     await db.client.admin.command('ping')
 
-    # Create indexes for logs collection
-    await db.db.logs.create_index("agent_name")
-    await db.db.logs.create_index("task_id")
-    await db.db.logs.create_index("timestamp")
-    await db.db.logs.create_index([("agent_name", 1), ("timestamp", -1)])
+    db.logs_timeseries = await ensure_logs_collection(db.db, settings.logs_timeseries)
+
+    # Keyset pagination indexes: (filter, sort key, id tie-breaker)
+    await db.db.tasks.create_index([("created_at", -1), ("task_id", -1)])
+    await db.db.tasks.create_index([("agent_name", 1), ("created_at", -1), ("task_id", -1)])
+    await db.db.tasks.create_index([("status", 1), ("created_at", -1), ("task_id", -1)])
+
+    # Stats rollups: one document per (granularity, agent, model, bucket)
+    await db.db.task_stats.create_index(
+        [("granularity", 1), ("agent_name", 1), ("model", 1), ("bucket", 1)],
+        unique=True,
+    )
+    await db.db.task_stats.create_index([("granularity", 1), ("bucket", 1)])
+
+    # Retention purges: (policy key, age field)
+    await db.db.tasks.create_index([("status", 1), ("updated_at", 1)])
+
+    await ensure_text_index(
+        db.db.tasks,
+        TASKS_TEXT_KEYS,
+        weights=TASKS_TEXT_WEIGHTS,
+        default_language="none",
+        name="tasks_text",
+    )
 
     logger.info("Successfully connected to MongoDB")
 
 
+async def open_embedded_storage(settings: Settings) -> None:
+    """Open the in-process storage engine (STORAGE_BACKEND=memory-sqlite|memory)."""
+    db.client = None
+    db.db = await open_embedded(settings.storage_backend, settings.sqlite_path, settings.embedded_max_documents)
+    db.logs_timeseries = False
+
+    # Hash indexes serve the equality lookups; range and sort queries scan
+    # the in-memory documents
+    await db.db.tasks.create_index("task_id", unique=True)
+    await db.db.tasks.create_index("agent_name")
+    await db.db.tasks.create_index("status")
+    await db.db.logs.create_index("log_id", unique=True)
+    await db.db.logs.create_index("task_id")
+    await db.db.logs.create_index("agent_name")
+    await db.db.task_stats.create_index("agent_name")
+    await db.db.task_stats.create_index(
+        [("granularity", 1), ("agent_name", 1), ("model", 1), ("bucket", 1)],
+        unique=True,
+    )
+    await db.db.tasks.create_index(TASKS_TEXT_KEYS, weights=TASKS_TEXT_WEIGHTS, name="tasks_text")
+    await db.db.logs.create_index([("message", "text")], name="logs_text")
+
+    logger.info(f"Using embedded {settings.storage_backend} storage")
+
+
+async def ensure_text_index(collection: AsyncIOMotorCollection, keys: list, name: str, **kwargs) -> None:
+    """Create a text index, rebuilding it if one with the same name has other keys.
+
+    A collection can only have one text index, so a changed definition has to
+    replace the old one rather than sit next to it.
+    """
+    try:
+        await collection.create_index(keys, name=name, **kwargs)
+    except OperationFailure as e:
+        # 85 IndexOptionsConflict, 86 IndexKeySpecsConflict
+        if e.code not in (85, 86):
+            raise
+        logger.info(f"Rebuilding text index {collection.name}.{name}")
+        await collection.drop_index(name)
+        await collection.create_index(keys, name=name, **kwargs)
+
+
+async def supports_change_streams() -> bool:
+    """Whether the connected MongoDB is a replica set or sharded cluster."""
+    if db.client is None:
+        return False
+    try:
+        hello = await db.client.admin.command("hello")
+    except OperationFailure:
+        return False
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+
+async def is_timeseries_collection(database: AsyncIOMotorDatabase, name: str) -> bool:
+    """Check whether a collection exists and is a time-series collection."""
+    async for info in await database.list_collections(filter={"name": name}):
+        return info.get("type") == "timeseries"
+    return False
+
+
+async def create_logs_timeseries(database: AsyncIOMotorDatabase, name: str = "logs") -> None:
+    """Create a time-series logs collection: time in `timestamp`, series key in `meta`."""
+    await database.create_collection(
+        name,
+        timeseries={"timeField": "timestamp", "metaField": "meta", "granularity": "seconds"},
+    )
+    # Keyset pagination (measurement fields in secondary indexes need 6.0+)
+    await database[name].create_index([("timestamp", -1), ("log_id", -1)])
+    await database[name].create_index([("meta.agent_name", 1), ("timestamp", -1), ("log_id", -1)])
+    await database[name].create_index([("meta.task_id", 1), ("timestamp", -1), ("log_id", -1)])
+    # Retention purges
+    await database[name].create_index([("meta.level", 1), ("timestamp", 1)])
+
+
+async def ensure_logs_collection(database: AsyncIOMotorDatabase, timeseries: bool) -> bool:
+    """Create the logs collection and its indexes in the configured layout.
+
+    An existing regular `logs` collection is kept as is until it's migrated
+    (python -m app.migrations.logs_to_timeseries); the actual collection
+    type decides the layout LogService uses.
+
+    Returns:
+        True if `logs` is a time-series collection.
+    """
+    exists = bool(await database.list_collection_names(filter={"name": "logs"}))
+    if timeseries and not exists:
+        await create_logs_timeseries(database)
+    is_timeseries = await is_timeseries_collection(database, "logs")
+
+    if timeseries and not is_timeseries:
+        logger.warning(
+            "LOGS_TIMESERIES is enabled but 'logs' is a regular collection; "
+            "run 'python -m app.migrations.logs_to_timeseries' to convert it"
+        )
+
+    if is_timeseries:
+        return True
+
+    # Create indexes for logs collection
+    await database.logs.create_index("agent_name")
+    await database.logs.create_index("task_id")
+    await database.logs.create_index("timestamp")
+    await database.logs.create_index([("agent_name", 1), ("timestamp", -1)])
+
+    # Keyset pagination indexes: (filter, sort key, id tie-breaker)
+    await database.logs.create_index([("timestamp", -1), ("log_id", -1)])
+    await database.logs.create_index([("agent_name", 1), ("timestamp", -1), ("log_id", -1)])
+    await database.logs.create_index([("task_id", 1), ("timestamp", -1), ("log_id", -1)])
+
+    # Retention purges: (policy key, age field)
+    await database.logs.create_index([("level", 1), ("timestamp", 1)])
+
+    # Full-text search (not available on time-series collections)
+    await database.logs.create_index(
+        [("message", "text")], default_language="none", name="logs_text"
+    )
+    return False
+
+
 async def close_mongo_connection():
-    """Close MongoDB connection on shutdown."""
+    """Close MongoDB connection (or flush the embedded storage) on shutdown."""
     if db.client:
         db.client.close()
         logger.info("MongoDB connection closed")
+    elif isinstance(db.db, EmbeddedDatabase):
+        db.db.close()
 
 
 def get_database() -> AsyncIOMotorDatabase:
     """Get database instance for dependency injection."""
     return db.db
+
+
+async def delete_in_batches(
+    collection: AsyncIOMotorCollection,
+    query: dict,
+    batch_size: int = 1000,
+    pause_sec: float = 0.0,
+    on_deleted: Optional[Callable[[List[Any]], None]] = None,
+) -> int:
+    """Delete matching documents in small batches.
+
+    Each batch is a short delete by _id, so a large purge never holds
+    locks or saturates the server for long. `on_deleted` gets the _ids
+    of each batch once it's deleted.
+    """
+    deleted = 0
+    while True:
+        ids = [doc["_id"] async for doc in collection.find(query, {"_id": 1}).limit(batch_size)]
+        if not ids:
+            break
+        result = await collection.delete_many({"_id": {"$in": ids}})
+        deleted += result.deleted_count
+        if on_deleted:
+            on_deleted(ids)
+        if len(ids) < batch_size:
+            break
+        if pause_sec:
+            await asyncio.sleep(pause_sec)
+    return deleted
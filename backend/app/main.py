@@ -3,10 +3,19 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from .config import get_settings
-from .database import connect_to_mongo, close_mongo_connection
-from .routes import tasks, agents, health, logs
+from .database import connect_to_mongo, close_mongo_connection, get_database, supports_change_streams
+from .middleware import CaptureMiddleware, ZstdMiddleware
+from .routes import tasks, agents, health, logs, stats, retention, search, export, metrics, admin
+from .services.file_logger import agent_file_logger
+from .services.log_pipeline import log_pipeline
+from .services.profiler import loop_monitor
+from .services.retention_service import retention_service
+from .services.task_cache import task_cache
+from .services.tracing import task_tracer
+from .services.traffic_capture import traffic_capture
 
 # Configure logging
 logging.basicConfig(
@@ -21,7 +30,28 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Manage application lifecycle - connect/disconnect MongoDB."""
     await connect_to_mongo()
+    watch = settings.task_cache_watch
+    if watch is None:
+        watch = await supports_change_streams()
+    task_cache.start(
+        settings.task_cache_size,
+        settings.task_cache_ttl_sec,
+        get_database().tasks if watch and settings.storage_backend == "mongo" else None,
+    )
+    if settings.capture_file:
+        traffic_capture.start(settings.capture_file, settings.capture_max_body, settings.capture_keep_prompts)
+    task_tracer.start(settings.tracing_exporter, settings.tracing_otlp_endpoint, settings.tracing_file)
+    log_pipeline.start(get_database())
+    retention_service.start(get_database())
+    loop_monitor.start(settings.slow_callback_threshold_ms)
     yield
+    await loop_monitor.stop()
+    await retention_service.stop()
+    await log_pipeline.stop()
+    agent_file_logger.stop()
+    traffic_capture.stop()
+    task_tracer.stop()
+    await task_cache.stop()
     await close_mongo_connection()
 
 
@@ -42,11 +72,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression: zstd when the client accepts it, gzip otherwise
+app.add_middleware(ZstdMiddleware, minimum_size=settings.response_compression_min_size)
+app.add_middleware(GZipMiddleware, minimum_size=settings.response_compression_min_size)
+
+# Outermost, so recorded durations cover the whole stack
+app.add_middleware(CaptureMiddleware)
+
 # Include routers
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(tasks.router, prefix="/api")
 app.include_router(agents.router, prefix="/api")
 app.include_router(logs.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+app.include_router(retention.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(export.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .services.traffic_capture import CAPTURED_HEADERS, traffic_capture
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Never buffer live streams
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+class ZstdMiddleware:
+    """zstd-encode responses for clients that send `Accept-Encoding: zstd`.
+
+    Only single-body responses of at least `minimum_size` bytes are encoded;
+    streaming and partial (206) responses pass through untouched. A no-op without the optional
+    zstandard package. Put it inside GZipMiddleware: gzip skips responses that
+    already have a Content-Encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or zstandard is None
+            or "zstd" not in Headers(scope=scope).get("accept-encoding", "")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start: dict = {}
+
+        async def send_encoded(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Hold the headers until we know whether the body gets encoded
+                start.update(message)
+                return
+            if message["type"] != "http.response.body" or not start:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            passthrough = (
+                message.get("more_body", False)
+                or start["status"] == 206
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+            )
+            if not passthrough:
+                body = zstandard.ZstdCompressor(level=self.level).compress(body)
+                headers["Content-Encoding"] = "zstd"
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+
+            await send(start.copy())
+            start.clear()
+            await send(message)
+
+        await self.app(scope, receive, send_encoded)
+
+
+class CaptureMiddleware:
+    """Record /api requests with timing for loadtest.replay.
+
+    Collects method, path, query, a whitelist of headers, the request body
+    (cut at the capture limit), response status, size and duration, and the
+    JSON body of POST responses. traffic_capture sanitizes each record on
+    its writer thread before anything reaches disk: prompts and search
+    queries are hashed, and only task_id is kept from responses. No-op
+    while traffic_capture isn't started.
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not traffic_capture.enabled
+            or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limit = traffic_capture.max_body
+        request_body = bytearray()
+        response_body = bytearray()
+        response = {"status": None, "bytes": 0, "type": ""}
+        started_wall = time.time()
+        started = time.perf_counter()
+
+        async def receive_captured() -> Message:
+            message = await receive()
+            if message["type"] == "http.request" and len(request_body) <= limit:
+                request_body.extend(message.get("body", b"")[: limit + 1 - len(request_body)])
+            return message
+
+        async def send_captured(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["type"] = Headers(raw=message["headers"]).get("content-type", "")
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                response["bytes"] += len(body)
+                if scope["method"] == "POST" and len(response_body) <= limit:
+                    response_body.extend(body[: limit + 1 - len(response_body)])
+            await send(message)
+
+        try:
+            await self.app(scope, receive_captured, send_captured)
+        finally:
+            headers = Headers(scope=scope)
+            entry = {
+                "ts": started_wall,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "headers": {k: v for k, v in headers.items() if k in CAPTURED_HEADERS},
+                "body": request_body[:limit].decode("utf-8", errors="replace"),
+                "body_truncated": len(request_body) > limit,
+                "status": response["status"],
+                "response_bytes": response["bytes"],
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            if response_body and response["type"].startswith("application/json") and len(response_body) <= limit:
+                entry["response_body"] = response_body.decode("utf-8", errors="replace")
+            traffic_capture.record(entry)
@@ -0,0 +1,87 @@
+"""Convert the regular `logs` collection into a time-series collection.
+
+Stop the API first, then run from backend/:
+
+    python -m app.migrations.logs_to_timeseries [--batch-size 5000] [--drop-legacy]
+
+The old collection is renamed to `logs_legacy`, a time-series `logs` is
+created and every entry is copied over in batches. Start the API again with
+LOGS_TIMESERIES=true. If the copy fails midway, drop `logs` and rename
+`logs_legacy` back to `logs` before retrying.
+"""
+import argparse
+import asyncio
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..database import create_logs_timeseries, is_timeseries_collection
+from ..models.log import LogDocument
+
+logger = logging.getLogger(__name__)
+
+LEGACY_COLLECTION = "logs_legacy"
+
+
+async def migrate(database: AsyncIOMotorDatabase, batch_size: int = 5000, drop_legacy: bool = False) -> int:
+    """Run the migration and return the number of copied log entries."""
+    if await is_timeseries_collection(database, "logs"):
+        logger.info("'logs' is already a time-series collection, nothing to do")
+        return 0
+
+    names = await database.list_collection_names()
+    if LEGACY_COLLECTION in names:
+        raise RuntimeError(
+            f"'{LEGACY_COLLECTION}' already exists; restore or drop it before migrating"
+        )
+    if "logs" in names:
+        await database.logs.rename(LEGACY_COLLECTION)
+    await create_logs_timeseries(database)
+
+    legacy = database[LEGACY_COLLECTION]
+    total = await legacy.estimated_document_count()
+    copied = 0
+    last_id = None
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        docs = await legacy.find(query).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        batch = []
+        for doc in docs:
+            doc.pop("_id")
+            batch.append(LogDocument.from_mongo(doc).to_timeseries())
+        await database.logs.insert_many(batch, ordered=False)
+
+        copied += len(batch)
+        logger.info(f"Copied {copied}/{total} log entries")
+
+    if drop_legacy:
+        await legacy.drop()
+        logger.info(f"Dropped '{LEGACY_COLLECTION}'")
+
+    logger.info(f"Migration finished: {copied} log entries in time-series 'logs'")
+    return copied
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert 'logs' to a time-series collection")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop 'logs_legacy' after copying")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    try:
+        await migrate(client[settings.mongodb_database], args.batch_size, args.drop_legacy)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    asyncio.run(main())
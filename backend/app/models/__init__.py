@@ -1,3 +1,3 @@
-from .task import TaskStatus, TaskDocument
+from .task import TaskStatus, TaskDocument, TERMINAL_STATUSES, ALLOWED_TRANSITIONS, COMPRESSIBLE_FIELDS, RESULT_PREVIEW_CHARS
 
-__all__ = ["TaskStatus", "TaskDocument"]
+__all__ = ["TaskStatus", "TaskDocument", "TERMINAL_STATUSES", "ALLOWED_TRANSITIONS", "COMPRESSIBLE_FIELDS", "RESULT_PREVIEW_CHARS"]
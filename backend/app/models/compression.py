@@ -0,0 +1,110 @@
+import gzip
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+from bson.binary import Binary
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# User-defined BSON binary subtypes mark the codec of a compressed string
+ZSTD_SUBTYPE = 0x80
+GZIP_SUBTYPE = 0x81
+
+# Search-only field next to a compressed searchable field (`<field>_terms`):
+# its distinct words, so the text index covers the whole value. Words past
+# this many characters of terms aren't indexed.
+TERMS_MAX_CHARS = 50_000
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@lru_cache()
+def resolve_method(method: str) -> str:
+    """Fall back to gzip when zstd is requested but zstandard isn't installed."""
+    if method == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed, compressing task fields with gzip")
+        return "gzip"
+    return method
+
+
+def compress_text(value: str, threshold: int, method: str) -> Any:
+    """Compress a string into a tagged Binary if it's at least `threshold` bytes.
+
+    Returns the original string when below the threshold, when compression is
+    off or when it wouldn't save space.
+    """
+    if method == "none":
+        return value
+    raw = value.encode("utf-8")
+    if len(raw) < threshold:
+        return value
+    if method == "zstd":
+        packed = Binary(zstandard.ZstdCompressor().compress(raw), ZSTD_SUBTYPE)
+    else:
+        packed = Binary(gzip.compress(raw, compresslevel=6), GZIP_SUBTYPE)
+    return packed if len(packed) < len(raw) else value
+
+
+def decompress_text(value: Any) -> Any:
+    """Inverse of compress_text; anything not compressed is returned as is."""
+    if not isinstance(value, Binary):
+        return value
+    if value.subtype == ZSTD_SUBTYPE:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed task fields")
+        return zstandard.ZstdDecompressor().decompress(bytes(value)).decode("utf-8")
+    if value.subtype == GZIP_SUBTYPE:
+        return gzip.decompress(bytes(value)).decode("utf-8")
+    return value
+
+
+def search_terms(value: str) -> str:
+    """Distinct lowercase words of `value` in first-seen order, space-separated.
+
+    Matches word for word what a text index finds in the value itself (not
+    phrases). Cut at a word boundary to TERMS_MAX_CHARS.
+    """
+    terms = " ".join(dict.fromkeys(word.lower() for word in WORD_RE.findall(value)))
+    if len(terms) > TERMS_MAX_CHARS:
+        terms = terms[:TERMS_MAX_CHARS + 1].rsplit(" ", 1)[0]
+    return terms
+
+
+def compress_fields(doc: dict, fields: Iterable[str], threshold: Optional[int], method: str,
+                    searchable: Iterable[str] = ()) -> dict:
+    """Compress large string fields of a document in place.
+
+    Compressed `searchable` fields get a plain `<field>_terms` for the text
+    index, and the document is flagged with `compressed: True`.
+    """
+    if threshold is None:
+        return doc
+    for field in fields:
+        value = doc.get(field)
+        if not isinstance(value, str):
+            continue
+        packed = compress_text(value, threshold, method)
+        if packed is not value:
+            doc[field] = packed
+            if field in searchable:
+                doc[f"{field}_terms"] = search_terms(value)
+            doc["compressed"] = True
+    return doc
+
+
+def decompress_fields(doc: dict, fields: Iterable[str]) -> dict:
+    """Restore compressed fields in place and drop their search-only copies."""
+    for field in fields:
+        if field in doc:
+            doc[field] = decompress_text(doc[field])
+        doc.pop(f"{field}_terms", None)
+        # Written before `_terms` replaced them
+        doc.pop(f"{field}_excerpt", None)
+    return doc
@@ -13,6 +13,10 @@ class LogLevel(str, Enum):
     ERROR = "error"
 
 
+# Fields stored in the time-series metaField; they identify the series
+TIMESERIES_META_FIELDS = ("agent_name", "task_id", "level")
+
+
 class LogDocument(BaseModel):
     """MongoDB document model for logs."""
 
@@ -31,9 +35,18 @@ class LogDocument(BaseModel):
         """Convert to MongoDB document."""
         return self.model_dump()
 
+    def to_timeseries(self) -> dict:
+        """Convert to a time-series measurement; series fields go under `meta`."""
+        doc = self.model_dump()
+        doc["meta"] = {key: doc.pop(key) for key in TIMESERIES_META_FIELDS}
+        return doc
+
     @classmethod
     def from_mongo(cls, doc: dict) -> Optional["LogDocument"]:
-        """Create from MongoDB document."""
+        """Create from MongoDB document (regular or time-series layout)."""
         if doc is None:
             return None
+        if "meta" in doc:
+            doc = {**doc, **doc["meta"]}
+            del doc["meta"]
         return cls(**doc)
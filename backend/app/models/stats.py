@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import List
+
+
+class StatsGranularity(str, Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+
+
+BUCKET_SIZES = {
+    StatsGranularity.MINUTE: timedelta(minutes=1),
+    StatsGranularity.HOUR: timedelta(hours=1),
+}
+
+# Upper bounds (seconds) of the duration histogram; one extra overflow bin follows
+DURATION_BUCKETS: List[float] = [1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1800, 3600]
+
+# Model label for tasks submitted without an explicit --model
+DEFAULT_MODEL = "default"
+
+
+def bucket_start(moment: datetime, granularity: StatsGranularity) -> datetime:
+    """Truncate a timestamp to the start of its rollup bucket (UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc).replace(second=0, microsecond=0)
+    if granularity == StatsGranularity.HOUR:
+        moment = moment.replace(minute=0)
+    return moment
+
+
+def duration_bucket(duration_sec: float) -> int:
+    """Index of the histogram bin a duration falls into."""
+    for index, upper in enumerate(DURATION_BUCKETS):
+        if duration_sec <= upper:
+            return index
+    return len(DURATION_BUCKETS)
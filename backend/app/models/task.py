@@ -1,10 +1,12 @@
 import uuid
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, FrozenSet, Tuple
 
 from pydantic import BaseModel, Field
 
+from .compression import compress_fields, decompress_fields
+
 
 class TaskStatus(str, Enum):
     PENDING = "pending"
@@ -15,6 +17,44 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+TERMINAL_STATUSES: FrozenSet[TaskStatus] = frozenset({
+    TaskStatus.COMPLETED,
+    TaskStatus.FAILED,
+    TaskStatus.TIMEOUT,
+    TaskStatus.CANCELLED,
+})
+
+# Allowed transitions: target status -> statuses it may be entered from.
+# Terminal statuses are final, so a late COMPLETED can't overwrite CANCELLED.
+ALLOWED_TRANSITIONS: Dict[TaskStatus, FrozenSet[TaskStatus]] = {
+    TaskStatus.RUNNING: frozenset({TaskStatus.PENDING}),
+    TaskStatus.COMPLETED: frozenset({TaskStatus.RUNNING}),
+    TaskStatus.FAILED: frozenset({TaskStatus.PENDING, TaskStatus.RUNNING}),
+    TaskStatus.TIMEOUT: frozenset({TaskStatus.RUNNING}),
+    TaskStatus.CANCELLED: frozenset({TaskStatus.PENDING, TaskStatus.RUNNING}),
+}
+
+# Characters of an out-of-document result kept inline
+RESULT_PREVIEW_CHARS = 4000
+
+# Execution stages recorded in TaskDocument.timings, in order
+TASK_STAGES: Tuple[str, ...] = (
+    "accepted",          # task stored, POST /api/run answered
+    "queued",            # background execution started
+    "dequeued",          # got an execution slot
+    "claude_md_loaded",  # agent CLAUDE.md read as system prompt
+    "spawned",           # CLI process started
+    "first_output",      # first stdout bytes
+    "exited",            # process exited
+    "persisted",         # final status write issued
+)
+
+# Free-text fields that may be stored compressed (see models/compression.py)
+COMPRESSIBLE_FIELDS: Tuple[str, ...] = ("prompt", "result", "error")
+# Text-indexed ones; stored compressed or in a blob they're indexed through `<field>_terms`
+SEARCHABLE_FIELDS: Tuple[str, ...] = ("prompt", "result")
+
+
 class TaskDocument(BaseModel):
     """MongoDB document model for tasks."""
     task_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -22,6 +62,10 @@ class TaskDocument(BaseModel):
     prompt: str
     status: TaskStatus = TaskStatus.PENDING
     result: Optional[str] = None
+    # Large results live in the blob store: result is None, these describe it
+    result_ref: Optional[str] = None
+    result_size: Optional[int] = None
+    result_preview: Optional[str] = None
     error: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     started_at: Optional[datetime] = None
@@ -29,17 +73,27 @@ class TaskDocument(BaseModel):
     duration_sec: Optional[float] = None
     timeout_seconds: int = 120
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    # Stage -> ms since created_at (see TASK_STAGES); set with the final status
+    timings: Dict[str, int] = Field(default_factory=dict)
+    # True once any of COMPRESSIBLE_FIELDS is stored compressed
+    compressed: bool = False
 
     class Config:
         use_enum_values = True
 
-    def to_mongo(self) -> dict:
-        """Convert to MongoDB document."""
-        return self.model_dump()
+    def to_mongo(self, compress_threshold: Optional[int] = None, compression: str = "gzip") -> dict:
+        """Convert to MongoDB document.
+
+        With a threshold, prompt/result/error of at least that many bytes are
+        stored compressed.
+        """
+        return compress_fields(
+            self.model_dump(), COMPRESSIBLE_FIELDS, compress_threshold, compression, SEARCHABLE_FIELDS
+        )
 
     @classmethod
     def from_mongo(cls, doc: dict) -> "TaskDocument":
-        """Create from MongoDB document."""
+        """Create from MongoDB document, decompressing fields if needed."""
         if doc is None:
             return None
-        return cls(**doc)
+        return cls(**decompress_fields(dict(doc), COMPRESSIBLE_FIELDS))
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any
+
+
+def normalize(value: Any) -> Any:
+    """Store values the way MongoDB hands them back.
+
+    Datetimes become naive UTC with millisecond precision, enums their
+    value, tuples lists; containers are copied, so stored documents never
+    alias the caller's objects.
+    """
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, Enum):
+        return value.value
+    return value
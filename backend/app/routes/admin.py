@@ -0,0 +1,46 @@
+import asyncio
+import threading
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from ..auth import verify_admin_key
+from ..config import get_settings
+from ..services.profiler import format_collapsed, sample_stacks
+
+router = APIRouter(tags=["admin"])
+
+# One profile at a time: concurrent samplers would mostly measure each other
+_profile_lock = asyncio.Lock()
+
+
+@router.get("/admin/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    threads: Literal["loop", "all"] = "loop",
+    _: str = Depends(verify_admin_key),
+) -> PlainTextResponse:
+    """Sample stacks for N seconds and return them in collapsed format.
+
+    Feed the output to flamegraph.pl or drop it into speedscope. By default
+    only the event loop thread is sampled, which is what request latency
+    depends on; threads=all adds the worker and daemon threads.
+    """
+    settings = get_settings()
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(
+            status_code=400, detail=f"seconds must be <= {settings.profile_max_seconds}"
+        )
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with _profile_lock:
+        thread_ids = {threading.get_ident()} if threads == "loop" else None
+        counts = await asyncio.to_thread(sample_stacks, seconds, interval_ms / 1000, thread_ids)
+
+    return PlainTextResponse(
+        format_collapsed(counts),
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+    )
@@ -0,0 +1,69 @@
+import hashlib
+from typing import Any, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from cheap version markers (ids, timestamps)."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    # Weak comparison: W/ prefixes are ignored on both sides
+    target = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == target
+        for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=` Range header into an inclusive (start, end).
+
+    Returns None when the whole body should be sent (no header, another
+    unit, multiple ranges or a malformed header). Raises ValueError if the
+    range can't be satisfied for a body of `size` bytes.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+
+    if start is None:
+        # Suffix range: the last N bytes
+        if not end:
+            raise ValueError(f"Range not satisfiable: {header}")
+        start, end = max(size - end, 0), size - 1
+    elif end is None:
+        end = size - 1
+
+    if start < 0 or start >= size or end < start:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, min(end, size - 1)
@@ -0,0 +1,85 @@
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel
+
+from ..auth import verify_api_key
+from ..database import get_database
+from ..models.log import LogLevel
+from ..models.task import TaskStatus
+from ..services.log_service import LogService
+from ..services.task_service import TaskService
+
+router = APIRouter(tags=["export"])
+
+# Lines are sent in chunks of this many bytes, not one write per row
+CHUNK_BYTES = 64 * 1024
+
+
+async def _ndjson(
+    rows: AsyncIterator[BaseModel], compress: bool
+) -> AsyncIterator[bytes]:
+    """Serialize rows as NDJSON chunks, optionally gzip-compressed on the fly."""
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = bytearray()
+    async for row in rows:
+        buffer += row.model_dump_json().encode("utf-8")
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_BYTES:
+            chunk = gzip.compress(bytes(buffer)) if gzip else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+    tail = gzip.compress(bytes(buffer)) + gzip.flush() if gzip else bytes(buffer)
+    if tail:
+        yield tail
+
+
+def _export_response(name: str, rows: AsyncIterator[BaseModel], compress: bool) -> StreamingResponse:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    filename = f"{name}-{stamp}.ndjson" + (".gz" if compress else "")
+    return StreamingResponse(
+        _ndjson(rows, compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export/tasks")
+async def export_tasks(
+    agent_name: Optional[str] = None,
+    status: Optional[TaskStatus] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    compress: bool = False,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    _: str = Depends(verify_api_key),
+) -> StreamingResponse:
+    """Stream all matching tasks as NDJSON, oldest first.
+
+    Rows come straight from a MongoDB cursor, so memory stays flat no
+    matter how many tasks match. `compress=true` returns a .ndjson.gz.
+    Archived tasks and blob-stored results are not included.
+    """
+    rows = TaskService(db).iter_tasks(agent_name, status, since, until)
+    return _export_response("tasks", rows, compress)
+
+
+@router.get("/export/logs")
+async def export_logs(
+    agent_name: Optional[str] = None,
+    task_id: Optional[str] = None,
+    level: Optional[LogLevel] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    compress: bool = False,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    _: str = Depends(verify_api_key),
+) -> StreamingResponse:
+    """Stream all matching logs as NDJSON, oldest first (see export_tasks)."""
+    rows = LogService(db).iter_logs(agent_name, task_id, level, since, until)
+    return _export_response("logs", rows, compress)
@@ -1,9 +1,72 @@
+import asyncio
+import time
+
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..config import get_settings
+from ..database import get_database
+from ..services.claude_executor import free_slots, running_processes, waiting_tasks
+from ..services.log_pipeline import log_pipeline
+from ..services.profiler import loop_monitor
 
 router = APIRouter(tags=["health"])
 
 
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
 @router.get("/health")
 async def health_check() -> dict:
     """Health check endpoint (no auth required)."""
     return {"status": "healthy"}
+
+
+@router.get("/health/ready")
+async def readiness_check() -> JSONResponse:
+    """Readiness for load balancers (no auth required).
+
+    503 when the event loop lags, MongoDB answers slowly (or not at all)
+    or the log/task queues back up past the READY_* limits, so traffic
+    goes to healthier instances until this one recovers.
+    """
+    settings = get_settings()
+    failed = []
+
+    lag = loop_monitor.recent_lag(settings.ready_lag_window_sec)
+    if settings.ready_max_loop_lag_ms and lag is not None and lag * 1000 > settings.ready_max_loop_lag_ms:
+        failed.append("loop_lag")
+
+    ping = None
+    timeout = settings.ready_max_mongo_ping_ms / 1000 if settings.ready_max_mongo_ping_ms else None
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(get_database().command("ping"), timeout=timeout)
+        ping = time.perf_counter() - started
+    except Exception:
+        failed.append("mongo")
+    else:
+        if timeout and ping > timeout:
+            failed.append("mongo")
+
+    queue_depth = log_pipeline.queue_depth
+    if settings.ready_max_log_queue and queue_depth > settings.ready_max_log_queue:
+        failed.append("log_queue")
+
+    waiting = waiting_tasks()
+    if settings.ready_max_waiting_tasks and waiting > settings.ready_max_waiting_tasks:
+        failed.append("waiting_tasks")
+
+    slots = free_slots()
+    body = {
+        "status": "not_ready" if failed else "ready",
+        "failed": failed,
+        "loop_lag_ms": _ms(lag),
+        "mongo_ping_ms": _ms(ping),
+        "log_queue_depth": queue_depth,
+        "running_processes": len(running_processes),
+        "waiting_tasks": waiting,
+        "free_slots": None if slots == float("inf") else int(slots),
+    }
+    return JSONResponse(body, status_code=503 if failed else 200)
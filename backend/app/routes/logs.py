@@ -1,14 +1,21 @@
+import asyncio
+import json
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..auth import verify_api_key
+from ..config import get_settings
 from ..database import get_database
 from ..schemas.log import LogResponse, LogListResponse
+from ..services.log_broadcaster import log_broadcaster
 from ..services.log_service import LogService
-from ..models.log import LogLevel
+from ..models.log import LogDocument, LogLevel
+from .conditional import is_not_modified, make_etag, not_modified
+from .responses import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -19,41 +26,149 @@ def get_log_service(db: AsyncIOMotorDatabase = Depends(get_database)) -> LogServ
     return LogService(db)
 
 
+def _parse_level(level: Optional[str]) -> Optional[LogLevel]:
+    """Parse level filter, ignoring invalid values."""
+    if not level:
+        return None
+    try:
+        return LogLevel(level.lower())
+    except ValueError:
+        return None  # Invalid level, ignore filter
+
+
+def _to_response(log: LogDocument) -> LogResponse:
+    return LogResponse(
+        log_id=log.log_id,
+        task_id=log.task_id,
+        agent_name=log.agent_name,
+        level=log.level,
+        message=log.message,
+        timestamp=log.timestamp,
+    )
+
+
+def _format_event(event: str, data: str, event_id: Optional[str] = None) -> str:
+    """Format a single Server-Sent Event frame."""
+    frame = f"event: {event}\n"
+    if event_id:
+        frame += f"id: {event_id}\n"
+    return frame + f"data: {data}\n\n"
+
+
 @router.get("/logs", response_model=LogListResponse)
 async def list_logs(
+    request: Request,
     agent_name: Optional[str] = None,
     task_id: Optional[str] = None,
     level: Optional[str] = None,
     limit: int = 100,
+    cursor: Optional[str] = None,
     service: LogService = Depends(get_log_service),
     _: str = Depends(verify_api_key),
-) -> LogListResponse:
-    """List logs with optional filters."""
-    log_level = None
-    if level:
-        try:
-            log_level = LogLevel(level.lower())
-        except ValueError:
-            pass  # Invalid level, ignore filter
+):
+    """List logs, newest first, with optional filters.
 
-    logs = await service.list_logs(
+    Paginate by passing the returned `next_cursor` back as `cursor`.
+    Supports If-None-Match: the ETag covers the IDs of the listed page,
+    so an unchanged page is answered with 304.
+    """
+    filters = dict(
         agent_name=agent_name,
         task_id=task_id,
-        level=log_level,
-        limit=min(limit, 500),  # Cap at 500
+        level=_parse_level(level),
+        cursor=cursor,
     )
+    limit = max(1, min(limit, 500))  # Cap at 500
+
+    try:
+        if request.headers.get("if-none-match"):
+            log_ids = await service.list_log_ids(**filters, limit=limit + 1)
+            etag = make_etag(len(log_ids) > limit, *log_ids[:limit])
+            if is_not_modified(request, etag):
+                return not_modified(etag)
+
+        logs, next_cursor = await service.list_logs_page(**filters, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body = {"count": len(logs), "logs": logs, "next_cursor": next_cursor}
+    return FastJSONResponse(body, headers={
+        "ETag": make_etag(next_cursor is not None, *[log["log_id"] for log in logs]),
+        "Cache-Control": "no-cache",
+    })
+
+
+@router.get("/logs/stream")
+async def stream_logs(
+    request: Request,
+    agent_name: Optional[str] = None,
+    task_id: Optional[str] = None,
+    level: Optional[str] = None,
+    backfill: int = 50,
+    service: LogService = Depends(get_log_service),
+    _: str = Depends(verify_api_key),
+) -> StreamingResponse:
+    """Stream new logs as Server-Sent Events.
+
+    Sends the latest `backfill` matching logs first (oldest to newest),
+    then a `ready` event, then pushes entries as they are written, without
+    polling MongoDB.
+    """
+    settings = get_settings()
+    log_level = _parse_level(level)
+
+    async def event_stream():
+        # Subscribed only once the response is actually streamed, so a client
+        # gone before that leaves nothing behind; always before the backfill
+        # query, so nothing written in between is lost
+        subscription = log_broadcaster.subscribe(
+            agent_name=agent_name,
+            task_id=task_id,
+            level=log_level,
+            maxsize=settings.log_stream_queue_size,
+        )
+        try:
+            backlog = []
+            if backfill > 0:
+                backlog = await service.list_logs(
+                    agent_name=agent_name,
+                    task_id=task_id,
+                    level=log_level,
+                    limit=min(backfill, settings.log_stream_backfill_max),
+                )
+
+            seen = set()
+            for log in reversed(backlog):
+                seen.add(log.log_id)
+                yield _format_event("log", _to_response(log).model_dump_json(), log.log_id)
+            # Backfill done (possibly empty): the client can stop showing a spinner
+            yield _format_event("ready", json.dumps({"backfill": len(backlog)}))
+
+            reported_dropped = 0
+            while not await request.is_disconnected():
+                try:
+                    log = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.log_stream_keepalive_sec,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if subscription.dropped != reported_dropped:
+                    reported_dropped = subscription.dropped
+                    yield _format_event("dropped", json.dumps({"count": reported_dropped}))
+
+                # Entries written while the backfill query ran arrive twice
+                if log.log_id in seen:
+                    seen.discard(log.log_id)
+                    continue
+                yield _format_event("log", _to_response(log).model_dump_json(), log.log_id)
+        finally:
+            log_broadcaster.unsubscribe(subscription)
 
-    return LogListResponse(
-        count=len(logs),
-        logs=[
-            LogResponse(
-                log_id=log.log_id,
-                task_id=log.task_id,
-                agent_name=log.agent_name,
-                level=log.level,
-                message=log.message,
-                timestamp=log.timestamp,
-            )
-            for log in logs
-        ],
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
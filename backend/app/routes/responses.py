@@ -0,0 +1,27 @@
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for hot read endpoints, rendered with orjson.
+
+    Routes build the body as plain dicts straight from MongoDB projections
+    and return this response, so FastAPI skips its response_model pass
+    (validating into models, then dumping them again); response_model stays
+    on the route for the OpenAPI schema. The dicts must match that schema:
+    same fields, same order. orjson is in requirements.txt; where it isn't
+    installed this falls back to the stdlib encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        # OPT_UTC_Z: aware UTC datetimes end in "Z", as pydantic writes them
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
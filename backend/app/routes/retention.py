@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+
+from ..auth import verify_api_key
+from ..schemas.retention import RetentionStatusResponse
+from ..services.retention_service import retention_service
+
+router = APIRouter(tags=["retention"])
+
+
+@router.get("/retention", response_model=RetentionStatusResponse)
+async def get_retention_status(
+    _: str = Depends(verify_api_key),
+) -> RetentionStatusResponse:
+    """Retention policies and purged volumes."""
+    return retention_service.status()
+
+
+@router.post("/retention/run", response_model=RetentionStatusResponse)
+async def run_retention(
+    _: str = Depends(verify_api_key),
+) -> RetentionStatusResponse:
+    """Run a retention purge now."""
+    await retention_service.run_once()
+    return retention_service.status()
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..auth import verify_api_key
+from ..database import get_database
+from ..models.log import LogLevel
+from ..models.task import TaskStatus
+from ..schemas.search import SearchResponse, SearchScope
+from ..services.search_service import SearchService
+
+router = APIRouter(tags=["search"])
+
+# Ranked results are paged by offset; keep deep pages bounded
+MAX_OFFSET = 10_000
+
+# Default window for log search on time-series storage (no text index there)
+TIMESERIES_DEFAULT_WINDOW = timedelta(hours=24)
+
+
+def get_search_service(db: AsyncIOMotorDatabase = Depends(get_database)) -> SearchService:
+    return SearchService(db)
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=500),
+    scope: SearchScope = SearchScope.TASKS,
+    agent_name: Optional[str] = None,
+    task_id: Optional[str] = None,
+    status: Optional[TaskStatus] = None,
+    level: Optional[LogLevel] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    service: SearchService = Depends(get_search_service),
+    _: str = Depends(verify_api_key),
+) -> SearchResponse:
+    """Full-text search over task prompts/results or log messages.
+
+    Results are ranked by relevance; use `page` to move through them.
+    Compressed and blob-stored prompts/results are matched through their
+    distinct words (whole words, no phrases; the first 50,000 characters
+    of them).
+    """
+    skip = (page - 1) * limit
+    if skip > MAX_OFFSET:
+        raise HTTPException(status_code=400, detail=f"Page too deep (max offset {MAX_OFFSET})")
+
+    if scope == SearchScope.TASKS:
+        hits, has_more = await service.search_tasks(
+            q, agent_name=agent_name, status=status,
+            since=since, until=until, limit=limit, skip=skip,
+        )
+    else:
+        if service.logs_timeseries and since is None:
+            since = (until or datetime.now(timezone.utc)) - TIMESERIES_DEFAULT_WINDOW
+        hits, has_more = await service.search_logs(
+            q, agent_name=agent_name, task_id=task_id, level=level,
+            since=since, until=until, limit=limit, skip=skip,
+        )
+
+    return SearchResponse(
+        query=q,
+        scope=scope,
+        page=page,
+        limit=limit,
+        count=len(hits),
+        has_more=has_more,
+        hits=hits,
+    )
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..auth import verify_api_key
+from ..database import get_database
+from ..models.stats import BUCKET_SIZES, StatsGranularity
+from ..schemas.stats import StatsResponse
+from ..services.stats_service import StatsService
+
+router = APIRouter(tags=["stats"])
+
+# Upper bound on buckets per group a single request may aggregate
+MAX_BUCKETS = 10_000
+
+
+def get_stats_service(db: AsyncIOMotorDatabase = Depends(get_database)) -> StatsService:
+    return StatsService(db)
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats(
+    agent_name: Optional[str] = None,
+    model: Optional[str] = None,
+    granularity: StatsGranularity = StatsGranularity.HOUR,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    service: StatsService = Depends(get_stats_service),
+    _: str = Depends(verify_api_key),
+) -> StatsResponse:
+    """Success rate, duration percentiles and throughput per agent/model.
+
+    Served from precomputed rollups; defaults to the last 24 hours.
+    """
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(hours=24)
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    if since >= until:
+        raise HTTPException(status_code=400, detail="'since' must be before 'until'")
+    if (until - since) / BUCKET_SIZES[granularity] > MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large for '{granularity.value}' granularity (max {MAX_BUCKETS} buckets)",
+        )
+
+    return await service.get_stats(
+        since=since,
+        until=until,
+        granularity=granularity,
+        agent_name=agent_name,
+        model=model,
+    )
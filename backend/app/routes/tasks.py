@@ -1,27 +1,50 @@
 import logging
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from ..auth import verify_api_key
 from ..config import get_settings
 from ..database import get_database
+from .conditional import is_not_modified, make_etag, not_modified, parse_range
+from .responses import FastJSONResponse
 from ..schemas import (
     TaskCreateRequest,
     TaskResponse,
     TaskStatusResponse,
-    TaskListItem,
     TaskListResponse,
 )
-from ..services import TaskService, run_claude_command, stop_task
-from ..models.task import TaskStatus
+from ..services import TaskService, cancel_pending_task, run_claude_command, stop_task
+from ..services.tracing import StageTimer
+from ..models.task import TaskDocument, TaskStatus
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["tasks"])
 
 
+def status_body(task: TaskDocument) -> dict:
+    """Body of the status response: same fields and order as TaskStatusResponse."""
+    return {
+        "task_id": task.task_id,
+        "agent_name": task.agent_name,
+        "status": task.status,
+        "prompt": task.prompt,
+        "result": task.result,
+        "result_preview": task.result_preview,
+        "result_size": task.result_size,
+        "result_url": f"/api/tasks/{task.task_id}/result" if task.result_ref else None,
+        "error": task.error,
+        "created_at": task.created_at,
+        "started_at": task.started_at,
+        "updated_at": task.updated_at,
+        "duration_sec": task.duration_sec,
+        "timings": task.timings,
+    }
+
+
 def get_task_service(
     db: AsyncIOMotorDatabase = Depends(get_database)
 ) -> TaskService:
@@ -42,7 +65,10 @@ async def create_task(
     settings = get_settings()
     timeout = request.timeout or settings.claude_timeout
 
-    task = await service.create_task(request.agent_name, request.prompt, timeout)
+    model = request.options.model if request.options else None
+    task = await service.create_task(request.agent_name, request.prompt, timeout, model)
+    timings = StageTimer(task.created_at)
+    timings.mark("accepted")
 
     prompt_preview = request.prompt[:50] if len(request.prompt) > 50 else request.prompt
     logger.info(f"Task {task.task_id}: Agent '{request.agent_name}', prompt: {prompt_preview}...")
@@ -54,7 +80,8 @@ async def create_task(
         request.agent_name,
         request.prompt,
         timeout,
-        request.options
+        request.options,
+        timings
     )
 
     return TaskResponse(task_id=task.task_id)
@@ -63,54 +90,136 @@ async def create_task(
 @router.get("/status/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(
     task_id: str,
+    request: Request,
     service: TaskService = Depends(get_task_service),
     _: str = Depends(verify_api_key),
-) -> TaskStatusResponse:
-    """Get the status and result of a submitted task."""
+):
+    """Get the status and result of a submitted task.
+
+    Supports If-None-Match: an unchanged task is answered with 304
+    after reading only its updated_at.
+    """
+    if request.headers.get("if-none-match"):
+        version = await service.get_task_version(task_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        etag = make_etag(task_id, version)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+
     task = await service.get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     logger.info(f"Task {task_id}: Status check - {task.status}")
 
-    return TaskStatusResponse(
-        task_id=task.task_id,
-        agent_name=task.agent_name,
-        status=task.status,
-        prompt=task.prompt,
-        result=task.result,
-        error=task.error,
-        created_at=task.created_at,
-        started_at=task.started_at,
-        updated_at=task.updated_at,
-        duration_sec=task.duration_sec,
+    return FastJSONResponse(status_body(task), headers={
+        "ETag": make_etag(task_id, task.updated_at),
+        "Cache-Control": "no-cache",
+    })
+
+
+@router.get("/tasks/{task_id}/result")
+async def download_task_result(
+    task_id: str,
+    request: Request,
+    service: TaskService = Depends(get_task_service),
+    _: str = Depends(verify_api_key),
+):
+    """Stream a task's full result as text, with HTTP Range support.
+
+    Works for inline and blob-stored results alike; blob results are read
+    chunk by chunk and never loaded whole into memory.
+    """
+    task = await service.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.result_ref:
+        size = await service.blobs.size(task.result_ref)
+        if size is None:
+            raise HTTPException(status_code=404, detail="Result blob is missing")
+    elif task.result is not None:
+        body = task.result.encode("utf-8")
+        size = len(body)
+    else:
+        raise HTTPException(status_code=404, detail="Task has no result")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": make_etag(task_id, task.updated_at),
+        "Cache-Control": "no-cache",
+    }
+    try:
+        byte_range = parse_range(request.headers.get("range"), size) if size else None
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+
+    if task.result_ref:
+        content = service.blobs.read_range(task.result_ref, start, end) if size else iter(())
+    else:
+        content = iter([body[start:end + 1]])
+
+    return StreamingResponse(
+        content,
+        status_code=status_code,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
     )
 
 
 @router.get("/tasks", response_model=TaskListResponse)
 async def list_tasks(
+    request: Request,
     agent_name: str = None,
+    status: Optional[TaskStatus] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     service: TaskService = Depends(get_task_service),
     _: str = Depends(verify_api_key),
-) -> TaskListResponse:
-    """List all tasks with optional agent filter."""
-    tasks = await service.list_tasks(agent_name=agent_name)
-
-    return TaskListResponse(
-        count=len(tasks),
-        tasks=[
-            TaskListItem(
-                task_id=t.task_id,
-                agent_name=t.agent_name,
-                status=t.status,
-                created_at=t.created_at,
-                duration_sec=t.duration_sec,
-                prompt_preview=t.metadata.get("prompt_preview") if t.metadata else None
-            )
-            for t in tasks
-        ]
+):
+    """List tasks, newest first, with optional agent/status filters.
+
+    Paginate by passing the returned `next_cursor` back as `cursor`.
+    Supports If-None-Match: the ETag covers the IDs and updated_at of the
+    listed page, so an unchanged page is answered with 304.
+    """
+    filters = dict(
+        agent_name=agent_name,
+        status=status,
+        limit=max(1, min(limit, 100)),  # Cap at 100
+        cursor=cursor,
     )
 
+    try:
+        if request.headers.get("if-none-match"):
+            versions = await service.list_task_versions(**filters)
+            has_more = len(versions) > filters["limit"]
+            etag = make_etag(has_more, *versions[:filters["limit"]])
+            if is_not_modified(request, etag):
+                return not_modified(etag)
+
+        tasks, next_cursor = await service.list_task_summaries(**filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body = {"count": len(tasks), "tasks": tasks, "next_cursor": next_cursor}
+    return FastJSONResponse(body, headers={
+        "ETag": make_etag(next_cursor is not None, *[(t["task_id"], t["updated_at"]) for t in tasks]),
+        "Cache-Control": "no-cache",
+    })
+
 
 @router.delete("/tasks/{task_id}")
 async def delete_task(
@@ -131,18 +240,24 @@ async def stop_running_task(
     service: TaskService = Depends(get_task_service),
     _: str = Depends(verify_api_key),
 ) -> dict:
-    """Stop a running task."""
+    """Stop a running task, or cancel one still waiting for an execution slot."""
     task = await service.get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    if task.status == TaskStatus.PENDING:
+        if await cancel_pending_task(task_id, service, agent_name=task.agent_name):
+            return {"message": "Task cancelled", "task_id": task_id}
+        # Got a slot in the meantime
+        task = await service.get_task(task_id)
+
     if task.status != TaskStatus.RUNNING:
         raise HTTPException(
             status_code=400,
             detail=f"Task is not running (current status: {task.status})"
         )
 
-    success = await stop_task(task_id, service)
+    success = await stop_task(task_id, service, agent_name=task.agent_name)
     if not success:
         raise HTTPException(
             status_code=500,
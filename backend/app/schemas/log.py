@@ -22,3 +22,4 @@ class LogListResponse(BaseModel):
 
     count: int
     logs: List[LogResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+class RetentionStatusResponse(BaseModel):
+    """Retention policies and purge counters."""
+
+    enabled: bool
+    interval_sec: int
+    log_retention_days: Dict[str, int]
+    task_retention_days: Dict[str, int]
+    stats_minute_retention_days: int
+    archive_after_days: Optional[int] = None
+    runs: int
+    last_run_at: Optional[datetime] = None
+    last_duration_sec: Optional[float] = None
+    last_purged: Dict[str, int]
+    total_purged: Dict[str, int]
@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class SearchScope(str, Enum):
+    TASKS = "tasks"
+    LOGS = "logs"
+
+
+class SearchHit(BaseModel):
+    """Single ranked search result (a task or a log entry)."""
+
+    kind: SearchScope
+    id: str
+    agent_name: str
+    task_id: Optional[str] = None
+    status: Optional[str] = None
+    level: Optional[str] = None
+    timestamp: datetime
+    score: Optional[float] = None
+    snippet: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    """Response for search endpoint."""
+
+    query: str
+    scope: SearchScope
+    page: int
+    limit: int
+    count: int
+    has_more: bool
+    hits: List[SearchHit]
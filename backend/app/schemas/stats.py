@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from ..models.stats import StatsGranularity
+
+
+class AgentStats(BaseModel):
+    """Aggregated statistics for one agent/model pair."""
+
+    agent_name: str
+    model: str
+    total: int
+    by_status: Dict[str, int]
+    success_rate: Optional[float] = None
+    avg_duration_sec: Optional[float] = None
+    p50_duration_sec: Optional[float] = None
+    p95_duration_sec: Optional[float] = None
+    max_duration_sec: Optional[float] = None
+    throughput_per_min: float
+
+
+class StatsBucket(BaseModel):
+    """Finished task counts for one time bucket."""
+
+    bucket: datetime
+    total: int
+    by_status: Dict[str, int]
+
+
+class StatsResponse(BaseModel):
+    """Response for stats endpoint."""
+
+    granularity: StatsGranularity
+    since: datetime
+    until: datetime
+    agents: List[AgentStats]
+    series: List[StatsBucket]
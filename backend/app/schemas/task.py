@@ -111,11 +111,18 @@ class TaskStatusResponse(BaseModel):
     status: TaskStatus
     prompt: Optional[str] = None
     result: Optional[str] = None
+    # Set instead of `result` when the output is too large to inline;
+    # fetch it from result_url
+    result_preview: Optional[str] = None
+    result_size: Optional[int] = None
+    result_url: Optional[str] = None
     error: Optional[str] = None
     created_at: datetime
     started_at: Optional[datetime] = None
     updated_at: datetime
     duration_sec: Optional[float] = None
+    # Stage -> ms since created_at: accepted, queued, dequeued, spawned, ...
+    timings: Dict[str, int] = {}
 
 
 class TaskListItem(BaseModel):
@@ -124,6 +131,7 @@ class TaskListItem(BaseModel):
     agent_name: str
     status: TaskStatus
     created_at: datetime
+    updated_at: Optional[datetime] = None
     duration_sec: Optional[float] = None
     prompt_preview: Optional[str] = None
 
@@ -132,3 +140,4 @@ class TaskListResponse(BaseModel):
     """Response for task list endpoint."""
     count: int
     tasks: List[TaskListItem]
+    next_cursor: Optional[str] = None
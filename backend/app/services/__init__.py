@@ -1,4 +1,4 @@
 from .task_service import TaskService
-from .claude_executor import run_claude_command, stop_task
+from .claude_executor import run_claude_command, stop_task, cancel_pending_task
 
-__all__ = ["TaskService", "run_claude_command", "stop_task"]
+__all__ = ["TaskService", "run_claude_command", "stop_task", "cancel_pending_task"]
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+
+
+class GridFSBlobBackend:
+    """Blobs in the `task_results` GridFS bucket. Refs look like `gridfs:<id>`."""
+
+    scheme = "gridfs"
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name="task_results")
+
+    @staticmethod
+    def _file_id(key: str) -> Optional[ObjectId]:
+        try:
+            return ObjectId(key)
+        except InvalidId:
+            return None
+
+    async def put(self, name: str, data: bytes) -> str:
+        file_id = await self.bucket.upload_from_stream(name, data)
+        return str(file_id)
+
+    async def size(self, key: str) -> Optional[int]:
+        file_id = self._file_id(key)
+        if file_id is None:
+            return None
+        try:
+            grid_out = await self.bucket.open_download_stream(file_id)
+        except NoFile:
+            return None
+        return grid_out.length
+
+    async def read_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        grid_out = await self.bucket.open_download_stream(self._file_id(key))
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, key: str) -> None:
+        file_id = self._file_id(key)
+        if file_id is None:
+            return
+        try:
+            await self.bucket.delete(file_id)
+        except NoFile:
+            pass
+
+
+class LocalBlobBackend:
+    """Blobs as files in a local directory. Refs look like `file:<name>`.
+
+    File I/O runs in worker threads to keep the event loop free.
+    """
+
+    scheme = "file"
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        # Keys are generated by put(); never let one escape the directory
+        return self.directory / Path(key).name
+
+    def _write(self, name: str, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(name)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    async def put(self, name: str, data: bytes) -> str:
+        await asyncio.to_thread(self._write, name, data)
+        return name
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            return (await asyncio.to_thread(os.stat, self._path(key))).st_size
+        except FileNotFoundError:
+            return None
+
+    async def read_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        handle = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            await asyncio.to_thread(handle.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(handle.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(handle.close)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class BlobStore:
+    """Out-of-document storage for large task results.
+
+    New blobs go to the configured backend (RESULT_BLOB_BACKEND); reads and
+    deletes follow the scheme in the ref, so switching backends keeps
+    existing results readable.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        settings = get_settings()
+        self.db = db
+        # GridFS needs MongoDB; embedded storage always keeps blobs in files
+        local = settings.result_blob_backend == "local" or settings.storage_backend != "mongo"
+        self.default_scheme = "file" if local else "gridfs"
+        self.blob_dir = settings.result_blob_dir
+        self._backends = {}
+
+    def _backend(self, scheme: str):
+        # Created on first use: most requests never touch a blob
+        if scheme not in self._backends:
+            if scheme == GridFSBlobBackend.scheme:
+                self._backends[scheme] = GridFSBlobBackend(self.db)
+            elif scheme == LocalBlobBackend.scheme:
+                self._backends[scheme] = LocalBlobBackend(self.blob_dir)
+            else:
+                raise ValueError(f"Unknown blob scheme: {scheme}")
+        return self._backends[scheme]
+
+    def _resolve(self, ref: str):
+        scheme, _, key = ref.partition(":")
+        if not key:
+            raise ValueError(f"Unknown blob ref: {ref}")
+        return self._backend(scheme), key
+
+    async def put(self, name: str, data: bytes) -> str:
+        """Store data and return its ref."""
+        backend = self._backend(self.default_scheme)
+        key = await backend.put(name, data)
+        return f"{backend.scheme}:{key}"
+
+    async def size(self, ref: str) -> Optional[int]:
+        """Blob size in bytes, None if it's gone."""
+        backend, key = self._resolve(ref)
+        return await backend.size(key)
+
+    def read_range(self, ref: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Stream bytes start..end (inclusive) of a blob."""
+        backend, key = self._resolve(ref)
+        return backend.read_range(key, start, end)
+
+    async def delete(self, ref: str) -> None:
+        """Delete a blob; missing blobs are ignored."""
+        try:
+            backend, key = self._resolve(ref)
+            await backend.delete(key)
+        except Exception as e:
+            logger.error(f"Failed to delete blob {ref}: {e}")
@@ -1,25 +1,59 @@
 import asyncio
 import json
 import logging
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from ..models.task import TaskStatus
 from ..config import get_settings
-from ..database import get_database
 from ..schemas.task import ClaudeOptions
 from .task_service import TaskService
-from .combined_logger import CombinedLogger
+from .combined_logger import combined_logger
+from .tracing import StageTimer
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
 # Global dict to store running processes for stop functionality
 running_processes: Dict[str, asyncio.subprocess.Process] = {}
 
+# Execution slots (MAX_CONCURRENT_TASKS); tasks beyond the limit wait PENDING
+_slots: Optional[asyncio.Semaphore] = None
+_waiting = 0
+_active = 0
+
+STREAM_CHUNK = 64 * 1024
+
+
+def _get_slots() -> Optional[asyncio.Semaphore]:
+    global _slots
+    limit = get_settings().max_concurrent_tasks
+    if limit > 0 and _slots is None:
+        _slots = asyncio.Semaphore(limit)
+    return _slots
+
+
+def waiting_tasks() -> int:
+    """Tasks accepted but waiting for an execution slot."""
+    return _waiting
+
+
+def free_slots() -> float:
+    """Free execution slots; infinite when concurrency is unlimited."""
+    limit = get_settings().max_concurrent_tasks
+    return float(limit - _active) if limit > 0 else float("inf")
+
+
+metrics.running_processes_gauge.set_function(lambda: len(running_processes))
+metrics.tasks_waiting.set_function(waiting_tasks)
+metrics.execution_slots_free.set_function(free_slots)
+
 
 def build_command_args(prompt: str, options: Optional[ClaudeOptions] = None) -> List[str]:
     """Построить аргументы команды claude CLI."""
-    args = ["claude", "-p", prompt]
+    args = [get_settings().claude_cli, "-p", prompt]
 
     if not options:
         return args
@@ -142,20 +176,19 @@ def get_running_process(task_id: str) -> Optional[asyncio.subprocess.Process]:
     return running_processes.get(task_id)
 
 
-async def stop_task(task_id: str, service: TaskService) -> bool:
+async def stop_task(
+    task_id: str, service: TaskService, agent_name: Optional[str] = None
+) -> bool:
     """Stop a running task by killing its process."""
     process = running_processes.get(task_id)
     if not process:
         logger.warning(f"Task {task_id}: No running process found to stop")
         return False
 
-    # Get task to find agent_name for logging
-    task = await service.get_task(task_id)
-    agent_name = task.agent_name if task else "unknown"
-
-    # Create combined logger
-    db = get_database()
-    combined_logger = CombinedLogger(db)
+    # Get task to find agent_name for logging, unless the caller already has it
+    if agent_name is None:
+        task = await service.get_task(task_id)
+        agent_name = task.agent_name if task else "unknown"
 
     # IMPORTANT: Remove from running_processes FIRST before killing
     # This prevents run_claude_command from setting status to FAILED
@@ -196,26 +229,109 @@ async def stop_task(task_id: str, service: TaskService) -> bool:
         return False
 
 
+async def cancel_pending_task(
+    task_id: str, service: TaskService, agent_name: Optional[str] = None
+) -> bool:
+    """Cancel a task still waiting for an execution slot.
+
+    Only applies while the task is PENDING; its queued run then skips
+    execution when it gets a slot.
+    """
+    if not await service.update_status(
+        task_id, TaskStatus.CANCELLED,
+        error="Task was cancelled by user",
+        from_status=TaskStatus.PENDING
+    ):
+        return False
+
+    if agent_name is None:
+        task = await service.get_task(task_id)
+        agent_name = task.agent_name if task else "unknown"
+    await combined_logger.warning(agent_name, "Task cancelled by user", task_id)
+    logger.info(f"Task {task_id}: Cancelled by user before it started")
+    return True
+
+
+async def _read_stream(stream: asyncio.StreamReader, chunks: List[bytes], on_first=None) -> None:
+    while True:
+        data = await stream.read(STREAM_CHUNK)
+        if not data:
+            return
+        if on_first and not chunks:
+            on_first()
+        chunks.append(data)
+
+
+async def _collect_output(process: asyncio.subprocess.Process, on_first_output) -> Tuple[bytes, bytes]:
+    """Like process.communicate(), but reports when stdout first produces data."""
+    stdout: List[bytes] = []
+    stderr: List[bytes] = []
+    await asyncio.gather(
+        _read_stream(process.stdout, stdout, on_first_output),
+        _read_stream(process.stderr, stderr),
+    )
+    await process.wait()
+    return b"".join(stdout), b"".join(stderr)
+
+
 async def run_claude_command(
     service: TaskService,
     task_id: str,
     agent_name: str,
     prompt: str,
     timeout: int,
-    options: Optional[ClaudeOptions] = None
+    options: Optional[ClaudeOptions] = None,
+    timings: Optional[StageTimer] = None
+) -> None:
+    """Execute claude CLI command, waiting for a free execution slot if limited.
+
+    `timings` carries the stages recorded at submission (see TASK_STAGES);
+    the rest are added here and stored with the final status.
+    """
+    global _waiting, _active
+    timings = timings or StageTimer()
+    timings.mark("queued")
+    slots = _get_slots()
+    if slots is None:
+        timings.mark("dequeued")
+        await _execute(service, task_id, agent_name, prompt, timeout, options, timings)
+        return
+
+    _waiting += 1
+    try:
+        await slots.acquire()
+    finally:
+        _waiting -= 1
+    timings.mark("dequeued")
+    _active += 1
+    try:
+        await _execute(service, task_id, agent_name, prompt, timeout, options, timings)
+    finally:
+        _active -= 1
+        slots.release()
+
+
+async def _execute(
+    service: TaskService,
+    task_id: str,
+    agent_name: str,
+    prompt: str,
+    timeout: int,
+    options: Optional[ClaudeOptions],
+    timings: StageTimer
 ) -> None:
     """Execute claude CLI command asynchronously in agent directory."""
     settings = get_settings()
+    agent_label = metrics.agent_label(agent_name)
     agent_dir = Path(settings.agents_dir) / agent_name
 
-    # Create combined logger
-    db = get_database()
-    combined_logger = CombinedLogger(db)
-
     # Truncate prompt for logging
     prompt_preview = prompt[:100] + "..." if len(prompt) > 100 else prompt
 
-    await service.update_status(task_id, TaskStatus.RUNNING)
+    started_at = datetime.now(timezone.utc)
+    if not await service.update_status(task_id, TaskStatus.RUNNING, started_at=started_at):
+        logger.info(f"Task {task_id}: No longer pending, skipping execution")
+        return
     logger.info(f"Task {task_id}: Starting execution for agent '{agent_name}' in {agent_dir}")
 
     # Log task start
@@ -229,7 +345,9 @@ async def run_claude_command(
         await service.update_status(
             task_id,
             TaskStatus.FAILED,
-            error=error_msg
+            error=error_msg,
+            started_at=started_at,
+            timings=timings
         )
         logger.error(f"Task {task_id}: {error_msg}")
         await combined_logger.error(agent_name, error_msg, task_id)
@@ -248,6 +366,7 @@ async def run_claude_command(
                     effective_options = effective_options.model_copy(
                         update={"system_prompt": system_prompt}
                     )
+                    timings.mark("claude_md_loaded")
                     logger.info(f"Task {task_id}: Using CLAUDE.md as system prompt ({len(system_prompt)} chars)")
             except Exception as e:
                 logger.warning(f"Task {task_id}: Failed to read CLAUDE.md: {e}")
@@ -256,20 +375,29 @@ async def run_claude_command(
     logger.debug(f"Task {task_id}: Command args: {' '.join(cmd_args[:5])}...")
 
     try:
+        spawn_started = time.perf_counter()
         process = await asyncio.create_subprocess_exec(
             *cmd_args,
             cwd=str(agent_dir),
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
+        spawned = time.perf_counter()
+        timings.mark("spawned")
+        metrics.spawn_latency.labels(agent_label).observe(spawned - spawn_started)
 
         # Store process handle for stop functionality
         running_processes[task_id] = process
 
+        def on_first_output() -> None:
+            timings.mark("first_output")
+            metrics.first_output_latency.labels(agent_label).observe(time.perf_counter() - spawned)
+
         try:
             stdout, stderr = await asyncio.wait_for(
-                process.communicate(), timeout=timeout
+                _collect_output(process, on_first_output), timeout=timeout
             )
+            timings.mark("exited")
 
             # Check if task was cancelled during execution
             if task_id not in running_processes:
@@ -277,22 +405,30 @@ async def run_claude_command(
                 return
 
             if process.returncode == 0:
-                await service.update_status(
+                if not await service.update_status(
                     task_id,
                     TaskStatus.COMPLETED,
-                    result=stdout.decode("utf-8")
-                )
+                    result=stdout.decode("utf-8"),
+                    started_at=started_at,
+                    timings=timings
+                ):
+                    logger.info(f"Task {task_id}: Already finalized, result discarded")
+                    return
                 logger.info(f"Task {task_id}: Completed successfully")
                 await combined_logger.info(
                     agent_name, "Task completed successfully", task_id
                 )
             else:
                 error_output = stderr.decode("utf-8") or f"Exit code: {process.returncode}"
-                await service.update_status(
+                if not await service.update_status(
                     task_id,
                     TaskStatus.FAILED,
-                    error=error_output
-                )
+                    error=error_output,
+                    started_at=started_at,
+                    timings=timings
+                ):
+                    logger.info(f"Task {task_id}: Already finalized, failure discarded")
+                    return
                 logger.error(f"Task {task_id}: Failed with exit code {process.returncode}")
                 await combined_logger.error(
                     agent_name, f"Task failed: {error_output[:200]}", task_id
@@ -305,17 +441,21 @@ async def run_claude_command(
             await service.update_status(
                 task_id,
                 TaskStatus.TIMEOUT,
-                error=error_msg
+                error=error_msg,
+                started_at=started_at,
+                timings=timings
             )
             logger.warning(f"Task {task_id}: Timed out after {timeout}s")
             await combined_logger.warning(agent_name, error_msg, task_id)
 
     except FileNotFoundError:
-        error_msg = "Claude CLI not found. Ensure 'claude' is in PATH."
+        error_msg = f"Claude CLI not found. Ensure '{settings.claude_cli}' is in PATH."
         await service.update_status(
             task_id,
             TaskStatus.FAILED,
-            error=error_msg
+            error=error_msg,
+            started_at=started_at,
+            timings=timings
         )
         logger.error(f"Task {task_id}: Claude CLI not found")
         await combined_logger.error(agent_name, error_msg, task_id)
@@ -324,7 +464,9 @@ async def run_claude_command(
         await service.update_status(
             task_id,
             TaskStatus.FAILED,
-            error=error_msg
+            error=error_msg,
+            started_at=started_at,
+            timings=timings
         )
         logger.exception(f"Task {task_id}: Unexpected error")
         await combined_logger.error(agent_name, f"Unexpected error: {error_msg}", task_id)
@@ -1,11 +1,10 @@
 import logging
 from typing import Optional
 
-from motor.motor_asyncio import AsyncIOMotorDatabase
-
 from .file_logger import agent_file_logger
-from .log_service import LogService
-from ..models.log import LogLevel
+from .log_broadcaster import log_broadcaster
+from .log_pipeline import LogPipeline, log_pipeline
+from ..models.log import LogDocument, LogLevel
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +12,8 @@ logger = logging.getLogger(__name__)
 class CombinedLogger:
     """Logger that writes to both file and MongoDB."""
 
-    def __init__(self, db: AsyncIOMotorDatabase):
-        self.log_service = LogService(db)
+    def __init__(self, pipeline: LogPipeline = log_pipeline):
+        self.pipeline = pipeline
 
     async def log(
         self,
@@ -23,7 +22,7 @@ class CombinedLogger:
         message: str,
         task_id: Optional[str] = None,
     ) -> None:
-        """Write log entry to both file and MongoDB.
+        """Write log entry to file, queue it for MongoDB and notify live streams.
 
         Args:
             agent_name: Name of the agent
@@ -36,22 +35,26 @@ class CombinedLogger:
             agent_name, level, task_id or "system", message
         )
 
-        # MongoDB logging (async)
+        # MongoDB logging (batched in the background)
         try:
             log_level = LogLevel(level.lower())
         except ValueError:
             log_level = LogLevel.INFO
 
+        log = LogDocument(
+            agent_name=agent_name,
+            level=log_level,
+            message=message,
+            task_id=task_id,
+        )
+
         try:
-            await self.log_service.create_log(
-                agent_name=agent_name,
-                level=log_level,
-                message=message,
-                task_id=task_id,
-            )
+            await self.pipeline.submit(log)
         except Exception as e:
             logger.error(f"Failed to write log to MongoDB: {e}")
 
+        log_broadcaster.publish(log)
+
     async def info(
         self, agent_name: str, message: str, task_id: Optional[str] = None
     ) -> None:
@@ -75,3 +78,7 @@ class CombinedLogger:
     ) -> None:
         """Log DEBUG level message."""
         await self.log(agent_name, "DEBUG", message, task_id)
+
+
+# Singleton instance
+combined_logger = CombinedLogger()
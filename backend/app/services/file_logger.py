@@ -1,17 +1,148 @@
+import gzip
 import logging
-from datetime import datetime
+import os
+import queue
+import shutil
+from collections import OrderedDict
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
 from pathlib import Path
-from typing import Dict
+from typing import Optional
 
 from ..config import get_settings
 
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+class _RotatedFileCompressor:
+    """Compresses rotated log files as they're rotated.
+
+    Runs on the listener thread, inside doRollover(), so it never blocks
+    the event loop, and each rotated file is compressed before the next
+    rollover renames `.1.gz` to `.2.gz`: compressing later would race
+    that shift and overwrite or drop backups.
+    """
+
+    def __init__(self, method: str):
+        if method == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, compressing rotated logs with gzip")
+            method = "gzip"
+        self.method = method
+        self.suffix = {"gzip": ".gz", "zstd": ".zst"}.get(method, "")
+
+    def namer(self, name: str) -> str:
+        return name + self.suffix
+
+    def rotator(self, source: str, dest: str) -> None:
+        """Move the active file aside, then compress it into `dest`."""
+        if not self.suffix:
+            os.replace(source, dest)
+            return
+        pending = dest + ".pending"
+        os.replace(source, pending)
+        try:
+            with open(pending, "rb") as src:
+                if self.method == "zstd":
+                    with open(dest, "wb") as dst:
+                        zstandard.ZstdCompressor().copy_stream(src, dst)
+                else:
+                    with gzip.open(dest, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+            os.remove(pending)
+        except Exception as e:
+            logger.error(f"Failed to compress rotated log {pending}: {e}")
+
+
+class _AgentFileRouter(logging.Handler):
+    """Routes records to per-agent rotating files. Runs on the listener thread.
+
+    At most `max_open` files are kept open; the least recently used one is
+    closed when another agent needs a handle.
+    """
+
+    def __init__(self, logs_dir: Path, compressor: _RotatedFileCompressor):
+        super().__init__(logging.DEBUG)
+        settings = get_settings()
+        self.logs_dir = logs_dir
+        self.compressor = compressor
+        self.max_open = max(1, settings.log_file_max_open)
+        self.max_bytes = settings.log_file_max_bytes
+        self.rotate_when = settings.log_file_rotate_when
+        self.backup_count = settings.log_file_backup_count
+        self._handlers: "OrderedDict[str, logging.FileHandler]" = OrderedDict()
+        self._formatter = logging.Formatter(
+            "[%(asctime)s] [%(levelname)s] %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+
+    def _create_handler(self, agent_name: str) -> logging.FileHandler:
+        log_file = self.logs_dir / f"{agent_name}.log"
+        if self.rotate_when:
+            handler = TimedRotatingFileHandler(
+                log_file,
+                when=self.rotate_when,
+                backupCount=self.backup_count,
+                encoding="utf-8",
+                delay=True,
+            )
+        else:
+            handler = RotatingFileHandler(
+                log_file,
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding="utf-8",
+                delay=True,
+            )
+        handler.namer = self.compressor.namer
+        handler.rotator = self.compressor.rotator
+        handler.setFormatter(self._formatter)
+        return handler
+
+    def _get_handler(self, agent_name: str) -> logging.FileHandler:
+        handler = self._handlers.get(agent_name)
+        if handler is not None:
+            self._handlers.move_to_end(agent_name)
+            return handler
+
+        while len(self._handlers) >= self.max_open:
+            _, evicted = self._handlers.popitem(last=False)
+            evicted.close()
+
+        handler = self._create_handler(agent_name)
+        self._handlers[agent_name] = handler
+        return handler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._get_handler(record.agent_name).handle(record)
+
+    def close(self) -> None:
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
 
 class AgentFileLogger:
-    """Logger that writes to agent-specific log files in ./logs directory."""
+    """Logger that writes to agent-specific log files in ./logs directory.
+
+    Callers only enqueue records; a dedicated listener thread does the file
+    I/O, so disk stalls never block the event loop.
+    """
 
     def __init__(self):
-        self._handlers: Dict[str, logging.FileHandler] = {}
-        self._loggers: Dict[str, logging.Logger] = {}
+        self._logger: Optional[logging.Logger] = None
+        self._listener: Optional[QueueListener] = None
+        self._router: Optional[_AgentFileRouter] = None
+        self._compressor: Optional[_RotatedFileCompressor] = None
         self._initialized = False
 
     def _ensure_init(self):
@@ -21,42 +152,33 @@ class AgentFileLogger:
         settings = get_settings()
         self.logs_dir = Path(settings.logs_dir)
         self.logs_dir.mkdir(exist_ok=True)
-        self._initialized = True
-
-    def _get_logger(self, agent_name: str) -> logging.Logger:
-        """Get or create logger for agent."""
-        self._ensure_init()
-
-        if agent_name not in self._loggers:
-            log_file = self.logs_dir / f"{agent_name}.log"
-
-            # Create a unique logger for this agent
-            logger = logging.getLogger(f"agent.{agent_name}")
-            logger.setLevel(logging.DEBUG)
 
-            # Prevent propagation to root logger
-            logger.propagate = False
-
-            # Create file handler
-            handler = logging.FileHandler(log_file, encoding="utf-8")
-            handler.setLevel(logging.DEBUG)
-            handler.setFormatter(
-                logging.Formatter(
-                    "[%(asctime)s] [%(levelname)s] %(message)s",
-                    datefmt="%Y-%m-%d %H:%M:%S",
-                )
-            )
-
-            logger.addHandler(handler)
-            self._handlers[agent_name] = handler
-            self._loggers[agent_name] = logger
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        self._compressor = _RotatedFileCompressor(settings.log_file_compression)
+        self._router = _AgentFileRouter(self.logs_dir, self._compressor)
+        self._listener = QueueListener(records, self._router)
+        self._listener.start()
+
+        # One logger for all agents; the record carries the agent name
+        self._logger = logging.getLogger("agent_files")
+        self._logger.setLevel(logging.DEBUG)
+        self._logger.propagate = False
+        self._logger.handlers = [QueueHandler(records)]
+        self._initialized = True
 
-        return self._loggers[agent_name]
+    def stop(self) -> None:
+        """Flush queued records and close files."""
+        if not self._initialized:
+            return
+        self._listener.stop()
+        self._router.close()
+        self._logger.handlers = []
+        self._initialized = False
 
     def log(
         self, agent_name: str, level: str, task_id: str, message: str
     ) -> None:
-        """Write log entry to agent's log file.
+        """Queue a log entry for the agent's log file.
 
         Args:
             agent_name: Name of the agent
@@ -64,13 +186,13 @@ class AgentFileLogger:
             task_id: Task ID or 'system' for system messages
             message: Log message
         """
-        logger = self._get_logger(agent_name)
+        self._ensure_init()
         log_level = getattr(logging, level.upper(), logging.INFO)
 
         # Format message with task_id prefix
         formatted_message = f"[{task_id[:8] if len(task_id) > 8 else task_id}] {message}"
 
-        logger.log(log_level, formatted_message)
+        self._logger.log(log_level, formatted_message, extra={"agent_name": agent_name})
 
     def info(self, agent_name: str, task_id: str, message: str) -> None:
         """Log INFO level message."""
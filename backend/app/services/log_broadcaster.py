@@ -0,0 +1,75 @@
+import asyncio
+from typing import Optional, Set
+
+from ..models.log import LogDocument, LogLevel
+
+
+class LogSubscription:
+    """A single live log listener with its own bounded queue."""
+
+    def __init__(
+        self,
+        agent_name: Optional[str] = None,
+        task_id: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        maxsize: int = 1000,
+    ):
+        self.agent_name = agent_name
+        self.task_id = task_id
+        self.level = level.value if isinstance(level, LogLevel) else level
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, log: LogDocument) -> bool:
+        """Check whether a log entry passes this subscription's filters."""
+        if self.agent_name and log.agent_name != self.agent_name:
+            return False
+        if self.task_id and log.task_id != self.task_id:
+            return False
+        if self.level and log.level != self.level:
+            return False
+        return True
+
+
+class LogBroadcaster:
+    """In-process fan-out of freshly written logs to live subscribers."""
+
+    def __init__(self):
+        self._subscribers: Set[LogSubscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(
+        self,
+        agent_name: Optional[str] = None,
+        task_id: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        maxsize: int = 1000,
+    ) -> LogSubscription:
+        """Register a new subscriber."""
+        subscription = LogSubscription(agent_name, task_id, level, maxsize)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        """Remove a subscriber."""
+        self._subscribers.discard(subscription)
+
+    def publish(self, log: LogDocument) -> None:
+        """Push a log entry to every matching subscriber without blocking.
+
+        Slow consumers lose entries instead of stalling the writer.
+        """
+        for subscription in list(self._subscribers):
+            if not subscription.matches(log):
+                continue
+            try:
+                subscription.queue.put_nowait(log)
+            except asyncio.QueueFull:
+                subscription.dropped += 1
+
+
+# Singleton instance
+log_broadcaster = LogBroadcaster()
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..database import get_database
+from ..models.log import LogDocument
+from .log_service import LogService
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LogPipeline:
+    """Write-behind buffer that batches log inserts into MongoDB.
+
+    Producers enqueue into a bounded queue and return immediately; a single
+    background task flushes with insert_many when a batch fills up or the
+    flush interval elapses. On overflow the "drop" policy discards new
+    entries (counted in `dropped`), "block" makes producers wait for room.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._log_service: Optional[LogService] = None
+        self._stopping = False
+        self.batch_size = 200
+        self.flush_interval = 0.5
+        self.overflow_policy = "drop"
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Start the background flusher. Call from the running event loop."""
+        if self.running:
+            return
+        settings = get_settings()
+        self.batch_size = settings.log_batch_size
+        self.flush_interval = settings.log_flush_interval_sec
+        self.overflow_policy = settings.log_overflow_policy
+        self._queue = asyncio.Queue(maxsize=settings.log_queue_size)
+        self._log_service = LogService(db)
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Log pipeline started (queue={settings.log_queue_size}, "
+            f"batch={self.batch_size}, interval={self.flush_interval}s, "
+            f"overflow={self.overflow_policy})"
+        )
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the background flusher."""
+        if not self.running:
+            return
+        self._stopping = True
+        await self._worker
+        self._worker = None
+        logger.info(
+            f"Log pipeline stopped (written={self.written}, "
+            f"dropped={self.dropped}, failed={self.failed})"
+        )
+
+    async def submit(self, log: LogDocument) -> None:
+        """Queue a log entry for persistence.
+
+        Without a running pipeline (scripts, tests) the entry is written
+        directly.
+        """
+        if not self.running or self._stopping:
+            await LogService(get_database()).create_logs([log])
+            return
+
+        if self.overflow_policy == "block":
+            await self._queue.put(log)
+            return
+
+        try:
+            self._queue.put_nowait(log)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Log queue full, dropped {self.dropped} entries so far")
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+            elif self._stopping:
+                return
+
+    async def _collect_batch(self) -> List[LogDocument]:
+        """Gather entries until the batch is full or one flush interval has passed.
+
+        The interval starts right away, not at the first entry, so an idle
+        queue yields an empty batch every interval; that's when _run notices
+        shutdown.
+        """
+        batch: List[LogDocument] = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # Drain without waiting once shutdown has started
+        while self._stopping and len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[LogDocument]) -> None:
+        try:
+            await self._log_service.create_logs(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} logs to MongoDB: {e}")
+
+
+# Singleton instance
+log_pipeline = LogPipeline()
+metrics.log_queue_depth.set_function(lambda: log_pipeline.queue_depth)
@@ -1,20 +1,51 @@
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from ..models.log import LogDocument, LogLevel
+from ..database import db as database, delete_in_batches
+from ..models.log import TIMESERIES_META_FIELDS, LogDocument, LogLevel
+from . import metrics
+from .pagination import keyset_filter, split_page
 
 logger = logging.getLogger(__name__)
 
+# Newest first, log_id as tie-breaker; matches the (..., timestamp, log_id) indexes
+LIST_SORT = [("timestamp", -1), ("log_id", -1)]
+
+# Fields of a log list entry (schemas.log.LogResponse), in response order
+ROW_FIELDS = ("log_id", "task_id", "agent_name", "level", "message", "timestamp")
+
+
+def log_row(doc: dict) -> dict:
+    """Shape a projected log document, in either layout, like LogResponse."""
+    if "meta" in doc:
+        doc = {**doc, **doc["meta"]}
+    return {name: doc.get(name) for name in ROW_FIELDS}
+
 
 class LogService:
-    """Service for log operations with MongoDB."""
+    """Service for log operations with MongoDB.
 
-    def __init__(self, db: AsyncIOMotorDatabase):
+    Works with both the regular `logs` layout and the time-series one, where
+    agent_name/task_id/level live under the `meta` field.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, timeseries: Optional[bool] = None):
         self.collection = db.logs
+        self.timeseries = database.logs_timeseries if timeseries is None else timeseries
+
+    def _field(self, name: str) -> str:
+        """Storage path of a log field in the current layout."""
+        if self.timeseries and name in TIMESERIES_META_FIELDS:
+            return f"meta.{name}"
+        return name
 
+    def _to_storage(self, log: LogDocument) -> dict:
+        return log.to_timeseries() if self.timeseries else log.to_mongo()
+
+    @metrics.observe_mongo("logs", "create_log")
     async def create_log(
         self,
         agent_name: str,
@@ -31,9 +62,20 @@ class LogService:
             task_id=task_id,
             metadata=metadata or {},
         )
-        await self.collection.insert_one(log.to_mongo())
+        await self.collection.insert_one(self._to_storage(log))
         return log
 
+    @metrics.observe_mongo("logs", "create_logs")
+    async def create_logs(self, logs: List[LogDocument]) -> int:
+        """Insert a batch of prepared log entries in one round trip."""
+        if not logs:
+            return 0
+        result = await self.collection.insert_many(
+            [self._to_storage(log) for log in logs], ordered=False
+        )
+        return len(result.inserted_ids)
+
+    @metrics.observe_mongo("logs", "list_logs")
     async def list_logs(
         self,
         agent_name: Optional[str] = None,
@@ -41,34 +83,131 @@ class LogService:
         level: Optional[LogLevel] = None,
         since: Optional[datetime] = None,
         limit: int = 100,
+        cursor: Optional[str] = None,
     ) -> List[LogDocument]:
-        """List logs with optional filters."""
-        query = {}
+        """List logs with optional filters, newest first."""
+        query = self._list_query(agent_name, task_id, level, since, cursor)
+        docs = self.collection.find(query).sort(LIST_SORT).limit(limit)
+        logs = []
+        async for doc in docs:
+            log = LogDocument.from_mongo(doc)
+            if log:
+                logs.append(log)
+        return logs
+
+    @metrics.observe_mongo("logs", "list_logs_page")
+    async def list_logs_page(
+        self,
+        agent_name: Optional[str] = None,
+        task_id: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        since: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """List one page of logs plus the cursor of the next page.
+
+        Fetches only the response fields and returns them as plain dicts
+        shaped like LogResponse, ready to serialize without a model round trip.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        query = self._list_query(agent_name, task_id, level, since, cursor)
+        projection = {"_id": 0, **{self._field(name): 1 for name in ROW_FIELDS}}
+        docs = self.collection.find(query, projection).sort(LIST_SORT).limit(limit + 1)
+        rows = [log_row(doc) async for doc in docs]
+        return split_page(rows, limit, lambda log: (log["timestamp"], log["log_id"]))
+
+    async def iter_logs(
+        self,
+        agent_name: Optional[str] = None,
+        task_id: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[LogDocument]:
+        """Iterate over all matching logs, oldest first, one cursor batch in memory at a time."""
+        query = self._list_query(agent_name, task_id, level, since)
+        if until:
+            query.setdefault("timestamp", {})["$lt"] = until
+        docs = (
+            self.collection.find(query, {"_id": 0})
+            .sort([("timestamp", 1), ("log_id", 1)])
+            .batch_size(batch_size)
+        )
+        async for doc in docs:
+            log = LogDocument.from_mongo(doc)
+            if log:
+                yield log
 
+    @metrics.observe_mongo("logs", "list_log_ids")
+    async def list_log_ids(
+        self,
+        agent_name: Optional[str] = None,
+        task_id: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        since: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[str]:
+        """List only the log IDs of the rows list_logs returns.
+
+        Logs are immutable, so the IDs fully identify the page content.
+        """
+        query = self._list_query(agent_name, task_id, level, since, cursor)
+        docs = (
+            self.collection.find(query, {"_id": 0, "log_id": 1})
+            .sort(LIST_SORT)
+            .limit(limit)
+        )
+        return [doc["log_id"] async for doc in docs]
+
+    def _list_query(
+        self,
+        agent_name: Optional[str] = None,
+        task_id: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        query = {}
         if agent_name:
-            query["agent_name"] = agent_name
+            query[self._field("agent_name")] = agent_name
         if task_id:
-            query["task_id"] = task_id
+            query[self._field("task_id")] = task_id
         if level:
-            query["level"] = level.value if isinstance(level, LogLevel) else level
+            query[self._field("level")] = level.value if isinstance(level, LogLevel) else level
         if since:
             query["timestamp"] = {"$gte": since}
+        if cursor:
+            query.update(keyset_filter("timestamp", "log_id", cursor))
+        return query
 
-        cursor = self.collection.find(query).sort("timestamp", -1).limit(limit)
-        logs = []
-        async for doc in cursor:
-            log = LogDocument.from_mongo(doc)
-            if log:
-                logs.append(log)
-        return logs
-
-    async def delete_old_logs(self, days: int = 7) -> int:
-        """Delete logs older than specified days."""
+    @metrics.observe_mongo("logs", "delete_old_logs")
+    async def delete_old_logs(
+        self,
+        days: int = 7,
+        level: Optional[LogLevel] = None,
+        batch_size: int = 1000,
+        pause_sec: float = 0.0,
+    ) -> int:
+        """Delete logs older than specified days, optionally of one level only."""
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-        result = await self.collection.delete_many({"timestamp": {"$lt": cutoff}})
-        logger.info(f"Deleted {result.deleted_count} old logs")
-        return result.deleted_count
+        query = {"timestamp": {"$lt": cutoff}}
+        if level:
+            query[self._field("level")] = level.value if isinstance(level, LogLevel) else level
+
+        if self.timeseries:
+            # Meta + time filters delete whole buckets, which is already cheap
+            deleted = (await self.collection.delete_many(query)).deleted_count
+        else:
+            deleted = await delete_in_batches(self.collection, query, batch_size, pause_sec)
+        logger.info(f"Deleted {deleted} old logs")
+        return deleted
 
+    @metrics.observe_mongo("logs", "get_log")
     async def get_log(self, log_id: str) -> Optional[LogDocument]:
         """Get a single log by ID."""
         doc = await self.collection.find_one({"log_id": log_id})
@@ -0,0 +1,120 @@
+import os
+import time
+from functools import wraps
+from typing import FrozenSet, Set
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from ..config import get_settings
+
+# Label values are bounded: agent names only for existing agent directories
+# and at most `metrics_max_agents` of them, never task IDs
+UNKNOWN_AGENT = "unknown"
+OTHER_AGENT = "other"
+_agent_labels: Set[str] = set()
+
+# Agent directories, listed again on a miss at most this often: label lookups
+# run on the event loop and mustn't stat the filesystem every time
+AGENT_DIRS_REFRESH_SEC = 30.0
+_agent_dirs: FrozenSet[str] = frozenset()
+_agent_dirs_listed = ("", float("-inf"))  # (agents_dir, monotonic time)
+
+# Seconds; covers sub-ms Mongo calls up to multi-minute CLI runs
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+tasks_submitted = Counter(
+    "claude_tasks_submitted_total", "Tasks accepted by POST /api/run", ["agent"]
+)
+tasks_finished = Counter(
+    "claude_tasks_finished_total", "Tasks reaching a terminal status", ["agent", "status"]
+)
+task_duration = Histogram(
+    "claude_task_duration_seconds", "Run time of finished tasks", ["agent", "status"],
+    buckets=SLOW_BUCKETS,
+)
+tasks_waiting = Gauge(
+    "claude_tasks_waiting", "Tasks waiting for a free execution slot"
+)
+running_processes_gauge = Gauge(
+    "claude_running_processes", "Claude CLI processes currently running"
+)
+execution_slots_free = Gauge(
+    "claude_execution_slots_free", "Free execution slots (+Inf when unlimited)"
+)
+spawn_latency = Histogram(
+    "claude_process_spawn_seconds", "Time to start the Claude CLI process", ["agent"],
+    buckets=FAST_BUCKETS,
+)
+first_output_latency = Histogram(
+    "claude_time_to_first_output_seconds", "Process start to first stdout bytes", ["agent"],
+    buckets=SLOW_BUCKETS,
+)
+mongo_latency = Histogram(
+    "claude_mongo_operation_seconds", "MongoDB operation latency by service method",
+    ["collection", "operation"],
+    buckets=FAST_BUCKETS,
+)
+mongo_errors = Counter(
+    "claude_mongo_operation_errors_total", "MongoDB operations that raised",
+    ["collection", "operation"],
+)
+auth_requests = Counter(
+    "claude_auth_requests_total", "API key checks by outcome", ["result"]
+)
+task_cache_requests = Counter(
+    "claude_task_cache_requests_total", "Task status cache lookups by outcome (hit/miss)", ["result"]
+)
+log_queue_depth = Gauge(
+    "claude_log_queue_depth", "Log entries waiting in the write-behind queue"
+)
+
+
+def _is_agent(agent_name: str, agents_dir: str) -> bool:
+    global _agent_dirs, _agent_dirs_listed
+    listed_dir, listed_at = _agent_dirs_listed
+    if listed_dir == agents_dir and agent_name in _agent_dirs:
+        return True
+    now = time.monotonic()
+    if listed_dir == agents_dir and now - listed_at < AGENT_DIRS_REFRESH_SEC:
+        return False
+    try:
+        with os.scandir(agents_dir) as entries:
+            _agent_dirs = frozenset(entry.name for entry in entries if entry.is_dir())
+    except OSError:
+        _agent_dirs = frozenset()
+    _agent_dirs_listed = (agents_dir, now)
+    return agent_name in _agent_dirs
+
+
+def agent_label(agent_name: str) -> str:
+    """Bounded label value for an agent name."""
+    if agent_name in _agent_labels:
+        return agent_name
+    settings = get_settings()
+    if not agent_name or not _is_agent(agent_name, settings.agents_dir):
+        return UNKNOWN_AGENT
+    if len(_agent_labels) >= settings.metrics_max_agents:
+        return OTHER_AGENT
+    _agent_labels.add(agent_name)
+    return agent_name
+
+
+def observe_mongo(collection: str, operation: str):
+    """Decorator timing an async service method into claude_mongo_operation_seconds."""
+    histogram = mongo_latency.labels(collection, operation)
+    errors = mongo_errors.labels(collection, operation)
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def encode_cursor(sort_value: datetime, id_value: str) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque cursor."""
+    raw = json.dumps([sort_value.isoformat(), id_value], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, id_value = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), str(id_value)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_filter(sort_field: str, id_field: str, cursor: str) -> dict:
+    """Build the filter for the page after `cursor` in (sort_field, id_field) DESC order.
+
+    Matches the compound indexes on (..., sort_field: -1, id_field: -1), so
+    every page is a single index range scan regardless of depth.
+    """
+    sort_value, id_value = decode_cursor(cursor)
+    return {
+        "$or": [
+            {sort_field: {"$lt": sort_value}},
+            {sort_field: sort_value, id_field: {"$lt": id_value}},
+        ]
+    }
+
+
+def split_page(
+    items: List[T],
+    limit: int,
+    key: Callable[[T], Tuple[datetime, str]],
+) -> Tuple[List[T], Optional[str]]:
+    """Trim a `limit + 1` fetch to one page and derive the next cursor."""
+    if len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    return page, encode_cursor(*key(page[-1]))
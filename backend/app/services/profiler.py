@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames kept per sample; deeper stacks are cut at the root side
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+
+def _collapse(frame) -> str:
+    """One stack in collapsed format: root;...;leaf."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def sample_stacks(
+    seconds: float, interval: float, thread_ids: Optional[set] = None
+) -> Dict[str, int]:
+    """Sample thread stacks every `interval` for `seconds`, blocking the caller.
+
+    Run it in a worker thread: it only reads sys._current_frames(), so the
+    sampled threads (e.g. the event loop) aren't slowed down beyond the GIL
+    hand-offs. Returns collapsed stack -> sample count, with the thread name
+    as the root frame.
+    """
+    own = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    counts: Counter = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (thread_ids is not None and ident not in thread_ids):
+                continue
+            thread = names.get(ident) or f"thread-{ident}"
+            counts[f"{thread};{_collapse(frame)}"] += 1
+        time.sleep(interval)
+    return dict(counts)
+
+
+def format_collapsed(counts: Dict[str, int]) -> str:
+    """Brendan Gregg's collapsed format, for flamegraph.pl or speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+# Lag samples kept for readiness checks (at 50ms that's the last ~30s)
+LAG_HISTORY = 600
+
+
+class LoopMonitor:
+    """Event loop lag sampler and watchdog for code blocking the loop.
+
+    A heartbeat coroutine wakes every `interval` and records how late it
+    woke up (the loop lag, read by /health/ready). With a stall threshold, a
+    daemon thread also checks the heartbeat and, if the loop hasn't come
+    back for longer than the threshold, logs the loop thread's current stack
+    once per stall. That stack is the callback holding the loop (a sync file
+    write, a big JSON dump, ...), which asyncio's debug mode would only name
+    after the fact.
+    """
+
+    def __init__(self):
+        self.threshold = 0.0
+        self.interval = 0.05
+        self.stalls = 0
+        self._lags: Deque[Tuple[float, float]] = deque(maxlen=LAG_HISTORY)
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None and not self._heartbeat.done()
+
+    @property
+    def loop_thread_id(self) -> Optional[int]:
+        return self._loop_thread_id
+
+    def recent_lag(self, window: float) -> Optional[float]:
+        """Worst loop lag in seconds over the last `window` seconds."""
+        since = time.monotonic() - window
+        lags = [lag for at, lag in self._lags if at >= since]
+        return max(lags) if lags else None
+
+    def start(self, threshold_ms: int) -> None:
+        """Start sampling the running loop. Call from the loop.
+
+        threshold_ms <= 0 keeps the lag sampler but turns the stall logger off.
+        """
+        if self.running:
+            return
+        self.threshold = max(threshold_ms, 0) / 1000
+        self.interval = min(0.05, self.threshold / 2) if self.threshold else 0.05
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._lags.clear()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._beat())
+        if self.threshold:
+            self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+            self._thread.start()
+        logger.info(f"Loop monitor started (stall threshold={threshold_ms}ms)")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._heartbeat.cancel()
+        try:
+            await self._heartbeat
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    async def _beat(self) -> None:
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._lags.append((now, max(0.0, now - self._last_beat - self.interval)))
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>\n"
+            logger.warning(
+                f"Event loop blocked for {blocked * 1000:.0f}ms+, current stack:\n{stack.rstrip()}"
+            )
+
+
+# Singleton instance
+loop_monitor = LoopMonitor()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config import get_settings
+from ..models.stats import StatsGranularity
+from ..schemas.retention import RetentionStatusResponse
+from .log_service import LogService
+from .stats_service import StatsService
+from .task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionService:
+    """Scheduled, batched purge of old logs, finished tasks and minute rollups.
+
+    Policies come from settings (days per log level / task status). Purged
+    volumes are counted per scope, e.g. "logs.debug" or "tasks.completed";
+    tasks moved to the cold archive count as "archive.tasks".
+    """
+
+    def __init__(self):
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.runs = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_sec: Optional[float] = None
+        self.last_purged: Dict[str, int] = {}
+        self.total_purged: Counter = Counter()
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Start the periodic purge loop. Call from the running event loop."""
+        self._db = db
+        if not get_settings().retention_enabled or self._worker is not None:
+            return
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _run(self) -> None:
+        interval = get_settings().retention_interval_sec
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception(f"Retention purge failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def run_once(self) -> Dict[str, int]:
+        """Apply every retention policy once and return purged counts per scope."""
+        async with self._lock:
+            settings = get_settings()
+            batch = dict(
+                batch_size=settings.retention_batch_size,
+                pause_sec=settings.retention_batch_pause_sec,
+            )
+            started = time.monotonic()
+            purged: Dict[str, int] = {}
+
+            log_service = LogService(self._db)
+            for level, days in settings.log_retention_days.items():
+                purged[f"logs.{level.value}"] = await log_service.delete_old_logs(
+                    days=days, level=level, **batch
+                )
+
+            task_service = TaskService(self._db)
+            if settings.archive_after_days:
+                purged["archive.tasks"] = await task_service.archive_finished_tasks(
+                    days=settings.archive_after_days, **batch
+                )
+            for status, days in settings.task_retention_days.items():
+                purged[f"tasks.{status.value}"] = await task_service.delete_finished_tasks(
+                    status=status, days=days, **batch
+                )
+
+            if settings.stats_minute_retention_days:
+                cutoff = datetime.now(timezone.utc) - timedelta(days=settings.stats_minute_retention_days)
+                purged["stats.minute"] = await StatsService(self._db).delete_buckets_before(
+                    StatsGranularity.MINUTE, cutoff
+                )
+
+            self.runs += 1
+            self.last_run_at = datetime.now(timezone.utc)
+            self.last_duration_sec = round(time.monotonic() - started, 3)
+            self.last_purged = purged
+            self.total_purged.update(purged)
+
+            if any(purged.values()):
+                logger.info(f"Retention purge finished in {self.last_duration_sec}s: {purged}")
+            return purged
+
+    def status(self) -> RetentionStatusResponse:
+        settings = get_settings()
+        return RetentionStatusResponse(
+            enabled=settings.retention_enabled,
+            interval_sec=settings.retention_interval_sec,
+            log_retention_days={level.value: days for level, days in settings.log_retention_days.items()},
+            task_retention_days={status.value: days for status, days in settings.task_retention_days.items()},
+            stats_minute_retention_days=settings.stats_minute_retention_days,
+            archive_after_days=settings.archive_after_days,
+            runs=self.runs,
+            last_run_at=self.last_run_at,
+            last_duration_sec=self.last_duration_sec,
+            last_purged=self.last_purged,
+            total_purged=dict(self.total_purged),
+        )
+
+
+# Singleton instance
+retention_service = RetentionService()
@@ -0,0 +1,132 @@
+import logging
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..database import db as database
+from ..models.log import LogLevel
+from ..models.task import TaskStatus
+from ..schemas.search import SearchHit, SearchScope
+
+logger = logging.getLogger(__name__)
+
+TEXT_SCORE = {"$meta": "textScore"}
+
+
+def _time_range(field: str, since: Optional[datetime], until: Optional[datetime]) -> dict:
+    bounds = {}
+    if since:
+        bounds["$gte"] = since
+    if until:
+        bounds["$lt"] = until
+    return {field: bounds} if bounds else {}
+
+
+class SearchService:
+    """Full-text search over task prompts/results and log messages.
+
+    Backed by MongoDB text indexes, ranked by text score. Time-series log
+    collections can't carry a text index, so there log search falls back to
+    a case-insensitive match within the requested time window.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.tasks = db.tasks
+        self.logs = db.logs
+        self.logs_timeseries = database.logs_timeseries
+
+    async def search_tasks(
+        self,
+        text: str,
+        agent_name: Optional[str] = None,
+        status: Optional[TaskStatus] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        skip: int = 0,
+    ) -> Tuple[List[SearchHit], bool]:
+        """Rank tasks whose prompt or result match; returns hits and has_more."""
+        query = {"$text": {"$search": text}, **_time_range("created_at", since, until)}
+        if agent_name:
+            query["agent_name"] = agent_name
+        if status:
+            query["status"] = TaskStatus(status).value
+
+        projection = {
+            "_id": 0,
+            "task_id": 1,
+            "agent_name": 1,
+            "status": 1,
+            "created_at": 1,
+            "metadata.prompt_preview": 1,
+            "score": TEXT_SCORE,
+        }
+        cursor = (
+            self.tasks.find(query, projection)
+            .sort([("score", TEXT_SCORE), ("created_at", -1)])
+            .skip(skip)
+            .limit(limit + 1)
+        )
+        hits = [
+            SearchHit(
+                kind=SearchScope.TASKS,
+                id=doc["task_id"],
+                agent_name=doc["agent_name"],
+                task_id=doc["task_id"],
+                status=doc["status"],
+                timestamp=doc["created_at"],
+                score=doc.get("score"),
+                snippet=(doc.get("metadata") or {}).get("prompt_preview"),
+            )
+            async for doc in cursor
+        ]
+        return hits[:limit], len(hits) > limit
+
+    async def search_logs(
+        self,
+        text: str,
+        agent_name: Optional[str] = None,
+        task_id: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        skip: int = 0,
+    ) -> Tuple[List[SearchHit], bool]:
+        """Rank log entries whose message matches; returns hits and has_more."""
+        prefix = "meta." if self.logs_timeseries else ""
+        query = _time_range("timestamp", since, until)
+        if agent_name:
+            query[f"{prefix}agent_name"] = agent_name
+        if task_id:
+            query[f"{prefix}task_id"] = task_id
+        if level:
+            query[f"{prefix}level"] = LogLevel(level).value
+
+        projection = {"_id": 0, "message": 1, "log_id": 1, "timestamp": 1}
+        if self.logs_timeseries:
+            query["message"] = {"$regex": re.escape(text), "$options": "i"}
+            projection["meta"] = 1
+            sort = [("timestamp", -1)]
+        else:
+            query["$text"] = {"$search": text}
+            projection.update(agent_name=1, task_id=1, level=1, score=TEXT_SCORE)
+            sort = [("score", TEXT_SCORE), ("timestamp", -1)]
+
+        cursor = self.logs.find(query, projection).sort(sort).skip(skip).limit(limit + 1)
+        hits = []
+        async for doc in cursor:
+            fields = doc.get("meta") or doc
+            hits.append(SearchHit(
+                kind=SearchScope.LOGS,
+                id=doc["log_id"],
+                agent_name=fields["agent_name"],
+                task_id=fields.get("task_id"),
+                level=fields.get("level"),
+                timestamp=doc["timestamp"],
+                score=doc.get("score"),
+                snippet=doc["message"],
+            ))
+        return hits[:limit], len(hits) > limit
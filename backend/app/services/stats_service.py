@@ -0,0 +1,174 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..models.stats import (
+    DEFAULT_MODEL,
+    DURATION_BUCKETS,
+    StatsGranularity,
+    bucket_start,
+    duration_bucket,
+)
+from ..models.task import TaskStatus
+from ..schemas.stats import AgentStats, StatsBucket, StatsResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(histogram: List[int], max_duration: Optional[float], fraction: float) -> Optional[float]:
+    """Estimate a percentile as the upper bound of the histogram bin that reaches it."""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    threshold = fraction * total
+    running = 0
+    for index, count in enumerate(histogram):
+        running += count
+        if running >= threshold:
+            if index < len(DURATION_BUCKETS):
+                upper = DURATION_BUCKETS[index]
+                return min(upper, max_duration) if max_duration is not None else upper
+            return max_duration
+    return max_duration
+
+
+class StatsService:
+    """Incrementally maintained per-agent/per-model rollups of finished tasks.
+
+    Each terminal transition increments one document per granularity in the
+    `task_stats` collection, so reads cost O(buckets) instead of a scan of
+    `tasks`.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.task_stats
+
+    async def record(
+        self,
+        agent_name: str,
+        model: Optional[str],
+        status: TaskStatus,
+        duration_sec: Optional[float],
+        finished_at: Optional[datetime] = None,
+    ) -> None:
+        """Add one finished task to the minute and hour buckets."""
+        finished_at = finished_at or datetime.now(timezone.utc)
+        status_value = status.value if isinstance(status, TaskStatus) else status
+
+        inc = {"total": 1, f"by_status.{status_value}": 1}
+        update = {"$inc": inc}
+        if duration_sec is not None:
+            inc["duration_sum"] = duration_sec
+            inc["duration_count"] = 1
+            inc[f"hist.{duration_bucket(duration_sec)}"] = 1
+            update["$max"] = {"duration_max": duration_sec}
+
+        # Independent upserts, issued concurrently
+        await asyncio.gather(*[
+            self.collection.update_one(
+                {
+                    "granularity": granularity.value,
+                    "agent_name": agent_name,
+                    "model": model or DEFAULT_MODEL,
+                    "bucket": bucket_start(finished_at, granularity),
+                },
+                update,
+                upsert=True,
+            )
+            for granularity in StatsGranularity
+        ])
+
+    async def delete_buckets_before(
+        self, granularity: StatsGranularity, cutoff: datetime
+    ) -> int:
+        """Drop rollup buckets of one granularity older than cutoff."""
+        result = await self.collection.delete_many(
+            {"granularity": granularity.value, "bucket": {"$lt": cutoff}}
+        )
+        return result.deleted_count
+
+    async def get_stats(
+        self,
+        since: datetime,
+        until: datetime,
+        granularity: StatsGranularity = StatsGranularity.HOUR,
+        agent_name: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> StatsResponse:
+        """Aggregate rollup buckets in [since, until) into per-agent stats and a time series."""
+        query = {
+            "granularity": granularity.value,
+            "bucket": {
+                "$gte": bucket_start(since, granularity),
+                "$lt": until,
+            },
+        }
+        if agent_name:
+            query["agent_name"] = agent_name
+        if model:
+            query["model"] = model
+
+        groups: Dict[tuple, dict] = {}
+        series: Dict[datetime, dict] = {}
+        hist_size = len(DURATION_BUCKETS) + 1
+
+        async for doc in self.collection.find(query, {"_id": 0}).sort("bucket", 1):
+            key = (doc["agent_name"], doc["model"])
+            group = groups.setdefault(key, {
+                "total": 0,
+                "by_status": defaultdict(int),
+                "duration_sum": 0.0,
+                "duration_count": 0,
+                "duration_max": None,
+                "hist": [0] * hist_size,
+            })
+            point = series.setdefault(doc["bucket"], {"total": 0, "by_status": defaultdict(int)})
+
+            group["total"] += doc.get("total", 0)
+            point["total"] += doc.get("total", 0)
+            for status, count in (doc.get("by_status") or {}).items():
+                group["by_status"][status] += count
+                point["by_status"][status] += count
+
+            group["duration_sum"] += doc.get("duration_sum", 0.0)
+            group["duration_count"] += doc.get("duration_count", 0)
+            if doc.get("duration_max") is not None:
+                group["duration_max"] = max(group["duration_max"] or 0.0, doc["duration_max"])
+            for index, count in (doc.get("hist") or {}).items():
+                group["hist"][int(index)] += count
+
+        window_min = max((until - since).total_seconds() / 60, 1 / 60)
+        agents = []
+        for (group_agent, group_model), group in sorted(groups.items()):
+            by_status = dict(group["by_status"])
+            completed = by_status.get(TaskStatus.COMPLETED.value, 0)
+            agents.append(AgentStats(
+                agent_name=group_agent,
+                model=group_model,
+                total=group["total"],
+                by_status=by_status,
+                success_rate=round(completed / group["total"], 4) if group["total"] else None,
+                avg_duration_sec=(
+                    round(group["duration_sum"] / group["duration_count"], 2)
+                    if group["duration_count"] else None
+                ),
+                p50_duration_sec=_percentile(group["hist"], group["duration_max"], 0.50),
+                p95_duration_sec=_percentile(group["hist"], group["duration_max"], 0.95),
+                max_duration_sec=group["duration_max"],
+                throughput_per_min=round(group["total"] / window_min, 4),
+            ))
+
+        return StatsResponse(
+            granularity=granularity,
+            since=since,
+            until=until,
+            agents=agents,
+            series=[
+                StatsBucket(bucket=bucket, total=point["total"], by_status=dict(point["by_status"]))
+                for bucket, point in sorted(series.items())
+            ],
+        )
@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..models.task import TaskDocument
+
+logger = logging.getLogger(__name__)
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    agent_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+)
+"""
+
+# One index connection per archive directory, shared by all TaskArchive
+# instances (TaskService is built per request); the lock serializes use
+# across worker threads
+_indexes: Dict[Path, Tuple[sqlite3.Connection, threading.Lock]] = {}
+_indexes_lock = threading.Lock()
+
+# While there's no archive, lookups don't stat the disk on every miss; the
+# index file is looked for again at most this often (another worker may
+# archive first)
+ABSENT_RECHECK_SEC = 10.0
+_absent_until: Dict[Path, float] = {}
+
+
+def _open_index(path: Path) -> Tuple[sqlite3.Connection, threading.Lock]:
+    with _indexes_lock:
+        if path not in _indexes:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute(INDEX_SCHEMA)
+            conn.commit()
+            _indexes[path] = (conn, threading.Lock())
+        return _indexes[path]
+
+
+class TaskArchive:
+    """Cold storage for finished tasks on local disk.
+
+    Tasks are written as gzipped JSON lines partitioned by creation date
+    (`tasks/date=YYYY-MM-DD/part-<id>.jsonl.gz`, one part per archive
+    batch). A SQLite index maps task_id to its part file and line, so a
+    lookup decompresses a single part. All file work runs in worker threads;
+    lookups skip the thread hop entirely while no archive exists.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.sqlite"
+
+    @property
+    def exists(self) -> bool:
+        if self.index_path in _indexes:
+            return True
+        now = time.monotonic()
+        if now < _absent_until.get(self.index_path, 0.0):
+            return False
+        if self.index_path.exists():
+            return True
+        _absent_until[self.index_path] = now + ABSENT_RECHECK_SEC
+        return False
+
+    def _write(self, tasks: List[TaskDocument]) -> None:
+        partitions: Dict[str, List[TaskDocument]] = defaultdict(list)
+        for task in tasks:
+            partitions[task.created_at.date().isoformat()].append(task)
+
+        rows = []
+        for day, day_tasks in sorted(partitions.items()):
+            part_dir = self.directory / "tasks" / f"date={day}"
+            part_dir.mkdir(parents=True, exist_ok=True)
+            path = part_dir / f"part-{uuid.uuid4().hex}.jsonl.gz"
+            tmp = path.with_suffix(".tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                for line, task in enumerate(day_tasks):
+                    f.write(task.model_dump_json() + "\n")
+                    rows.append((
+                        task.task_id,
+                        str(path.relative_to(self.directory)),
+                        line,
+                        task.agent_name,
+                        task.status,
+                        task.created_at.isoformat(),
+                        task.updated_at.isoformat(),
+                    ))
+            tmp.replace(path)
+
+        # Index last: a task is only "archived" once its part file is complete
+        conn, lock = _open_index(self.index_path)
+        with lock, conn:
+            conn.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _lookup(self, task_id: str, columns: str) -> Optional[tuple]:
+        conn, lock = _open_index(self.index_path)
+        with lock:
+            return conn.execute(
+                f"SELECT {columns} FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+
+    def _delete(self, task_id: str) -> Optional[TaskDocument]:
+        """Drop a task's line from its part file and its index row."""
+        task = self._read(task_id)
+        if task is None:
+            return None
+        conn, lock = _open_index(self.index_path)
+        with lock:
+            row = conn.execute("SELECT path, line FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return None
+            path, target = row
+            part = self.directory / path
+            with gzip.open(part, "rt", encoding="utf-8") as f:
+                lines = [text for line, text in enumerate(f) if line != target]
+            if lines:
+                tmp = part.with_suffix(".tmp")
+                with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                    f.writelines(lines)
+                tmp.replace(part)
+            else:
+                part.unlink()
+            with conn:
+                conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+                conn.execute("UPDATE tasks SET line = line - 1 WHERE path = ? AND line > ?", (path, target))
+        return task
+
+    def _read(self, task_id: str) -> Optional[TaskDocument]:
+        row = self._lookup(task_id, "path, line")
+        if row is None:
+            return None
+        path, target = row
+        with gzip.open(self.directory / path, "rt", encoding="utf-8") as f:
+            for line, text in enumerate(f):
+                if line == target:
+                    return TaskDocument.model_validate_json(text)
+        logger.error(f"Task {task_id}: Archive index points past the end of {path}")
+        return None
+
+    async def write(self, tasks: List[TaskDocument]) -> None:
+        """Append tasks to the archive."""
+        if tasks:
+            await asyncio.to_thread(self._write, tasks)
+
+    async def get_task(self, task_id: str) -> Optional[TaskDocument]:
+        """Load an archived task, None if it isn't archived."""
+        if not self.exists:
+            return None
+        return await asyncio.to_thread(self._read, task_id)
+
+    async def get_task_version(self, task_id: str) -> Optional[datetime]:
+        """Archived task's updated_at from the index alone."""
+        if not self.exists:
+            return None
+        row = await asyncio.to_thread(self._lookup, task_id, "updated_at")
+        return datetime.fromisoformat(row[0]) if row else None
+
+    async def delete(self, task_id: str) -> Optional[TaskDocument]:
+        """Remove an archived task for good; returns it, None if it isn't archived.
+
+        Its part file is rewritten without it, so nothing of the task stays on disk.
+        """
+        if not self.exists:
+            return None
+        return await asyncio.to_thread(self._delete, task_id)
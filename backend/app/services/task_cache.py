@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure
+
+from ..models.task import TaskDocument
+from ..models.values import normalize
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Tasks carrying more text than this (prompt + result + error chars) aren't
+# cached, so a few huge results can't pin memory
+MAX_CACHED_CHARS = 256 * 1024
+
+
+class TaskCache:
+    """In-process LRU+TTL cache of task documents for status reads.
+
+    Write-through: TaskService puts new tasks in and applies every status
+    transition it makes to the cached copy, so active tasks are served
+    without a database read. Cached values look exactly like a fresh read
+    (naive UTC datetimes, ms precision), so ETags don't change with the
+    source. With several workers, a MongoDB change stream on `tasks` drops
+    entries that other processes modify; without one, TTL bounds staleness.
+    Off (size 0) until start() is called from the app lifespan.
+    """
+
+    def __init__(self):
+        self.max_size = 0
+        self.ttl = 0.0
+        # task_id -> (task, expires_at, _id)
+        self._entries: "OrderedDict[str, Tuple[TaskDocument, float, Any]]" = OrderedDict()
+        # MongoDB _id -> task_id, for change stream events (they carry only _id)
+        self._ids: Dict[Any, str] = {}
+        self._watcher: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self, max_size: int, ttl: float, watch: Optional[AsyncIOMotorCollection] = None) -> None:
+        """Enable the cache; with `watch`, follow that collection's change stream."""
+        self.max_size = max_size
+        self.ttl = ttl
+        if self.enabled and watch is not None and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch(watch))
+        if self.enabled:
+            logger.info(f"Task cache enabled (size={max_size}, ttl={ttl}s, watch={watch is not None})")
+
+    async def stop(self) -> None:
+        if self._watcher:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        self.clear()
+        self.max_size = 0
+
+    def get(self, task_id: str) -> Optional[TaskDocument]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(task_id)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                self.invalidate(task_id)
+            metrics.task_cache_requests.labels("miss").inc()
+            return None
+        self._entries.move_to_end(task_id)
+        metrics.task_cache_requests.labels("hit").inc()
+        return entry[0].model_copy()
+
+    def put(self, task: TaskDocument, _id: Any = None) -> None:
+        """Cache a task as stored (datetimes normalized like a database read)."""
+        if not self.enabled:
+            return
+        size = len(task.prompt) + len(task.result or "") + len(task.error or "")
+        if size > MAX_CACHED_CHARS:
+            self.invalidate(task.task_id)
+            return
+        stored = TaskDocument.model_construct(**normalize(dict(task)))
+        self._set(task.task_id, stored, _id)
+
+    def apply(self, task_id: str, changes: dict) -> None:
+        """Apply a successful update to the cached copy, if there is one."""
+        entry = self._entries.get(task_id) if self.enabled else None
+        if entry is None:
+            return
+        task, _, _id = entry
+        updated = task.model_copy(update=normalize(changes))
+        self.put(updated, _id)
+
+    def invalidate(self, task_id: str) -> None:
+        entry = self._entries.pop(task_id, None)
+        if entry is not None and entry[2] is not None:
+            self._ids.pop(entry[2], None)
+
+    def invalidate_id(self, _id: Any) -> None:
+        task_id = self._ids.pop(_id, None)
+        if task_id is not None:
+            self._entries.pop(task_id, None)
+
+    def invalidate_ids(self, ids: Iterable[Any]) -> None:
+        for _id in ids:
+            self.invalidate_id(_id)
+
+    def on_change(self, change: dict) -> None:
+        """Drop the entry a change stream event touches, unless it's our own write.
+
+        A write-through entry already carries the new updated_at, so the
+        event of the update that produced it is skipped; anything else
+        (other workers, deletes, updates that don't set updated_at) evicts.
+        """
+        _id = change["documentKey"]["_id"]
+        if change["operationType"] == "update":
+            updated_at = change.get("updateDescription", {}).get("updatedFields", {}).get("updated_at")
+        elif change["operationType"] == "replace":
+            updated_at = (change.get("fullDocument") or {}).get("updated_at")
+        else:
+            updated_at = None
+        task_id = self._ids.get(_id)
+        entry = self._entries.get(task_id) if task_id is not None else None
+        if updated_at is not None and entry is not None and entry[0].updated_at == updated_at:
+            return
+        self.invalidate_id(_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._ids.clear()
+
+    def _set(self, task_id: str, task: TaskDocument, _id: Any) -> None:
+        if _id is None and task_id in self._entries:
+            _id = self._entries[task_id][2]
+        self._entries[task_id] = (task, time.monotonic() + self.ttl, _id)
+        self._entries.move_to_end(task_id)
+        if _id is not None:
+            self._ids[_id] = task_id
+        while len(self._entries) > self.max_size:
+            _, (_, _, evicted_id) = self._entries.popitem(last=False)
+            if evicted_id is not None:
+                self._ids.pop(evicted_id, None)
+
+    async def _watch(self, collection: AsyncIOMotorCollection) -> None:
+        pipeline = [{"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}}]
+        while True:
+            try:
+                async with collection.watch(pipeline) as stream:
+                    async for change in stream:
+                        self.on_change(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                logger.warning(
+                    f"Task cache: change streams unavailable ({e}); "
+                    f"entries from other workers may be up to {self.ttl}s stale"
+                )
+                return
+            except Exception as e:
+                logger.error(f"Task cache: change stream failed, retrying: {e}")
+                # Events may have been missed meanwhile
+                self.clear()
+                await asyncio.sleep(1)
+
+
+# Singleton instance
+task_cache = TaskCache()
@@ -1,85 +1,281 @@
+import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional, List, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 
-from ..models.task import TaskDocument, TaskStatus
+from ..config import get_settings
+from ..database import delete_in_batches
+from ..models.compression import compress_fields, resolve_method, search_terms
+from ..models.task import (
+    ALLOWED_TRANSITIONS,
+    COMPRESSIBLE_FIELDS,
+    RESULT_PREVIEW_CHARS,
+    SEARCHABLE_FIELDS,
+    TERMINAL_STATUSES,
+    TaskDocument,
+    TaskStatus,
+)
+from . import metrics
+from .blob_store import BlobStore
+from .pagination import keyset_filter, split_page
+from .stats_service import StatsService
+from .task_archive import TaskArchive
+from .task_cache import task_cache
+from .tracing import StageTimer, task_tracer
 
 logger = logging.getLogger(__name__)
 
+# Fields needed for list summaries; skips the potentially huge prompt/result/error
+SUMMARY_PROJECTION = {
+    "_id": 0,
+    "task_id": 1,
+    "agent_name": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "duration_sec": 1,
+    "metadata.prompt_preview": 1,
+}
+
+# Full documents minus the search-only `<field>_terms`, which are never read back
+TASK_PROJECTION = {f"{field}_terms": 0 for field in SEARCHABLE_FIELDS}
+
+# Newest first, task_id as tie-breaker; matches the (..., created_at, task_id) indexes
+LIST_SORT = [("created_at", -1), ("task_id", -1)]
+
+
+def summary_row(doc: dict) -> dict:
+    """Shape a SUMMARY_PROJECTION document like TaskListItem (same fields and order)."""
+    metadata = doc.get("metadata") or {}
+    return {
+        "task_id": doc["task_id"],
+        "agent_name": doc["agent_name"],
+        "status": doc["status"],
+        "created_at": doc["created_at"],
+        "updated_at": doc.get("updated_at"),
+        "duration_sec": doc.get("duration_sec"),
+        "prompt_preview": metadata.get("prompt_preview"),
+    }
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Make timezone-aware if naive (MongoDB returns naive datetimes)."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
 
 class TaskService:
     """Service for task CRUD operations with MongoDB."""
 
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db.tasks
+        self.stats = StatsService(db)
+        settings = get_settings()
+        self.compression = resolve_method(settings.task_compression)
+        self.compress_threshold = settings.task_compression_threshold
+        self.blobs = BlobStore(db)
+        self.blob_threshold = settings.result_blob_threshold
+        self.archive = TaskArchive(settings.archive_dir)
 
+    @metrics.observe_mongo("tasks", "create_task")
     async def create_task(
         self,
         agent_name: str,
         prompt: str,
-        timeout: int
+        timeout: int,
+        model: Optional[str] = None
     ) -> TaskDocument:
         """Create a new task in the database."""
+        metadata = {"prompt_preview": prompt[:100] if len(prompt) > 100 else prompt}
+        if model:
+            metadata["model"] = model
+
         task = TaskDocument(
             agent_name=agent_name,
             prompt=prompt,
             timeout_seconds=timeout,
-            metadata={"prompt_preview": prompt[:100] if len(prompt) > 100 else prompt}
+            metadata=metadata
         )
-        await self.collection.insert_one(task.to_mongo())
+        doc = task.to_mongo(self.compress_threshold, self.compression)
+        inserted = await self.collection.insert_one(doc)
+        task_cache.put(task.model_copy(update={"compressed": doc["compressed"]}), inserted.inserted_id)
+        metrics.tasks_submitted.labels(metrics.agent_label(agent_name)).inc()
         logger.info(f"Task {task.task_id}: Created for agent '{agent_name}'")
         return task
 
     async def get_task(self, task_id: str) -> Optional[TaskDocument]:
-        """Get a task by its ID."""
-        doc = await self.collection.find_one({"task_id": task_id})
-        return TaskDocument.from_mongo(doc) if doc else None
+        """Get a task by its ID from the status cache, MongoDB or the cold archive."""
+        task = task_cache.get(task_id)
+        if task is not None:
+            return task
+        task = await self._find_task(task_id)
+        if task is not None:
+            return task
+        return await self.archive.get_task(task_id)
+
+    async def get_task_version(self, task_id: str) -> Optional[datetime]:
+        """Get only the task's updated_at, for cheap change detection."""
+        task = task_cache.get(task_id)
+        if task is not None:
+            return task.updated_at
+        version = await self._find_task_version(task_id)
+        if version is not None:
+            return version
+        return await self.archive.get_task_version(task_id)
 
+    @metrics.observe_mongo("tasks", "get_task")
+    async def _find_task(self, task_id: str) -> Optional[TaskDocument]:
+        doc = await self.collection.find_one({"task_id": task_id}, TASK_PROJECTION)
+        if not doc:
+            return None
+        task = TaskDocument.from_mongo(doc)
+        task_cache.put(task, doc["_id"])
+        return task
+
+    @metrics.observe_mongo("tasks", "get_task_version")
+    async def _find_task_version(self, task_id: str) -> Optional[datetime]:
+        doc = await self.collection.find_one(
+            {"task_id": task_id}, {"_id": 0, "updated_at": 1}
+        )
+        return doc["updated_at"] if doc else None
+
+    @metrics.observe_mongo("tasks", "update_status")
     async def update_status(
         self,
         task_id: str,
         status: TaskStatus,
         result: str = None,
-        error: str = None
+        error: str = None,
+        started_at: Optional[datetime] = None,
+        timings: Optional[StageTimer] = None,
+        from_status: Optional[TaskStatus] = None
     ) -> bool:
-        """Update task status and optionally result/error."""
-        now = datetime.now(timezone.utc)
-        status_value = status.value if isinstance(status, TaskStatus) else status
+        """Atomically transition a task to a new status.
+
+        The update only applies if the task is currently in a status the
+        target may be entered from (see ALLOWED_TRANSITIONS), so e.g. a late
+        COMPLETED never overwrites CANCELLED. Each transition is a single
+        round trip. Pass the `started_at` the caller recorded for RUNNING to
+        compute duration client-side; otherwise MongoDB computes it from the
+        stored value. Stage timings collected by the executor are stored
+        with the final status and exported as a trace if tracing is on.
+        `from_status` narrows the transition to tasks currently in that
+        status. Applied transitions are written through to the status cache.
 
+        Returns:
+            True if the transition was applied, False if the task is missing
+            or its current status doesn't allow it.
+        """
+        now = datetime.now(timezone.utc)
+        status = TaskStatus(status)
+        allowed = ALLOWED_TRANSITIONS[status]
+        if from_status is not None:
+            allowed = allowed & {TaskStatus(from_status)}
+        query = {
+            "task_id": task_id,
+            "status": {"$in": [s.value for s in allowed]},
+        }
         update = {
-            "status": status_value,
+            "status": status.value,
             "updated_at": now
         }
 
         # Set started_at when transitioning to RUNNING
-        if status_value == TaskStatus.RUNNING.value:
-            update["started_at"] = now
-
-        # Calculate duration for terminal states
-        if status_value in [TaskStatus.COMPLETED.value, TaskStatus.FAILED.value,
-                           TaskStatus.TIMEOUT.value, TaskStatus.CANCELLED.value]:
-            task = await self.get_task(task_id)
-            if task and task.started_at:
-                started = task.started_at
-                # Make timezone-aware if naive (MongoDB returns naive datetimes)
-                if started.tzinfo is None:
-                    started = started.replace(tzinfo=timezone.utc)
-                duration = (now - started).total_seconds()
-                update["duration_sec"] = round(duration, 2)
+        if status == TaskStatus.RUNNING:
+            update["started_at"] = started_at or now
+            result_op = await self.collection.update_one(query, {"$set": update})
+            applied = result_op.modified_count > 0
+            if applied:
+                task_cache.apply(task_id, update)
+            else:
+                task_cache.invalidate(task_id)
+                logger.warning(f"Task {task_id}: Transition to {status.value} rejected")
+            return applied
 
+        blob_ref = None
         if result is not None:
-            update["result"] = result
+            raw = result.encode("utf-8")
+            if len(raw) >= self.blob_threshold:
+                # Keep the document small: the full output goes to the blob store
+                blob_ref = await self.blobs.put(task_id, raw)
+                update["result_ref"] = blob_ref
+                update["result_size"] = len(raw)
+                update["result_preview"] = result[:RESULT_PREVIEW_CHARS]
+            else:
+                update["result"] = result
         if error is not None:
             update["error"] = error
+        # What readers see, before compression
+        plain = dict(update)
+        if blob_ref:
+            update["result_terms"] = search_terms(result)
+        compress_fields(update, COMPRESSIBLE_FIELDS, self.compress_threshold, self.compression, SEARCHABLE_FIELDS)
+        if update.get("compressed"):
+            plain["compressed"] = True
+        if timings is not None:
+            timings.mark("persisted")
+            update["timings"] = timings.stages
 
-        result_op = await self.collection.update_one(
-            {"task_id": task_id},
-            {"$set": update}
+        if started_at is not None:
+            update["duration_sec"] = round((now - _as_utc(started_at)).total_seconds(), 2)
+            change = {"$set": update}
+        else:
+            # Duration from the stored started_at, computed inside the same update
+            change = [{"$set": {
+                **{key: {"$literal": value} for key, value in update.items()},
+                "duration_sec": {"$cond": [
+                    {"$ifNull": ["$started_at", False]},
+                    {"$round": [{"$divide": [{"$subtract": [now, "$started_at"]}, 1000]}, 2]},
+                    None,
+                ]},
+            }}]
+
+        # Pre-image carries what the stats rollup needs, no extra read
+        before = await self.collection.find_one_and_update(
+            query,
+            change,
+            projection={"_id": 0, "agent_name": 1, "started_at": 1, "metadata.model": 1},
+            return_document=ReturnDocument.BEFORE,
         )
-        return result_op.modified_count > 0
+        if before is None:
+            task_cache.invalidate(task_id)
+            logger.warning(f"Task {task_id}: Transition to {status.value} rejected")
+            if blob_ref:
+                await self.blobs.delete(blob_ref)
+            return False
+
+        duration = update.get("duration_sec")
+        if duration is None and before.get("started_at"):
+            duration = round((now - _as_utc(before["started_at"])).total_seconds(), 2)
+        plain["duration_sec"] = duration
+        if timings is not None:
+            plain["timings"] = timings.stages
+        task_cache.apply(task_id, plain)
+
+        agent = metrics.agent_label(before["agent_name"])
+        metrics.tasks_finished.labels(agent, status.value).inc()
+        if duration is not None:
+            metrics.task_duration.labels(agent, status.value).observe(duration)
+        if timings is not None:
+            task_tracer.export(task_id, before["agent_name"], status.value, timings)
+
+        # Roll the finished task into per-agent stats
+        try:
+            await self.stats.record(
+                agent_name=before["agent_name"],
+                model=(before.get("metadata") or {}).get("model"),
+                status=status,
+                duration_sec=duration,
+                finished_at=now,
+            )
+        except Exception as e:
+            logger.error(f"Task {task_id}: Failed to update stats rollup: {e}")
 
+        return True
+
+    @metrics.observe_mongo("tasks", "list_tasks")
     async def list_tasks(
         self,
         agent_name: str = None,
@@ -87,22 +283,185 @@ class TaskService:
         limit: int = 100
     ) -> List[TaskDocument]:
         """List tasks with optional filters."""
+        query = self._list_query(agent_name, status)
+        cursor = self.collection.find(query, TASK_PROJECTION).sort(LIST_SORT).limit(limit)
+        tasks = []
+        async for doc in cursor:
+            tasks.append(TaskDocument.from_mongo(doc))
+        return tasks
+
+    @metrics.observe_mongo("tasks", "list_task_summaries")
+    async def list_task_summaries(
+        self,
+        agent_name: str = None,
+        status: TaskStatus = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """List one page of task summaries, newest first.
+
+        Fetches only the summary fields from MongoDB and returns them as
+        plain dicts shaped like TaskListItem, ready to serialize without a
+        model round trip. Returns the page and the cursor of the next page
+        (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        query = self._list_query(agent_name, status, cursor)
+        docs = (
+            self.collection.find(query, SUMMARY_PROJECTION)
+            .sort(LIST_SORT)
+            .limit(limit + 1)
+        )
+        items = [summary_row(doc) async for doc in docs]
+        return split_page(items, limit, lambda t: (t["created_at"], t["task_id"]))
+
+    async def iter_tasks(
+        self,
+        agent_name: str = None,
+        status: TaskStatus = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[TaskDocument]:
+        """Iterate over all matching tasks, oldest first, one cursor batch in memory at a time.
+
+        Blob-stored results are not inlined; the task carries result_ref.
+        """
+        query = self._list_query(agent_name, status)
+        created = {}
+        if since:
+            created["$gte"] = since
+        if until:
+            created["$lt"] = until
+        if created:
+            query["created_at"] = created
+        docs = (
+            self.collection.find(query, {"_id": 0, **TASK_PROJECTION})
+            .sort([("created_at", 1), ("task_id", 1)])
+            .batch_size(batch_size)
+        )
+        async for doc in docs:
+            yield TaskDocument.from_mongo(doc)
+
+    @metrics.observe_mongo("tasks", "list_task_versions")
+    async def list_task_versions(
+        self,
+        agent_name: str = None,
+        status: TaskStatus = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[Tuple[str, datetime]]:
+        """List (task_id, updated_at) pairs of the page list_task_summaries returns.
+
+        Fetches `limit + 1` rows, like list_task_summaries, so callers can
+        tell whether a next page exists.
+        """
+        query = self._list_query(agent_name, status, cursor)
+        docs = (
+            self.collection.find(query, {"_id": 0, "task_id": 1, "updated_at": 1})
+            .sort(LIST_SORT)
+            .limit(limit + 1)
+        )
+        return [(doc["task_id"], doc["updated_at"]) async for doc in docs]
+
+    @staticmethod
+    def _list_query(
+        agent_name: str = None,
+        status: TaskStatus = None,
+        cursor: Optional[str] = None,
+    ) -> dict:
         query = {}
         if agent_name:
             query["agent_name"] = agent_name
         if status:
             query["status"] = status.value if isinstance(status, TaskStatus) else status
+        if cursor:
+            query.update(keyset_filter("created_at", "task_id", cursor))
+        return query
 
-        cursor = self.collection.find(query).sort("created_at", -1).limit(limit)
-        tasks = []
-        async for doc in cursor:
-            tasks.append(TaskDocument.from_mongo(doc))
-        return tasks
+    @metrics.observe_mongo("tasks", "delete_finished_tasks")
+    async def delete_finished_tasks(
+        self,
+        status: TaskStatus,
+        days: int,
+        batch_size: int = 1000,
+        pause_sec: float = 0.0,
+    ) -> int:
+        """Delete tasks in a terminal status last updated more than `days` ago."""
+        status = TaskStatus(status)
+        if status not in TERMINAL_STATUSES:
+            raise ValueError(f"Refusing to purge non-terminal status: {status.value}")
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        query = {"status": status.value, "updated_at": {"$lt": cutoff}}
+        await self._delete_result_blobs(query)
+        deleted = await delete_in_batches(
+            self.collection, query, batch_size, pause_sec, on_deleted=task_cache.invalidate_ids
+        )
+        if deleted:
+            logger.info(f"Deleted {deleted} {status.value} tasks older than {days} days")
+        return deleted
+
+    async def archive_finished_tasks(
+        self,
+        days: int,
+        batch_size: int = 1000,
+        pause_sec: float = 0.0,
+    ) -> int:
+        """Move tasks in a terminal status last updated more than `days` ago to the archive.
+
+        Each batch is written to disk before it's deleted from MongoDB, so a
+        crash in between only leaves a task in both places. Result blobs stay
+        where they are; archived tasks keep their ref.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        query = {
+            "status": {"$in": [s.value for s in TERMINAL_STATUSES]},
+            "updated_at": {"$lt": cutoff},
+        }
+        archived = 0
+        while True:
+            docs = await self.collection.find(query, TASK_PROJECTION).sort("_id", 1).to_list(batch_size)
+            if not docs:
+                break
+            await self.archive.write([TaskDocument.from_mongo(doc) for doc in docs])
+            result = await self.collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            task_cache.invalidate_ids(doc["_id"] for doc in docs)
+            archived += result.deleted_count
+            if len(docs) < batch_size:
+                break
+            if pause_sec:
+                await asyncio.sleep(pause_sec)
+        if archived:
+            logger.info(f"Archived {archived} finished tasks older than {days} days")
+        return archived
 
+    @metrics.observe_mongo("tasks", "delete_task")
     async def delete_task(self, task_id: str) -> bool:
-        """Delete a task by its ID."""
-        result = await self.collection.delete_one({"task_id": task_id})
-        if result.deleted_count > 0:
-            logger.info(f"Task {task_id}: Deleted")
-            return True
-        return False
+        """Delete a task by its ID, along with its result blob.
+
+        Archived tasks are found and deleted too, like get_task finds them.
+        """
+        doc = await self.collection.find_one_and_delete(
+            {"task_id": task_id}, projection={"_id": 0, "result_ref": 1}
+        )
+        task_cache.invalidate(task_id)
+        if doc is None:
+            archived = await self.archive.delete(task_id)
+            if archived is None:
+                return False
+            doc = {"result_ref": archived.result_ref}
+        if doc.get("result_ref"):
+            await self.blobs.delete(doc["result_ref"])
+        logger.info(f"Task {task_id}: Deleted")
+        return True
+
+    async def _delete_result_blobs(self, query: dict) -> None:
+        """Delete the result blobs of tasks matching query (before the tasks go)."""
+        cursor = self.collection.find(
+            {**query, "result_ref": {"$ne": None}}, {"_id": 0, "result_ref": 1}
+        )
+        async for doc in cursor:
+            await self.blobs.delete(doc["result_ref"])
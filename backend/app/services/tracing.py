@@ -0,0 +1,126 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+except ImportError:  # optional dependency
+    TracerProvider = None
+
+from ..models.task import TASK_STAGES
+
+logger = logging.getLogger(__name__)
+
+# Span name for the interval that ends at each stage
+STAGE_SPANS = {
+    "accepted": "accept",
+    "queued": "schedule",
+    "dequeued": "wait_for_slot",
+    "claude_md_loaded": "load_claude_md",
+    "spawned": "spawn",
+    "first_output": "first_output",
+    "exited": "run",
+    "persisted": "persist",
+}
+
+
+class StageTimer:
+    """Collects task stage timestamps as ms offsets from the task's created_at."""
+
+    def __init__(self, origin: Optional[datetime] = None):
+        self.origin = origin or datetime.now(timezone.utc)
+        self.stages: Dict[str, int] = {}
+
+    def mark(self, stage: str) -> None:
+        elapsed = datetime.now(timezone.utc) - self.origin
+        self.stages[stage] = round(elapsed.total_seconds() * 1000)
+
+
+class TaskTracer:
+    """Exports finished tasks' stage timings as OpenTelemetry spans.
+
+    One root span per task with a child span for each interval between
+    recorded stages. Off unless TRACING_EXPORTER is set, and needs the
+    optional opentelemetry-sdk package (plus the OTLP HTTP exporter for "otlp").
+    """
+
+    def __init__(self):
+        self._provider = None
+        self._tracer = None
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._tracer is not None
+
+    def start(self, exporter: str, otlp_endpoint: str, path: str) -> None:
+        if self.enabled or exporter == "none":
+            return
+        if TracerProvider is None:
+            logger.warning("opentelemetry-sdk is not installed, task tracing disabled")
+            return
+
+        if exporter == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError:
+                logger.warning("opentelemetry-exporter-otlp-proto-http is not installed, task tracing disabled")
+                return
+            span_exporter = OTLPSpanExporter(endpoint=otlp_endpoint)
+            target = otlp_endpoint
+        else:
+            self._file = open(path, "a", encoding="utf-8")
+            span_exporter = ConsoleSpanExporter(
+                out=self._file, formatter=lambda span: span.to_json(indent=None) + "\n"
+            )
+            target = path
+
+        self._provider = TracerProvider(resource=Resource.create({"service.name": "claude-api"}))
+        self._provider.add_span_processor(BatchSpanProcessor(span_exporter))
+        self._tracer = self._provider.get_tracer(__name__)
+        logger.info(f"Exporting task traces to {target}")
+
+    def stop(self) -> None:
+        """Flush pending spans and shut the exporter down."""
+        if not self.enabled:
+            return
+        self._provider.shutdown()
+        self._provider = None
+        self._tracer = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def export(self, task_id: str, agent_name: str, status: str, timer: StageTimer) -> None:
+        if not self.enabled or not timer.stages:
+            return
+        origin_ns = int(timer.origin.timestamp() * 1e9)
+
+        def at(offset_ms: int) -> int:
+            return origin_ns + offset_ms * 1_000_000
+
+        stages = [(s, timer.stages[s]) for s in TASK_STAGES if s in timer.stages]
+        try:
+            root = self._tracer.start_span(
+                "task",
+                start_time=origin_ns,
+                attributes={"task.id": task_id, "task.agent": agent_name, "task.status": status},
+            )
+            parent = trace.set_span_in_context(root)
+            previous = 0
+            for stage, offset in stages:
+                span = self._tracer.start_span(
+                    STAGE_SPANS[stage], context=parent, start_time=at(previous)
+                )
+                span.end(end_time=at(offset))
+                previous = offset
+            root.end(end_time=at(previous))
+        except Exception as e:
+            logger.error(f"Task {task_id}: Failed to export trace: {e}")
+
+
+# Singleton instance
+task_tracer = TaskTracer()
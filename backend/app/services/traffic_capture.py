@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Request headers worth replaying; everything else (API key, cookies,
+# auth, proxy headers) is dropped
+CAPTURED_HEADERS = frozenset({
+    "accept",
+    "accept-encoding",
+    "content-type",
+    "if-none-match",
+    "last-event-id",
+    "range",
+    "user-agent",
+})
+
+# User content in request bodies (at any depth, e.g. options.system_prompt)
+# and query strings; replaced by a hash unless capture_keep_prompts is set
+REDACTED_BODY_FIELDS = frozenset({"prompt", "system_prompt", "append_system_prompt"})
+REDACTED_QUERY_PARAMS = frozenset({"q"})
+
+# The only response field the replayer needs (to map created task IDs)
+KEPT_RESPONSE_FIELDS = ("task_id",)
+
+
+def redact(value: str) -> str:
+    """Stable stand-in for user text: same input, same token; no content."""
+    digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+    return f"redacted-{digest}-{len(value)}"
+
+
+def _redact_fields(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: redact(item) if key in REDACTED_BODY_FIELDS and isinstance(item, str) else _redact_fields(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_fields(item) for item in value]
+    return value
+
+
+class TrafficCapture:
+    """Appends sanitized request records to a JSONL file for later replay.
+
+    Records are queued by the middleware and written by a daemon thread, so
+    capture never blocks the event loop. Off unless CAPTURE_FILE is set.
+
+    What gets written per request: method, path, query string, the
+    CAPTURED_HEADERS, the request body, response status, size and
+    duration, and for JSON POST responses only their task_id. Unless
+    keep_prompts is set, prompt/system_prompt/append_system_prompt in
+    JSON bodies and the search `q` parameter are replaced by redact()
+    tokens, and bodies that can't be redacted (not JSON, or cut at
+    max_body) are dropped.
+    """
+
+    def __init__(self):
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._thread: Optional[threading.Thread] = None
+        self.path: Optional[Path] = None
+        self.max_body = 0
+        self.keep_prompts = False
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def start(self, path: str, max_body: int, keep_prompts: bool = False) -> None:
+        if self.enabled:
+            return
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_body = max_body
+        self.keep_prompts = keep_prompts
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"Capturing /api traffic to {self.path}")
+
+    def stop(self) -> None:
+        """Write out queued records and stop the writer thread."""
+        if not self.enabled:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        logger.info(f"Traffic capture stopped ({self.written} requests recorded)")
+
+    def record(self, entry: dict) -> None:
+        if self.enabled:
+            self._queue.put(entry)
+
+    def sanitize(self, entry: dict) -> dict:
+        """Strip user content from a raw middleware record (see class docstring)."""
+        entry = dict(entry)
+        response_body = entry.pop("response_body", None)
+        if response_body:
+            try:
+                response = json.loads(response_body)
+            except ValueError:
+                response = None
+            if isinstance(response, dict):
+                kept = {key: response[key] for key in KEPT_RESPONSE_FIELDS if key in response}
+                if kept:
+                    entry["response_body"] = json.dumps(kept)
+        if self.keep_prompts:
+            return entry
+
+        if entry.get("query"):
+            params = parse_qsl(entry["query"], keep_blank_values=True)
+            entry["query"] = urlencode([
+                (key, redact(value) if key in REDACTED_QUERY_PARAMS else value)
+                for key, value in params
+            ])
+        if entry.get("body"):
+            try:
+                body = None if entry.get("body_truncated") else json.loads(entry["body"])
+            except ValueError:
+                body = None
+            if body is None:
+                entry["body"] = ""
+                entry["body_dropped"] = True
+            else:
+                entry["body"] = json.dumps(_redact_fields(body), ensure_ascii=False)
+        return entry
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                entry = self._queue.get()
+                if entry is None:
+                    return
+                try:
+                    entry = self.sanitize(entry)
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+                    self.written += 1
+                    if self._queue.empty():
+                        f.flush()
+                except Exception as e:
+                    logger.error(f"Failed to write capture record: {e}")
+
+
+# Singleton instance
+traffic_capture = TrafficCapture()
@@ -0,0 +1,46 @@
+"""Storage engines behind get_database().
+
+Services talk to a Motor-style database: `db.<collection>` objects with
+insert_one/insert_many, find (sort/skip/limit/batch_size, async iteration,
+to_list), find_one, find_one_and_update, find_one_and_delete, update_one
+(upsert), delete_many, count_documents and create_index. STORAGE_BACKEND
+picks who provides it:
+
+- mongo: Motor against MongoDB (default, needed for multiple workers,
+  time-series logs, GridFS and change streams)
+- memory-sqlite: embedded, all data in memory; writes are journaled to a
+  SQLite file (WAL), which is loaded back into memory at startup
+- memory: embedded, nothing persisted (tests, throwaway runs)
+
+The embedded engines never query SQLite, so memory grows with the data;
+max_documents caps it (see EmbeddedDatabase).
+"""
+import asyncio
+
+from .embedded import EmbeddedCollection, EmbeddedDatabase, StorageFull
+from .sqlite_journal import SQLiteJournal
+
+
+async def open_embedded(backend: str, sqlite_path: str, max_documents: int = 0) -> EmbeddedDatabase:
+    """Open the embedded engine, loading persisted data for "memory-sqlite".
+
+    Refuses (StorageFull) to load a file holding more than max_documents.
+    """
+    if backend == "memory":
+        return EmbeddedDatabase(max_documents=max_documents)
+    journal = SQLiteJournal(sqlite_path)
+    stored = await asyncio.to_thread(journal.count)
+    if max_documents and stored > max_documents:
+        raise StorageFull(
+            f"{journal.path} holds {stored} documents, over EMBEDDED_MAX_DOCUMENTS={max_documents}; "
+            "raise the limit or move to MongoDB"
+        )
+    persisted = await asyncio.to_thread(journal.load_all)
+    database = EmbeddedDatabase(journal, max_documents)
+    for name, docs in persisted.items():
+        database[name]._load(docs)
+    journal.start()
+    return database
+
+
+__all__ = ["EmbeddedCollection", "EmbeddedDatabase", "SQLiteJournal", "StorageFull", "open_embedded"]
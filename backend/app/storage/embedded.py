@@ -0,0 +1,426 @@
+import re
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from .query import (
+    MISSING,
+    apply_update,
+    copy_doc,
+    equality_value,
+    get_path,
+    matches,
+    normalize,
+    project,
+    sort_documents,
+    upsert_seed,
+)
+from .sqlite_journal import SQLiteJournal
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class StorageFull(OperationFailure):
+    """The embedded engine holds max_documents and refuses more."""
+
+    def __init__(self, message: str):
+        # MongoDB's ExceededMemoryLimit
+        super().__init__(message, code=146)
+
+
+class EmbeddedCursor:
+    """Lazy find() result with the pymongo cursor modifiers the services use."""
+
+    def __init__(self, collection: "EmbeddedCollection", query: dict, projection: Optional[dict]):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List[Tuple[str, Any]] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction: Any = 1) -> "EmbeddedCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, count: int) -> "EmbeddedCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "EmbeddedCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "EmbeddedCursor":
+        return self
+
+    def _results(self) -> List[dict]:
+        items = self._collection._select(self._query)
+        if self._sort:
+            sort_documents(items, self._sort)
+        end = self._skip + self._limit if self._limit else None
+        return [project(doc, self._projection, score) for doc, score in items[self._skip:end]]
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = self._results()
+        return results[:length] if length else results
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        for doc in self._results():
+            yield doc
+
+
+class EmbeddedCollection:
+    """In-process document collection speaking the Motor subset the services use.
+
+    Documents live in a dict keyed by _id; equality lookups on indexed
+    fields go through hash indexes, everything else is a scan. Every call
+    runs to completion without awaiting, so on one event loop each
+    operation is atomic. With a journal, every write is also persisted.
+    """
+
+    def __init__(self, name: str, journal: Optional[SQLiteJournal] = None,
+                 database: Optional["EmbeddedDatabase"] = None):
+        self.name = name
+        self._journal = journal
+        self._database = database
+        self._docs: Dict[Any, dict] = {}
+        # field -> value -> _ids; fields from create_index (first key)
+        self._indexes: Dict[str, Dict[Any, Set[Any]]] = {}
+        self._unique: Set[str] = set()
+        # compound unique indexes: fields -> tuple of values -> _ids
+        self._compound: Dict[Tuple[str, ...], Dict[Any, Set[Any]]] = {}
+        # text index: field -> weight
+        self._text_weights: Dict[str, float] = {}
+
+    # Indexes
+
+    async def create_index(self, keys, name: Optional[str] = None, unique: bool = False,
+                           weights: Optional[dict] = None, **kwargs) -> str:
+        """Create a hash index on the first key; unique indexes may be compound.
+
+        Like MongoDB, a unique index can't be created over documents that
+        already violate it (DuplicateKeyError); this is also what checks
+        documents loaded from SQLite, since _load() doesn't.
+        """
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        if any(kind == "text" for _, kind in keys):
+            if unique:
+                raise OperationFailure("text indexes can't be unique", code=67)
+            weights = weights or {}
+            self._text_weights = {field: float(weights.get(field, 1)) for field, kind in keys if kind == "text"}
+            return name or "text"
+        field = keys[0][0]
+        if field not in self._indexes and field != "_id":
+            index: Dict[Any, Set[Any]] = {}
+            for _id, doc in self._docs.items():
+                self._index_value(index, get_path(doc, field), _id)
+            self._indexes[field] = index
+        if unique and len(keys) == 1 and field != "_id":
+            self._ensure_distinct(field, self._indexes[field])
+            self._unique.add(field)
+        elif unique and len(keys) > 1:
+            fields = tuple(key for key, _ in keys)
+            if fields not in self._compound:
+                index = {}
+                for _id, doc in self._docs.items():
+                    self._index_value(index, self._compound_key(doc, fields), _id)
+                self._ensure_distinct("_".join(fields), index)
+                self._compound[fields] = index
+        return name or "_".join(f"{key}_{direction}" for key, direction in keys)
+
+    async def drop_index(self, name: str) -> None:
+        if name.endswith("text"):
+            self._text_weights = {}
+
+    @staticmethod
+    def _compound_key(doc: dict, fields: Tuple[str, ...]) -> tuple:
+        # A missing field counts as null, as in MongoDB's compound indexes
+        return tuple(None if value is MISSING else value for value in (get_path(doc, f) for f in fields))
+
+    def _ensure_distinct(self, name: str, index: Dict[Any, Set[Any]]) -> None:
+        for value, ids in index.items():
+            if value is not None and len(ids) > 1:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} index: {name} dup key: {value!r}"
+                )
+
+    @staticmethod
+    def _index_value(index: Dict[Any, Set[Any]], value: Any, _id: Any) -> None:
+        try:
+            index.setdefault(value if value is not MISSING else None, set()).add(_id)
+        except TypeError:  # unhashable (dict/list) values aren't indexed
+            pass
+
+    def _reindex(self, _id: Any, old: Optional[dict], new: Optional[dict]) -> None:
+        for field, index in self._indexes.items():
+            if old is not None:
+                value = get_path(old, field)
+                try:
+                    ids = index.get(value if value is not MISSING else None)
+                except TypeError:
+                    ids = None
+                if ids:
+                    ids.discard(_id)
+            if new is not None:
+                self._index_value(index, get_path(new, field), _id)
+        for fields, index in self._compound.items():
+            if old is not None:
+                try:
+                    index.get(self._compound_key(old, fields), set()).discard(_id)
+                except TypeError:
+                    pass
+            if new is not None:
+                self._index_value(index, self._compound_key(new, fields), _id)
+
+    def _check_unique(self, doc: dict, _id: Any) -> None:
+        for field in self._unique:
+            value = get_path(doc, field)
+            if value is MISSING:
+                continue
+            if any(other != _id for other in self._indexes[field].get(value, ())):
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {field}")
+        for fields, index in self._compound.items():
+            try:
+                ids = index.get(self._compound_key(doc, fields), ())
+            except TypeError:  # unhashable values aren't indexed
+                continue
+            if any(other != _id for other in ids):
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} index: {'_'.join(fields)}"
+                )
+
+    # Selection
+
+    def _candidates(self, query: dict) -> Iterable[Any]:
+        for field, condition in query.items():
+            if field == "_id" or field in self._indexes:
+                values = equality_value(condition)
+                if not values:
+                    continue
+                if field == "_id":
+                    return [value for value in values if value in self._docs]
+                ids: Set[Any] = set()
+                for value in values:
+                    try:
+                        ids |= self._indexes[field].get(value, set())
+                    except TypeError:
+                        return list(self._docs)
+                return list(ids)
+        return list(self._docs)
+
+    def _text_score(self, doc: dict, terms: List[str]) -> float:
+        score = 0.0
+        for field, weight in self._text_weights.items():
+            value = get_path(doc, field)
+            if not isinstance(value, str):
+                continue
+            words = WORD_RE.findall(value.lower())
+            if words:
+                hits = sum(words.count(term) for term in terms)
+                score += weight * hits / len(words) * 10
+        return score
+
+    def _select(self, query: Optional[dict]) -> List[Tuple[dict, Optional[float]]]:
+        query = normalize(query or {})
+        terms = None
+        if "$text" in query:
+            if not self._text_weights:
+                raise OperationFailure("text index required for $text query", code=27)
+            terms = WORD_RE.findall(query["$text"]["$search"].lower())
+        selected = []
+        for _id in self._candidates(query):
+            doc = self._docs[_id]
+            if not matches(doc, query):
+                continue
+            score = None
+            if terms is not None:
+                score = self._text_score(doc, terms)
+                if not score:
+                    continue
+            selected.append((doc, score))
+        return selected
+
+    def _first(self, query: dict, sort: Optional[list] = None) -> Optional[dict]:
+        items = self._select(query)
+        if sort:
+            sort_documents(items, sort)
+        return items[0][0] if items else None
+
+    # Writes
+
+    def _store(self, doc: dict, old: Optional[dict] = None) -> None:
+        _id = doc["_id"]
+        if self._unique or self._compound:
+            self._check_unique(doc, _id)
+        self._reindex(_id, old, doc)
+        self._docs[_id] = doc
+        if self._journal:
+            self._journal.put(self.name, doc)
+
+    def _remove(self, doc: dict) -> None:
+        _id = doc["_id"]
+        self._reindex(_id, doc, None)
+        del self._docs[_id]
+        if self._journal:
+            self._journal.delete(self.name, _id)
+
+    def _insert(self, document: dict) -> Any:
+        doc = normalize(document)
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_")
+        if self._database is not None:
+            self._database._check_capacity()
+        self._store(doc)
+        # pymongo sets _id on the caller's document too
+        document.setdefault("_id", doc["_id"])
+        return doc["_id"]
+
+    def _update(self, doc: dict, update: Any) -> dict:
+        updated = copy_doc(doc)
+        apply_update(updated, update)
+        updated["_id"] = doc["_id"]
+        self._store(updated, doc)
+        return updated
+
+    def _upsert(self, query: dict, update: Any) -> dict:
+        doc = upsert_seed(query)
+        apply_update(doc, update, inserting=True)
+        self._insert(doc)
+        return self._docs[doc["_id"]]
+
+    async def insert_one(self, document: dict) -> InsertOneResult:
+        return InsertOneResult(self._insert(document), True)
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True) -> InsertManyResult:
+        return InsertManyResult([self._insert(doc) for doc in documents], True)
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None,
+                       sort: Optional[list] = None) -> Optional[dict]:
+        doc = self._first(filter or {}, sort)
+        return project(doc, projection) if doc is not None else None
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None) -> EmbeddedCursor:
+        return EmbeddedCursor(self, filter or {}, projection)
+
+    async def count_documents(self, filter: dict) -> int:
+        return len(self._select(filter))
+
+    async def estimated_document_count(self) -> int:
+        return len(self._docs)
+
+    async def update_one(self, filter: dict, update: Any, upsert: bool = False) -> UpdateResult:
+        doc = self._first(filter)
+        if doc is not None:
+            self._update(doc, update)
+            return UpdateResult({"n": 1, "nModified": 1}, True)
+        if upsert:
+            inserted = self._upsert(filter, update)
+            return UpdateResult({"n": 1, "nModified": 0, "upserted": inserted["_id"]}, True)
+        return UpdateResult({"n": 0, "nModified": 0}, True)
+
+    async def update_many(self, filter: dict, update: Any) -> UpdateResult:
+        docs = [doc for doc, _ in self._select(filter)]
+        for doc in docs:
+            self._update(doc, update)
+        return UpdateResult({"n": len(docs), "nModified": len(docs)}, True)
+
+    async def find_one_and_update(self, filter: dict, update: Any, projection: Optional[dict] = None,
+                                  sort: Optional[list] = None, upsert: bool = False,
+                                  return_document: bool = ReturnDocument.BEFORE) -> Optional[dict]:
+        doc = self._first(filter, sort)
+        if doc is None:
+            if not upsert:
+                return None
+            inserted = self._upsert(filter, update)
+            return project(inserted, projection) if return_document == ReturnDocument.AFTER else None
+        updated = self._update(doc, update)
+        return project(updated if return_document == ReturnDocument.AFTER else doc, projection)
+
+    async def find_one_and_delete(self, filter: dict, projection: Optional[dict] = None,
+                                  sort: Optional[list] = None) -> Optional[dict]:
+        doc = self._first(filter, sort)
+        if doc is None:
+            return None
+        self._remove(doc)
+        return project(doc, projection)
+
+    async def delete_one(self, filter: dict) -> DeleteResult:
+        doc = self._first(filter)
+        if doc is not None:
+            self._remove(doc)
+        return DeleteResult({"n": int(doc is not None)}, True)
+
+    async def delete_many(self, filter: dict) -> DeleteResult:
+        docs = [doc for doc, _ in self._select(filter)]
+        for doc in docs:
+            self._remove(doc)
+        return DeleteResult({"n": len(docs)}, True)
+
+    def _load(self, docs: Iterable[dict]) -> None:
+        """Fill from persisted documents without journaling them again.
+
+        Skips the unique checks: call before create_index(), which verifies
+        the loaded documents against each unique index it creates.
+        """
+        for doc in docs:
+            self._docs[doc["_id"]] = doc
+            self._reindex(doc["_id"], None, doc)
+
+
+class EmbeddedDatabase:
+    """Database of embedded collections; `db.tasks` / `db["tasks"]` like Motor.
+
+    Every document lives in memory. Without a journal that's all
+    (STORAGE_BACKEND=memory); with one, collections are loaded from SQLite
+    on open and every write is persisted (STORAGE_BACKEND=memory-sqlite).
+    Inserts beyond max_documents (0 = no limit) fail with StorageFull.
+    """
+
+    def __init__(self, journal: Optional[SQLiteJournal] = None, max_documents: int = 0):
+        self._journal = journal
+        self.max_documents = max_documents
+        self._collections: Dict[str, EmbeddedCollection] = {}
+
+    def __getitem__(self, name: str) -> EmbeddedCollection:
+        if name not in self._collections:
+            self._collections[name] = EmbeddedCollection(name, self._journal, self)
+        return self._collections[name]
+
+    def document_count(self) -> int:
+        return sum(len(collection._docs) for collection in self._collections.values())
+
+    def _check_capacity(self) -> None:
+        if self.max_documents and self.document_count() >= self.max_documents:
+            raise StorageFull(
+                f"Embedded storage holds EMBEDDED_MAX_DOCUMENTS={self.max_documents} documents; "
+                "purge old data (retention) or move to MongoDB"
+            )
+
+    def __getattr__(self, name: str) -> EmbeddedCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command: Any, **kwargs) -> dict:
+        if command == "ping" or command == {"ping": 1}:
+            return {"ok": 1.0}
+        raise OperationFailure(f"Command {command} is not supported by the embedded storage")
+
+    async def list_collection_names(self, filter: Optional[dict] = None) -> List[str]:
+        return sorted(
+            name for name, collection in self._collections.items()
+            if collection._docs and (not filter or matches({"name": name}, filter))
+        )
+
+    def close(self) -> None:
+        if self._journal:
+            self._journal.stop()
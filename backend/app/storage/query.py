@@ -0,0 +1,328 @@
+"""MongoDB query semantics for the embedded engines.
+
+Covers what the services actually send: equality and comparison filters,
+$in/$nin/$ne/$exists/$regex, $or/$and/$nor, inclusion/exclusion projections,
+multi-key sorts, $set/$unset/$inc/$max/$min updates and the small set of
+aggregation expressions used in pipeline updates.
+"""
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from ..models.values import normalize
+
+MISSING = object()
+
+
+def copy_doc(value: Any) -> Any:
+    """Deep copy of a stored document (containers only; leaves are immutable)."""
+    if isinstance(value, dict):
+        return {key: copy_doc(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_doc(item) for item in value]
+    return value
+
+
+def get_path(doc: Any, path: str) -> Any:
+    for part in path.split("."):
+        if isinstance(doc, dict):
+            doc = doc.get(part, MISSING)
+        elif isinstance(doc, list) and part.isdigit() and int(part) < len(doc):
+            doc = doc[int(part)]
+        else:
+            return MISSING
+        if doc is MISSING:
+            return MISSING
+    return doc
+
+
+def set_path(doc: dict, path: str, value: Any) -> None:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        child = doc.get(part)
+        if not isinstance(child, dict):
+            child = doc[part] = {}
+        doc = child
+    doc[leaf] = value
+
+
+def unset_path(doc: dict, path: str) -> None:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(leaf, None)
+
+
+# BSON comparison order of types
+def _type_rank(value: Any) -> int:
+    if value is MISSING or value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    rank = _type_rank(value)
+    if rank == 1:
+        return (rank, 0)
+    if rank in (4, 5):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if expected is None:
+        return value is None or value is MISSING
+    if isinstance(value, list) and not isinstance(expected, list):
+        return any(_equals(item, expected) for item in value)
+    return value is not MISSING and _type_rank(value) == _type_rank(expected) and value == expected
+
+
+def _compare(value: Any, expected: Any, op: Callable[[Any, Any], bool]) -> bool:
+    if isinstance(value, list):
+        return any(_compare(item, expected, op) for item in value)
+    if value is MISSING or _type_rank(value) != _type_rank(expected):
+        return False
+    return op(value, expected)
+
+
+def _regex(expected: Any, options: str = "") -> "re.Pattern":
+    if isinstance(expected, re.Pattern):
+        return expected
+    flags = re.IGNORECASE if "i" in options else 0
+    flags |= re.MULTILINE if "m" in options else 0
+    flags |= re.DOTALL if "s" in options else 0
+    return re.compile(expected, flags)
+
+
+def _match_operators(value: Any, conditions: dict) -> bool:
+    for op, expected in conditions.items():
+        if op == "$eq":
+            ok = _equals(value, expected)
+        elif op == "$ne":
+            ok = not _equals(value, expected)
+        elif op == "$gt":
+            ok = _compare(value, expected, lambda a, b: a > b)
+        elif op == "$gte":
+            ok = _compare(value, expected, lambda a, b: a >= b)
+        elif op == "$lt":
+            ok = _compare(value, expected, lambda a, b: a < b)
+        elif op == "$lte":
+            ok = _compare(value, expected, lambda a, b: a <= b)
+        elif op == "$in":
+            ok = any(_equals(value, item) for item in expected)
+        elif op == "$nin":
+            ok = not any(_equals(value, item) for item in expected)
+        elif op == "$exists":
+            ok = (value is not MISSING) == bool(expected)
+        elif op == "$regex":
+            pattern = _regex(expected, conditions.get("$options", ""))
+            ok = isinstance(value, str) and pattern.search(value) is not None
+        elif op == "$options":
+            continue
+        elif op == "$not":
+            ok = not _match_operators(value, expected)
+        else:
+            raise NotImplementedError(f"Query operator {op} is not supported by the embedded storage")
+        if not ok:
+            return False
+    return True
+
+
+def _is_operator_dict(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value) and all(key.startswith("$") for key in value)
+
+
+def matches(doc: dict, query: dict) -> bool:
+    """Whether a stored document matches a MongoDB filter ($text excluded)."""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$text":
+            continue
+        elif key.startswith("$"):
+            raise NotImplementedError(f"Query operator {key} is not supported by the embedded storage")
+        else:
+            value = get_path(doc, key)
+            if _is_operator_dict(condition):
+                if not _match_operators(value, condition):
+                    return False
+            elif isinstance(condition, re.Pattern):
+                if not (isinstance(value, str) and condition.search(value)):
+                    return False
+            elif not _equals(value, condition):
+                return False
+    return True
+
+
+def equality_value(condition: Any) -> List[Any]:
+    """Values an indexed field may take under `condition`, [] if not an equality."""
+    if _is_operator_dict(condition):
+        if set(condition) == {"$eq"}:
+            return [condition["$eq"]]
+        if set(condition) == {"$in"}:
+            return list(condition["$in"])
+        return []
+    if isinstance(condition, (dict, list, re.Pattern)):
+        return []
+    return [condition]
+
+
+def project(doc: dict, projection: Optional[dict], score: Optional[float] = None) -> dict:
+    """Apply an inclusion or exclusion projection to a copy of the document."""
+    if not projection:
+        return copy_doc(doc)
+    include_id = bool(projection.get("_id", 1))
+    meta = [key for key, spec in projection.items() if isinstance(spec, dict)]
+    included = [key for key, spec in projection.items() if key != "_id" and not isinstance(spec, dict) and spec]
+    excluded = [key for key, spec in projection.items() if key != "_id" and not isinstance(spec, dict) and not spec]
+
+    if included:
+        result: dict = {}
+        if include_id and "_id" in doc:
+            result["_id"] = doc["_id"]
+        for path in included:
+            value = get_path(doc, path)
+            if value is not MISSING:
+                set_path(result, path, copy_doc(value))
+    else:
+        result = copy_doc(doc)
+        if not include_id:
+            result.pop("_id", None)
+        for path in excluded:
+            unset_path(result, path)
+    for key in meta:
+        result[key] = score
+    return result
+
+
+def sort_documents(items: List[Tuple[dict, Optional[float]]], spec: List[Tuple[str, Any]]) -> None:
+    """Sort (doc, text score) pairs in place by a pymongo-style sort spec."""
+    for field, direction in reversed(spec):
+        if isinstance(direction, dict):
+            # {"$meta": "textScore"}: best matches first
+            items.sort(key=lambda item: item[1] or 0.0, reverse=True)
+        else:
+            items.sort(key=lambda item: sort_key(get_path(item[0], field)), reverse=direction == -1)
+
+
+def _truthy(value: Any) -> bool:
+    return value not in (None, False, 0, MISSING)
+
+
+def evaluate(expr: Any, doc: dict) -> Any:
+    """Evaluate an aggregation expression against a document."""
+    if isinstance(expr, str):
+        if expr.startswith("$"):
+            value = get_path(doc, expr[1:])
+            return None if value is MISSING else value
+        return expr
+    if isinstance(expr, list):
+        return [evaluate(item, doc) for item in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if len(expr) != 1 or not next(iter(expr)).startswith("$"):
+        return {key: evaluate(value, doc) for key, value in expr.items()}
+
+    op, args = next(iter(expr.items()))
+    if op == "$literal":
+        return args
+    if op == "$cond":
+        if isinstance(args, dict):
+            args = [args["if"], args["then"], args["else"]]
+        return evaluate(args[1] if _truthy(evaluate(args[0], doc)) else args[2], doc)
+    values = [evaluate(arg, doc) for arg in (args if isinstance(args, list) else [args])]
+    if op == "$ifNull":
+        return next((v for v in values if v is not None), None)
+    if any(v is None for v in values):
+        return None
+    if op == "$add":
+        return sum(values)
+    if op == "$subtract":
+        a, b = values
+        if isinstance(a, datetime) and isinstance(b, datetime):
+            return int((a - b).total_seconds() * 1000)
+        return a - b
+    if op == "$multiply":
+        product = 1
+        for v in values:
+            product *= v
+        return product
+    if op == "$divide":
+        return values[0] / values[1]
+    if op == "$round":
+        return round(values[0], values[1] if len(values) > 1 else 0)
+    raise NotImplementedError(f"Expression {op} is not supported by the embedded storage")
+
+
+def apply_update(doc: dict, update: Any, inserting: bool = False) -> None:
+    """Apply an update document or pipeline to a stored document in place."""
+    update = normalize(update)
+    if isinstance(update, list):
+        for stage in update:
+            (op, fields), = stage.items()
+            if op not in ("$set", "$addFields"):
+                raise NotImplementedError(f"Pipeline stage {op} is not supported by the embedded storage")
+            values = {path: evaluate(expr, doc) for path, expr in fields.items()}
+            for path, value in values.items():
+                set_path(doc, path, normalize(value))
+        return
+
+    for op, fields in update.items():
+        for path, value in fields.items():
+            current = get_path(doc, path)
+            if op == "$set":
+                set_path(doc, path, value)
+            elif op == "$setOnInsert":
+                if inserting:
+                    set_path(doc, path, value)
+            elif op == "$unset":
+                unset_path(doc, path)
+            elif op == "$inc":
+                set_path(doc, path, value if current is MISSING else current + value)
+            elif op == "$max":
+                if current is MISSING or sort_key(value) > sort_key(current):
+                    set_path(doc, path, value)
+            elif op == "$min":
+                if current is MISSING or sort_key(value) < sort_key(current):
+                    set_path(doc, path, value)
+            else:
+                raise NotImplementedError(f"Update operator {op} is not supported by the embedded storage")
+
+
+def upsert_seed(query: dict) -> Dict[str, Any]:
+    """Fields an upserted document inherits from the filter's equalities."""
+    seed: dict = {}
+    for key, condition in query.items():
+        if key.startswith("$"):
+            continue
+        values = equality_value(condition)
+        if len(values) == 1:
+            set_path(seed, key, normalize(values[0]))
+    return seed
@@ -0,0 +1,115 @@
+import logging
+import queue
+import sqlite3
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import bson
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id BLOB NOT NULL,
+    doc BLOB NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID
+"""
+
+
+def _key(_id: Any) -> bytes:
+    # BSON-encoded _id: keeps ObjectId vs str ids distinct
+    return bson.encode({"_id": _id})
+
+
+class SQLiteJournal:
+    """Persists embedded collections to one SQLite file in WAL mode.
+
+    The working set is served from memory; this only records writes, and
+    load_all() reads everything back into memory at startup. Docs
+    are BSON-encoded on the event loop (a snapshot of the write) and written
+    by a daemon thread, which commits whatever has queued up as one
+    transaction, so writers never wait on the disk. stop() drains the queue.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(SCHEMA)
+        return conn
+
+    def count(self) -> int:
+        """Number of stored documents (blocking)."""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        finally:
+            conn.close()
+
+    def load_all(self) -> Dict[str, List[dict]]:
+        """Read every stored document, grouped by collection (blocking)."""
+        collections: Dict[str, List[dict]] = defaultdict(list)
+        conn = self._connect()
+        try:
+            for name, doc in conn.execute("SELECT collection, doc FROM documents"):
+                collections[name].append(bson.decode(doc))
+        finally:
+            conn.close()
+        return collections
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, args=(self._connect(),), name="sqlite-journal", daemon=True)
+        self._thread.start()
+        logger.info(f"SQLite storage at {self.path}")
+
+    def stop(self) -> None:
+        """Write out queued changes and close the database."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def put(self, collection: str, doc: dict) -> None:
+        self._queue.put((collection, _key(doc["_id"]), bson.encode(doc)))
+
+    def delete(self, collection: str, _id: Any) -> None:
+        self._queue.put((collection, _key(_id), None))
+
+    def _run(self, conn: sqlite3.Connection) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while not self._queue.empty() and len(batch) < 1000:
+                batch.append(self._queue.get())
+            if batch[-1] is None or None in batch:
+                stopping = True
+                batch = [op for op in batch if op is not None]
+            try:
+                with conn:
+                    for collection, key, doc in batch:
+                        if doc is None:
+                            conn.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, key))
+                        else:
+                            conn.execute(
+                                "INSERT OR REPLACE INTO documents (collection, id, doc) VALUES (?, ?, ?)",
+                                (collection, key, doc),
+                            )
+                self.written += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} changes to SQLite: {e}")
+        conn.close()
@@ -0,0 +1,39 @@
+"""Shared fixtures for the microbenchmarks.
+
+Run from backend/ and compare against the committed baseline (recorded on
+Linux, CPython 3.11; timings only compare on the same kind of machine):
+    python -m pytest benchmarks --benchmark-storage=benchmarks/baselines \
+        --benchmark-compare=0001 --benchmark-compare-fail=median:25%
+To record a new baseline, delete the old file and run with
+--benchmark-storage=benchmarks/baselines --benchmark-save=baseline.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("CLAUDE_API_KEY", "benchmark-key")
+
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    """Run a coroutine to completion; lets sync benchmarks time async code."""
+    return loop.run_until_complete
+
+
+@pytest.fixture
+def db():
+    """Fresh in-memory MongoDB database per benchmark."""
+    return AsyncMongoMockClient()["benchmark"]
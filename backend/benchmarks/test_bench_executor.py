@@ -0,0 +1,38 @@
+import pytest
+
+from app.schemas.task import ClaudeOptions
+from app.services.claude_executor import build_command_args
+
+PROMPT = "Refactor the payment module and add tests"
+
+TYPICAL = ClaudeOptions(model="sonnet", output_format="json", verbose=True)
+
+FULL = ClaudeOptions(
+    model="opus",
+    fallback_model="sonnet",
+    output_format="stream-json",
+    verbose=True,
+    system_prompt="You are a careful senior engineer. " * 50,
+    json_schema={"type": "object", "properties": {"summary": {"type": "string"}}},
+    allowed_tools=["Read", "Edit", "Bash(git:*)"],
+    disallowed_tools=["WebFetch"],
+    permission_mode="acceptEdits",
+    mcp_config=["mcp.json"],
+    add_dirs=["../shared", "../docs"],
+    agents_json={"reviewer": {"description": "Reviews diffs", "prompt": "Review carefully"}},
+)
+
+
+@pytest.mark.benchmark(group="build-command-args")
+def test_build_args_no_options(benchmark):
+    benchmark(build_command_args, PROMPT)
+
+
+@pytest.mark.benchmark(group="build-command-args")
+def test_build_args_typical(benchmark):
+    benchmark(build_command_args, PROMPT, TYPICAL)
+
+
+@pytest.mark.benchmark(group="build-command-args")
+def test_build_args_full(benchmark):
+    benchmark(build_command_args, PROMPT, FULL)
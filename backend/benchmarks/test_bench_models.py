@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.log import LogDocument, LogLevel
+from app.models.task import TaskDocument, TaskStatus
+
+SMALL_RESULT = '{"type": "result", "result": "ok"}'
+# Verbose JSON output, above the default compression threshold
+LARGE_RESULT = '{"type": "assistant", "content": "' + "lorem ipsum dolor sit amet " * 2000 + '"}'
+
+
+def make_task(result: str) -> TaskDocument:
+    return TaskDocument(
+        agent_name="bench",
+        prompt="Summarize the repository layout",
+        status=TaskStatus.COMPLETED,
+        result=result,
+        started_at=datetime.now(timezone.utc),
+        duration_sec=1.5,
+        metadata={"prompt_preview": "Summarize the repository layout", "model": "sonnet"},
+    )
+
+
+@pytest.mark.benchmark(group="task-document")
+def test_task_construct(benchmark):
+    benchmark(make_task, SMALL_RESULT)
+
+
+@pytest.mark.benchmark(group="task-document")
+def test_task_to_mongo(benchmark):
+    task = make_task(SMALL_RESULT)
+    benchmark(task.to_mongo, 4096, "gzip")
+
+
+@pytest.mark.benchmark(group="task-document")
+def test_task_from_mongo(benchmark):
+    doc = make_task(SMALL_RESULT).to_mongo(4096, "gzip")
+    benchmark(TaskDocument.from_mongo, doc)
+
+
+@pytest.mark.benchmark(group="task-document-large")
+def test_task_to_mongo_compressed(benchmark):
+    task = make_task(LARGE_RESULT)
+    benchmark(task.to_mongo, 4096, "gzip")
+
+
+@pytest.mark.benchmark(group="task-document-large")
+def test_task_from_mongo_compressed(benchmark):
+    doc = make_task(LARGE_RESULT).to_mongo(4096, "gzip")
+    assert doc["compressed"]
+    benchmark(TaskDocument.from_mongo, doc)
+
+
+@pytest.mark.benchmark(group="log-document")
+def test_log_construct(benchmark):
+    benchmark(
+        LogDocument,
+        agent_name="bench",
+        level=LogLevel.INFO,
+        message="Task completed successfully",
+        task_id="00000000-0000-0000-0000-000000000000",
+    )
+
+
+@pytest.mark.benchmark(group="log-document")
+def test_log_to_mongo(benchmark):
+    log = LogDocument(agent_name="bench", message="Task completed successfully", task_id="t")
+    benchmark(log.to_mongo)
+
+
+@pytest.mark.benchmark(group="log-document")
+def test_log_to_timeseries(benchmark):
+    log = LogDocument(agent_name="bench", message="Task completed successfully", task_id="t")
+    benchmark(log.to_timeseries)
+
+
+@pytest.mark.benchmark(group="log-document")
+def test_log_from_mongo(benchmark):
+    doc = LogDocument(agent_name="bench", message="Task completed successfully", task_id="t").to_mongo()
+    benchmark(LogDocument.from_mongo, doc)
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+import uuid
+
+import pytest
+
+from app.auth import verify_api_key
+from app.models.task import TaskDocument, TaskStatus
+from app.routes.responses import FastJSONResponse
+from app.routes.tasks import status_body
+from app.services.log_service import log_row
+from app.services.task_service import summary_row
+
+
+@pytest.mark.benchmark(group="auth")
+def test_verify_api_key(benchmark, run):
+    benchmark(lambda: run(verify_api_key("benchmark-key")))
+
+
+@pytest.mark.benchmark(group="responses")
+def test_status_response_build(benchmark):
+    task = TaskDocument(agent_name="bench", prompt="p", status=TaskStatus.COMPLETED, result="r" * 2000)
+    benchmark(status_body, task)
+
+
+@pytest.mark.benchmark(group="responses")
+def test_status_response_serialize(benchmark):
+    task = TaskDocument(agent_name="bench", prompt="p", status=TaskStatus.COMPLETED, result="r" * 2000)
+    body = status_body(task)
+    benchmark(lambda: FastJSONResponse(body).body)
+
+
+@pytest.mark.benchmark(group="responses")
+def test_task_list_response_100(benchmark):
+    now = datetime.now(timezone.utc)
+    # Projected documents as list_task_summaries reads them
+    docs = [
+        {
+            "task_id": f"task-{i}",
+            "agent_name": "bench",
+            "status": "completed",
+            "created_at": now,
+            "updated_at": now,
+            "duration_sec": 1.0,
+            "metadata": {"prompt_preview": "Summarize the repository layout"},
+        }
+        for i in range(100)
+    ]
+
+    def build():
+        tasks = [summary_row(doc) for doc in docs]
+        return FastJSONResponse({"count": len(tasks), "tasks": tasks, "next_cursor": None}).body
+
+    benchmark(build)
+
+
+@pytest.mark.benchmark(group="responses")
+def test_log_list_response_500(benchmark):
+    now = datetime.now(timezone.utc)
+    # Projected documents as list_logs_page reads them
+    docs = [
+        {
+            "log_id": str(uuid.uuid4()),
+            "task_id": "00000000-0000-0000-0000-000000000000",
+            "agent_name": "bench",
+            "level": "info",
+            "message": "Task completed successfully",
+            "timestamp": now,
+        }
+        for _ in range(500)
+    ]
+
+    def build():
+        logs = [log_row(doc) for doc in docs]
+        return FastJSONResponse({"count": len(logs), "logs": logs, "next_cursor": None}).body
+
+    benchmark(build)
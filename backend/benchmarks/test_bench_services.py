@@ -0,0 +1,39 @@
+import pytest
+
+from app.models.log import LogDocument
+from app.services.log_service import LogService
+from app.services.task_service import TaskService
+
+
+@pytest.fixture
+def task_service(db):
+    return TaskService(db)
+
+
+@pytest.mark.benchmark(group="task-service")
+def test_create_task(benchmark, run, task_service):
+    benchmark(lambda: run(task_service.create_task("bench", "Summarize the repository layout", 120)))
+
+
+@pytest.mark.benchmark(group="task-service")
+def test_get_task(benchmark, run, task_service):
+    task = run(task_service.create_task("bench", "Summarize the repository layout", 120))
+    benchmark(lambda: run(task_service.get_task(task.task_id)))
+
+
+@pytest.mark.benchmark(group="task-service")
+def test_list_task_summaries(benchmark, run, task_service):
+    for i in range(200):
+        run(task_service.create_task("bench", f"prompt {i}", 120))
+    benchmark(lambda: run(task_service.list_task_summaries(limit=50)))
+
+
+@pytest.mark.benchmark(group="log-service")
+def test_create_logs_batch(benchmark, run, db):
+    service = LogService(db, timeseries=False)
+
+    def write():
+        logs = [LogDocument(agent_name="bench", message=f"line {i}", task_id="t") for i in range(200)]
+        return run(service.create_logs(logs))
+
+    benchmark(write)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Stand-in for the `claude` CLI, for load tests without the real binary.
+
+Accepts the same arguments the controller passes (only -p and
+--output-format matter) and is configured through environment variables:
+
+    FAKE_CLAUDE_LATENCY_MS     mean run time in ms (default 50)
+    FAKE_CLAUDE_LATENCY_DIST   fixed | uniform | exponential | lognormal (default fixed)
+    FAKE_CLAUDE_OUTPUT_BYTES   size of the result text (default 200)
+    FAKE_CLAUDE_FAILURE_RATE   probability of exiting with an error (default 0)
+    FAKE_CLAUDE_STREAM_EVENTS  assistant events emitted for stream-json (default 5)
+    FAKE_CLAUDE_SEED           random seed, for reproducible runs
+
+Point the controller at it with CLAUDE_CLI=/path/to/fake_claude.py.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def sample_latency(mean_ms: float, dist: str) -> float:
+    """Seconds to run, drawn from the configured distribution around mean_ms."""
+    if mean_ms <= 0:
+        return 0.0
+    if dist == "uniform":
+        value = random.uniform(0, 2 * mean_ms)
+    elif dist == "exponential":
+        value = random.expovariate(1 / mean_ms)
+    elif dist == "lognormal":
+        # sigma=1 gives a long tail; mu chosen so the mean stays mean_ms
+        sigma = 1.0
+        value = random.lognormvariate(math.log(mean_ms) - sigma ** 2 / 2, sigma)
+    else:
+        value = mean_ms
+    return value / 1000
+
+
+def make_text(size: int, prompt: str) -> str:
+    """Deterministic filler text of exactly `size` characters."""
+    seed = f"Echo: {prompt} "
+    return (seed * (size // max(len(seed), 1) + 1))[:size]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("-p", dest="prompt", default="")
+    parser.add_argument("--output-format", default="text")
+    parser.add_argument("--model", default="fake")
+    args, _ = parser.parse_known_args()
+
+    if "FAKE_CLAUDE_SEED" in os.environ:
+        random.seed(os.environ["FAKE_CLAUDE_SEED"])
+
+    latency = sample_latency(
+        _env_float("FAKE_CLAUDE_LATENCY_MS", 50),
+        os.environ.get("FAKE_CLAUDE_LATENCY_DIST", "fixed"),
+    )
+    output_bytes = int(_env_float("FAKE_CLAUDE_OUTPUT_BYTES", 200))
+    failure_rate = _env_float("FAKE_CLAUDE_FAILURE_RATE", 0)
+    text = make_text(output_bytes, args.prompt)
+    session_id = str(uuid.uuid4())
+
+    if args.output_format == "stream-json":
+        # Spread events over the run time, like the real CLI streaming tokens
+        events = max(1, int(_env_float("FAKE_CLAUDE_STREAM_EVENTS", 5)))
+        step = len(text) // events + 1
+        print(json.dumps({"type": "system", "subtype": "init", "session_id": session_id, "model": args.model}), flush=True)
+        for i in range(events):
+            time.sleep(latency / events)
+            chunk = text[i * step:(i + 1) * step]
+            print(json.dumps({
+                "type": "assistant",
+                "session_id": session_id,
+                "message": {"role": "assistant", "content": [{"type": "text", "text": chunk}]},
+            }), flush=True)
+    else:
+        time.sleep(latency)
+
+    if random.random() < failure_rate:
+        print("fake_claude: simulated failure", file=sys.stderr)
+        return 1
+
+    if args.output_format in ("json", "stream-json"):
+        print(json.dumps({
+            "type": "result",
+            "subtype": "success",
+            "is_error": False,
+            "duration_ms": int(latency * 1000),
+            "result": text,
+            "session_id": session_id,
+        }))
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Replay traffic recorded by the capture middleware (CAPTURE_FILE).
+
+Requests are re-issued at their original pace (--speed 2 plays it twice as
+fast, --speed 0 as fast as possible) and the whole capture can be scaled
+up with --scale N: N independent copies of the traffic run side by side.
+Task IDs created during the replay are mapped onto the IDs in the capture,
+so status polls and stops hit the replayed tasks.
+
+By default the API runs in-process against the fake CLI, like loadtest.run:
+
+    cd backend
+    python -m loadtest.replay capture.jsonl --scale 5 --speed 2
+    python -m loadtest.replay capture.jsonl --url http://127.0.0.1:8000 --api-key KEY
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from .run import add_server_args, start_target, summarize
+
+UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def load_capture(path: str, limit: Optional[int] = None) -> List[dict]:
+    """Read capture records ordered by time."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda r: r["ts"])
+    return records[:limit] if limit else records
+
+
+def route_of(path: str) -> str:
+    """Collapse IDs so latencies group per endpoint, not per task."""
+    return UUID_RE.sub("{id}", path)
+
+
+def agents_in(records: List[dict]) -> List[str]:
+    """Agent names submitted in the capture; the local server needs their directories."""
+    agents = set()
+    for record in records:
+        if record["method"] == "POST" and record["path"] == "/api/run":
+            try:
+                agents.add(json.loads(record["body"])["agent_name"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return sorted(agents) or ["loadtest"]
+
+
+class Lane:
+    """One copy of the captured traffic with its own original->replayed ID map."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.ids: Dict[str, str] = {}
+
+    def rewrite(self, text: str) -> str:
+        return UUID_RE.sub(lambda m: self.ids.get(m.group(0), m.group(0)), text)
+
+    def learn(self, record: dict, response: httpx.Response) -> None:
+        """Map the task_id a POST created in the capture to the one it created now."""
+        original = record.get("response_body")
+        if not original or response.status_code != 200:
+            return
+        try:
+            old_id = json.loads(original).get("task_id")
+            new_id = response.json().get("task_id")
+        except (ValueError, AttributeError):
+            return
+        if old_id and new_id:
+            self.ids[old_id] = new_id
+
+
+async def replay_one(
+    client: httpx.AsyncClient, lane: Lane, record: dict, results: List[dict]
+) -> None:
+    url = lane.rewrite(record["path"])
+    if record.get("query"):
+        url += "?" + lane.rewrite(record["query"])
+    headers = dict(record.get("headers") or {})
+    body = record.get("body") or None
+    if record.get("body_truncated"):
+        # Can't resend a cut body faithfully
+        results.append({"route": route_of(record["path"]), "status": "skipped_truncated"})
+        return
+
+    started = time.perf_counter()
+    try:
+        async with client.stream(record["method"], url, headers=headers, content=body) as response:
+            if headers.get("accept") == "text/event-stream" or "/stream" in record["path"]:
+                # Don't hold live streams open: first bytes are enough for timing
+                await response.aiter_bytes().__anext__()
+            else:
+                await response.aread()
+        status = response.status_code
+        if record["method"] == "POST":
+            lane.learn(record, response)
+    except (httpx.HTTPError, StopAsyncIteration) as e:
+        status = f"error_{type(e).__name__}"
+
+    results.append({
+        "route": f"{record['method']} {route_of(record['path'])}",
+        "status": status,
+        "original_status": record.get("status"),
+        "latency": time.perf_counter() - started,
+        "original_latency": (record.get("duration_ms") or 0) / 1000,
+    })
+
+
+async def replay(args: argparse.Namespace, records: List[dict], base_url: str, api_key: str) -> dict:
+    results: List[dict] = []
+    lanes = [Lane(i) for i in range(args.scale)]
+    limits = httpx.Limits(max_connections=args.max_connections)
+    origin = records[0]["ts"]
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"X-API-Key": api_key}, timeout=args.http_timeout, limits=limits
+    ) as client:
+        started = time.perf_counter()
+
+        async def run_lane(lane: Lane) -> None:
+            # Requests of one lane keep their order and spacing; a task is
+            # polled only after the POST that created it has returned
+            pending = set()
+            for record in records:
+                if args.speed > 0:
+                    due = (record["ts"] - origin) / args.speed
+                    delay = due - (time.perf_counter() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                call = replay_one(client, lane, record, results)
+                if record["method"] == "POST":
+                    await call
+                else:
+                    task = asyncio.create_task(call)
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+
+        await asyncio.gather(*[run_lane(lane) for lane in lanes])
+        elapsed = time.perf_counter() - started
+
+    by_route: Dict[str, List[dict]] = defaultdict(list)
+    for result in results:
+        by_route[result["route"]].append(result)
+
+    routes = {}
+    for route, items in sorted(by_route.items()):
+        timed = [r for r in items if "latency" in r]
+        statuses: Dict[str, int] = defaultdict(int)
+        for item in items:
+            statuses[str(item["status"])] += 1
+        routes[route] = {
+            "count": len(items),
+            "status": dict(statuses),
+            "mismatched_status": sum(
+                1 for r in timed
+                if isinstance(r["status"], int) and r["original_status"] and r["status"] != r["original_status"]
+            ),
+            "latency": summarize([r["latency"] for r in timed]),
+            "original_latency": summarize([r["original_latency"] for r in timed]),
+        }
+
+    captured_span = records[-1]["ts"] - origin
+    return {
+        "captured_requests": len(records),
+        "captured_span_sec": round(captured_span, 3),
+        "scale": args.scale,
+        "speed": args.speed,
+        "replayed_requests": len(results),
+        "elapsed_sec": round(elapsed, 3),
+        "rate_per_sec": round(len(results) / elapsed, 2) if elapsed else None,
+        "routes": routes,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="JSONL file written by the capture middleware")
+    parser.add_argument("--scale", type=int, default=1, help="run N copies of the traffic concurrently")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression; 0 = no pacing")
+    parser.add_argument("--limit", type=int, help="replay only the first N records")
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--http-timeout", type=float, default=30)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_server_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    records = load_capture(args.capture, args.limit)
+    if not records:
+        print("Capture is empty", file=sys.stderr)
+        return 1
+
+    base_url, api_key, server = start_target(args, agents_in(records))
+    try:
+        report = asyncio.run(replay(args, records, base_url, api_key))
+    finally:
+        if server:
+            server.stop()
+    report["loop_lag"] = summarize(server.lag_samples) if server else None
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(
+        f"Replayed {report['replayed_requests']} requests "
+        f"({report['captured_requests']} captured over {report['captured_span_sec']}s, "
+        f"x{args.scale}, speed {args.speed}) in {report['elapsed_sec']}s "
+        f"= {report['rate_per_sec']} req/s"
+    )
+    for route, stats in report["routes"].items():
+        print(f"  {route}: n={stats['count']} status={stats['status']} "
+              f"latency={stats['latency']} (captured {stats['original_latency']})")
+    if report["loop_lag"]:
+        print(f"Event-loop lag: {report['loop_lag']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Shared fixtures for the backend tests.
+
+Run from backend/:
+    python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("CLAUDE_API_KEY", "test-key")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app import database  # noqa: E402
+from app.config import get_settings  # noqa: E402
+
+# Storage engines the services must behave identically on
+BACKENDS = ("memory", "mongomock")
+
+
+async def open_backend(name: str):
+    """Open an empty database of the given kind, indexed like at startup."""
+    if name == "mongomock":
+        db = AsyncMongoMockClient()["tests"]
+        # Only the unique index the stats upserts rely on; the others are for speed
+        await db.task_stats.create_index(
+            [("granularity", 1), ("agent_name", 1), ("model", 1), ("bucket", 1)],
+            unique=True,
+        )
+        return db
+    await database.open_embedded_storage(get_settings())
+    return database.db.db
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """App settings pointed at a temp dir, on the memory storage backend."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "storage_backend", "memory")
+    monkeypatch.setattr(settings, "sqlite_path", str(tmp_path / "storage.sqlite"))
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+    monkeypatch.setattr(settings, "result_blob_dir", str(tmp_path / "blobs"))
+    monkeypatch.setattr(database.db, "client", None)
+    monkeypatch.setattr(database.db, "db", None)
+    monkeypatch.setattr(database.db, "logs_timeseries", False)
+    return settings
+
+
+@pytest.fixture
+def open_db(settings):
+    """open_backend(), with the settings patched."""
+    return open_backend
+
+
+@pytest.fixture
+def on_each_backend(settings):
+    """Run `scenario(db)` on a fresh database of every backend; returns {backend: result}."""
+    def run(scenario):
+        async def on(name):
+            return await scenario(await open_backend(name))
+        return {name: asyncio.run(on(name)) for name in BACKENDS}
+    return run
+
+
+@pytest.fixture
+def client(settings, tmp_path, monkeypatch):
+    """TestClient for the app on the memory backend, sending the API key."""
+    from app.main import app
+
+    monkeypatch.setattr(settings, "logs_dir", str(tmp_path / "logs"))
+    monkeypatch.setattr(settings, "agents_dir", str(tmp_path / "agents"))
+    monkeypatch.setattr(settings, "log_flush_interval_sec", 0.02)
+    with TestClient(app, headers={"X-API-Key": settings.claude_api_key}) as client:
+        yield client
+
+
+@pytest.fixture
+def submit(client):
+    """POST /api/run for an agent without a directory; the task fails right away, logging as it goes."""
+    def submit(prompt: str = "hi") -> str:
+        return client.post("/api/run", json={"agent_name": "missing", "prompt": prompt}).json()["task_id"]
+    return submit
+
+
+@pytest.fixture
+def wait_for_logs(client):
+    """Wait until at least `count` logs are flushed to storage."""
+    def wait(count: int) -> None:
+        for _ in range(200):
+            if client.get("/api/logs", params={"limit": count}).json()["count"] >= count:
+                return
+            time.sleep(0.01)
+        raise AssertionError(f"fewer than {count} logs written")
+    return wait
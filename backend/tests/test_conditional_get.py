@@ -0,0 +1,43 @@
+"""If-None-Match on /status, /tasks and /logs: 304 while nothing changed."""
+
+
+def test_status(client, submit):
+    task_id = submit()
+    first = client.get(f"/api/status/{task_id}")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"') and first.json()["status"] == "failed"
+
+    for header in (etag, etag.removeprefix("W/"), f'W/"stale", {etag}', "*"):
+        cached = client.get(f"/api/status/{task_id}", headers={"If-None-Match": header})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["etag"] == etag
+    stale = client.get(f"/api/status/{task_id}", headers={"If-None-Match": 'W/"stale"'})
+    assert stale.status_code == 200 and stale.json() == first.json()
+    assert client.get("/api/status/missing", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_task_list(client, submit):
+    submit()
+    first = client.get("/api/tasks", params={"limit": 1})
+    etag = first.headers["etag"]
+    assert client.get("/api/tasks", params={"limit": 1}, headers={"If-None-Match": etag}).status_code == 304
+    # Same page under other filters is a different list
+    assert client.get("/api/tasks", params={"agent_name": "other"}, headers={"If-None-Match": etag}).status_code == 200
+
+    new_id = submit()
+    changed = client.get("/api/tasks", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert [task["task_id"] for task in changed.json()["tasks"]] == [new_id]
+
+
+def test_log_list(client, submit, wait_for_logs):
+    submit()
+    wait_for_logs(1)
+    first = client.get("/api/logs")
+    etag = first.headers["etag"]
+    assert client.get("/api/logs", headers={"If-None-Match": etag}).status_code == 304
+
+    submit()
+    wait_for_logs(first.json()["count"] + 1)
+    changed = client.get("/api/logs", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
@@ -0,0 +1,256 @@
+"""Embedded engine: query, sort, projection, update and index semantics.
+
+Filters, updates and unique indexes run on both backends and must agree;
+pipeline expressions mongomock can't evaluate are checked against expected
+values on the embedded engine only.
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from app.storage import EmbeddedDatabase, StorageFull, open_embedded
+
+DOCS = [
+    {"_id": 1, "n": 1, "s": "Alpha", "tags": ["x", "y"], "meta": {"k": "a"}},
+    {"_id": 2, "n": 2, "s": "beta", "tags": ["y"], "meta": {"k": "b"}},
+    {"_id": 3, "n": 3, "s": "gamma", "tags": [], "meta": {}},
+    {"_id": 4, "n": "3", "s": None},
+    {"_id": 5, "n": 5.5, "tags": ["x"]},
+]
+
+FILTERS = [
+    {"n": 2},
+    {"n": {"$gt": 2}},
+    {"n": {"$gte": 2, "$lt": 5}},
+    {"n": {"$lte": 1}},
+    {"n": {"$in": [1, "3", 7]}},
+    {"n": {"$nin": [1, 2]}},
+    {"n": {"$ne": 3}},
+    {"s": None},
+    {"s": {"$exists": False}},
+    {"meta.k": {"$exists": True}},
+    {"meta.k": "b"},
+    {"tags": "x"},
+    {"tags": {"$in": ["y"]}},
+    {"s": {"$regex": "^a", "$options": "i"}},
+    {"s": re.compile("ta$")},
+    {"n": {"$not": {"$gt": 2}}},
+    {"$or": [{"n": 1}, {"tags": "x"}]},
+    {"$and": [{"n": {"$gt": 1}}, {"tags": {"$exists": True}}]},
+    {"$nor": [{"n": 1}, {"s": None}]},
+]
+
+
+async def ids(cursor) -> list:
+    return [doc["_id"] async for doc in cursor]
+
+
+def test_filters(on_each_backend):
+    async def scenario(db):
+        await db.items.insert_many([dict(doc) for doc in DOCS])
+        return [sorted(await ids(db.items.find(query))) for query in FILTERS]
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    assert results["memory"][:3] == [[2], [3, 5], [2, 3]]
+    assert results["memory"][7] == [4, 5]
+
+
+def test_sort_skip_limit_projection(on_each_backend):
+    async def scenario(db):
+        await db.items.insert_many([dict(doc) for doc in DOCS])
+        return [
+            # Mixed types sort in BSON order: missing/null, numbers, strings
+            await ids(db.items.find({}).sort("s", 1)),
+            await ids(db.items.find({}).sort([("meta.k", -1), ("_id", 1)])),
+            await ids(db.items.find({}).sort("n", -1).skip(1).limit(2)),
+            await db.items.find({"_id": 1}, {"meta.k": 1, "_id": 0}).to_list(None),
+            await db.items.find({"_id": 1}, {"tags": 0, "meta": 0}).to_list(None),
+            await db.items.find_one({"n": {"$gt": 1}}, {"s": 1}, sort=[("n", -1)]),
+        ]
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    sort_s, multi_key, page, included, excluded, first = results["memory"]
+    assert sort_s[-3:] == [1, 2, 3] and multi_key == [2, 1, 3, 4, 5]
+    # "3" (a string) sorts above every number
+    assert page == [5, 3]
+    assert included == [{"meta": {"k": "a"}}]
+    assert excluded == [{"_id": 1, "n": 1, "s": "Alpha"}]
+    assert first == {"_id": 5}
+
+
+def test_update_operators(on_each_backend):
+    async def scenario(db):
+        await db.items.insert_one({"_id": 1, "n": 1, "low": 5, "high": 5, "meta": {"k": "a", "j": 1}})
+        await db.items.update_one({"_id": 1}, {
+            "$set": {"meta.k": "b", "new.deep": True},
+            "$unset": {"meta.j": ""},
+            "$inc": {"n": 2, "count": 1},
+            "$max": {"high": 7, "first_max": 1},
+            "$min": {"low": 3},
+        })
+        await db.items.update_one({"_id": 1}, {"$max": {"high": 6}, "$min": {"low": 4}})
+        updated = await db.items.update_many({"n": {"$gte": 3}}, {"$inc": {"n": 1}})
+        return await db.items.find_one({"_id": 1}), updated.matched_count
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    assert results["memory"] == ({
+        "_id": 1, "n": 4, "low": 3, "high": 7, "meta": {"k": "b"},
+        "new": {"deep": True}, "count": 1, "first_max": 1,
+    }, 1)
+
+
+def test_upserts(on_each_backend):
+    async def scenario(db):
+        query = {"key": "a", "kind": "x", "n": {"$gt": 3}}
+        update = {"$setOnInsert": {"created": 1}, "$inc": {"hits": 1}}
+        inserted = await db.items.update_one(query, update, upsert=True)
+        await db.items.update_one({"key": "a", "kind": "x"}, update, upsert=True)
+        after = await db.items.find_one_and_update(
+            {"key": "b"}, update, projection={"_id": 0}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        missing = await db.items.find_one_and_update({"key": "c"}, update)
+        docs = await db.items.find({}, {"_id": 0}).sort("key", 1).to_list(None)
+        return inserted.upserted_id is not None, after, missing, docs
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    assert results["memory"] == (True, {"key": "b", "created": 1, "hits": 1}, None, [
+        # Only equalities seed the upserted document
+        {"key": "a", "kind": "x", "created": 1, "hits": 2},
+        {"key": "b", "created": 1, "hits": 1},
+    ])
+
+
+def test_unique_indexes(on_each_backend):
+    """The single-field (task_id) and compound (task_stats) unique paths."""
+    async def scenario(db):
+        await db.items.create_index("task_id", unique=True)
+        await db.items.create_index([("agent", 1), ("model", 1)], unique=True, name="agent_model")
+        await db.items.insert_many([
+            {"task_id": "t1", "agent": "a", "model": "m"},
+            {"task_id": "t2", "agent": "a"},
+        ])
+        rejected = []
+        for write in (
+            db.items.insert_one({"task_id": "t1", "agent": "b"}),
+            db.items.update_one({"task_id": "t2"}, {"$set": {"task_id": "t1"}}),
+            db.items.insert_one({"task_id": "t3", "agent": "a", "model": "m"}),
+            # A missing field counts as null in a compound index
+            db.items.insert_one({"task_id": "t4", "agent": "a", "model": None}),
+            db.items.update_one({"agent": "z"}, {"$set": {"task_id": "t1"}}, upsert=True),
+        ):
+            try:
+                await write
+                rejected.append(False)
+            except DuplicateKeyError:
+                rejected.append(True)
+        await db.items.update_one({"task_id": "t2"}, {"$set": {"model": "n"}})
+        await db.items.insert_one({"task_id": "t5", "agent": "a"})
+        await db.items.delete_one({"task_id": "t1"})
+        await db.items.insert_one({"task_id": "t1", "agent": "a", "model": "m"})
+        return rejected, sorted([doc["task_id"] async for doc in db.items.find({}, {"task_id": 1})])
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    assert results["memory"] == ([True] * 5, ["t1", "t2", "t5"])
+
+
+def test_unique_index_over_duplicates_fails(on_each_backend):
+    async def scenario(db):
+        await db.items.insert_many([{"k": 1}, {"k": 1}])
+        with pytest.raises(DuplicateKeyError):
+            await db.items.create_index("k", unique=True)
+        return True
+
+    assert on_each_backend(scenario) == {"memory": True, "mongomock": True}
+
+
+def test_pipeline_update_expressions():
+    now = datetime(2024, 5, 1, 12, 0, 30)
+
+    async def scenario():
+        db = EmbeddedDatabase()
+        await db.items.insert_many([
+            {"_id": 1, "started_at": now - timedelta(seconds=12.3456), "n": 2},
+            {"_id": 2, "n": None},
+        ])
+        await db.items.update_many({}, [{"$set": {
+            "text": {"$literal": "$n"},
+            "duration": {"$cond": [
+                {"$ifNull": ["$started_at", False]},
+                {"$round": [{"$divide": [{"$subtract": [now, "$started_at"]}, 1000]}, 2]},
+                None,
+            ]},
+            "label": {"$cond": {"if": "$n", "then": {"$add": ["$n", 1]}, "else": "none"}},
+            "scaled": {"$multiply": ["$n", 3]},
+        }}])
+        return await db.items.find({}, {"_id": 0, "text": 1, "duration": 1, "label": 1, "scaled": 1}).to_list(None)
+
+    assert asyncio.run(scenario()) == [
+        {"text": "$n", "duration": 12.35, "label": 3, "scaled": 6},
+        {"text": "$n", "duration": None, "label": "none", "scaled": None},
+    ]
+
+
+def test_unsupported_operators_fail_loudly():
+    async def scenario():
+        db = EmbeddedDatabase()
+        await db.items.insert_one({"n": 1})
+        for call in (
+            db.items.find({"n": {"$mod": [2, 1]}}).to_list(None),
+            db.items.update_one({}, {"$push": {"tags": "x"}}),
+            db.items.update_one({}, [{"$project": {"n": 1}}]),
+        ):
+            with pytest.raises(NotImplementedError):
+                await call
+        with pytest.raises(OperationFailure):
+            await db.items.find({"$text": {"$search": "x"}}).to_list(None)
+
+    asyncio.run(scenario())
+
+
+def test_max_documents():
+    async def scenario():
+        db = EmbeddedDatabase(max_documents=3)
+        await db.tasks.insert_many([{"n": 1}, {"n": 2}])
+        await db.logs.insert_one({"n": 3})
+        full = []
+        for write in (
+            db.tasks.insert_one({"n": 4}),
+            db.logs.update_one({"n": 5}, {"$set": {"m": 1}}, upsert=True),
+        ):
+            with pytest.raises(StorageFull) as error:
+                await write
+            full.append(error.value.code)
+        # Updates in place and inserts after a delete still work
+        await db.tasks.update_many({}, {"$set": {"m": 1}})
+        await db.tasks.delete_one({"n": 1})
+        await db.logs.insert_one({"n": 6})
+        return full, db.document_count()
+
+    assert asyncio.run(scenario()) == ([146, 146], 3)
+
+
+def test_max_documents_on_load(settings):
+    async def write():
+        db = await open_embedded("memory-sqlite", settings.sqlite_path)
+        await db.tasks.insert_many([{"n": i} for i in range(5)])
+        db.close()
+
+    async def reopen(limit):
+        db = await open_embedded("memory-sqlite", settings.sqlite_path, max_documents=limit)
+        count = db.document_count()
+        db.close()
+        return count
+
+    asyncio.run(write())
+    assert asyncio.run(reopen(5)) == 5
+    with pytest.raises(StorageFull):
+        asyncio.run(reopen(4))
@@ -0,0 +1,85 @@
+"""/export/tasks and /export/logs: NDJSON, oldest first, optionally gzipped."""
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import database
+from app.models.log import LogDocument, LogLevel
+from app.models.task import TaskDocument, TaskStatus
+from app.routes.export import CHUNK_BYTES
+from app.services.log_service import LogService
+
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+# Big enough that the export takes several chunks
+TASKS = 40
+PROMPT_BYTES = CHUNK_BYTES // 10
+
+
+@pytest.fixture
+def seeded(client):
+    async def seed():
+        db = database.get_database()
+        await db.tasks.insert_many([
+            TaskDocument(
+                task_id=f"t{i:02d}",
+                agent_name="alpha" if i % 2 else "beta",
+                prompt=f"{i:02d}" * (PROMPT_BYTES // 2),
+                status=TaskStatus.COMPLETED,
+                created_at=START + timedelta(minutes=i),
+            ).to_mongo(compress_threshold=1024)  # stored compressed, exported plain
+            for i in reversed(range(TASKS))
+        ])
+        await LogService(db, timeseries=False).create_logs([
+            LogDocument(
+                log_id=f"l{i}", agent_name="alpha", task_id=f"t{i % 2:02d}",
+                level=LogLevel.ERROR if i % 3 == 0 else LogLevel.INFO,
+                message=f"m{i}", timestamp=START + timedelta(seconds=i),
+            )
+            for i in range(10)
+        ])
+    client.portal.call(seed)
+    return client
+
+
+def rows(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_tasks(seeded):
+    response = seeded.get("/api/export/tasks")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    disposition = response.headers["content-disposition"]
+    assert disposition.startswith('attachment; filename="tasks-') and disposition.endswith('.ndjson"')
+
+    tasks = rows(response)
+    assert [task["task_id"] for task in tasks] == [f"t{i:02d}" for i in range(TASKS)]
+    assert tasks[3]["prompt"] == "03" * (PROMPT_BYTES // 2) and tasks[3]["compressed"] is True
+    assert not any(key.endswith("_terms") for key in tasks[3])
+
+    filtered = rows(seeded.get("/api/export/tasks", params={
+        "agent_name": "alpha", "since": (START + timedelta(minutes=10)).isoformat(),
+        "until": (START + timedelta(minutes=20)).isoformat(),
+    }))
+    assert [task["task_id"] for task in filtered] == [f"t{i:02d}" for i in range(11, 20, 2)]
+    assert seeded.get("/api/export/tasks", params={"status": "running"}).content == b""
+
+
+def test_tasks_gzip(seeded):
+    plain = seeded.get("/api/export/tasks").content
+    # identity: what's checked is the export's own gzip, not the transport's
+    response = seeded.get("/api/export/tasks", params={"compress": "true"}, headers={"Accept-Encoding": "identity"})
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+    assert len(response.content) < len(plain) and gzip.decompress(response.content) == plain
+
+
+def test_logs(seeded):
+    logs = rows(seeded.get("/api/export/logs", params={"task_id": "t00"}))
+    assert [log["log_id"] for log in logs] == ["l0", "l2", "l4", "l6", "l8"]
+    errors = rows(seeded.get("/api/export/logs", params={"level": "error"}))
+    assert [log["log_id"] for log in errors] == ["l0", "l3", "l6", "l9"]
+    response = seeded.get("/api/export/logs", params={"compress": "true"}, headers={"Accept-Encoding": "identity"})
+    assert len(gzip.decompress(response.content).splitlines()) == 10
@@ -0,0 +1,26 @@
+"""Per-agent log files: rotation keeps every record."""
+import gzip
+
+from app.services.file_logger import AgentFileLogger
+
+
+def test_back_to_back_rollovers_keep_every_line(settings, tmp_path, monkeypatch):
+    logs_dir = tmp_path / "logs"
+    monkeypatch.setattr(settings, "logs_dir", str(logs_dir))
+    monkeypatch.setattr(settings, "log_file_max_bytes", 2000)
+    monkeypatch.setattr(settings, "log_file_backup_count", 20)
+    monkeypatch.setattr(settings, "log_file_compression", "gzip")
+
+    file_logger = AgentFileLogger()
+    for i in range(400):
+        file_logger.info("alpha", "task", f"line {i:04d} " + "x" * 40)
+    file_logger.stop()
+
+    backups = sorted(logs_dir.glob("alpha.log.*"))
+    assert len(backups) > 5 and all(path.suffix == ".gz" for path in backups)
+    text = (logs_dir / "alpha.log").read_text() + "".join(
+        gzip.open(path, "rt").read() for path in backups
+    )
+    assert sorted(line.split("] ")[-1][:9] for line in text.splitlines()) == [
+        f"line {i:04d}" for i in range(400)
+    ]
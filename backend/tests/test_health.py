@@ -0,0 +1,68 @@
+"""/health/ready: 200 when healthy, 503 naming each check that failed."""
+import asyncio
+
+import pytest
+
+from app.routes import health
+from app.services import claude_executor
+from app.services.log_pipeline import LogPipeline
+from app.services.profiler import loop_monitor
+
+
+class SlowDatabase:
+    def __init__(self, delay: float = 0, error: Exception = None):
+        self.delay, self.error = delay, error
+
+    async def command(self, name):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"ok": 1}
+
+
+def ready(client):
+    response = client.get("/health/ready")
+    return response.status_code, response.json()
+
+
+def test_ready(client, settings, monkeypatch):
+    monkeypatch.setattr(settings, "max_concurrent_tasks", 4)
+    status, body = ready(client)
+    assert status == 200 and body["status"] == "ready" and body["failed"] == []
+    assert body["mongo_ping_ms"] >= 0 and body["log_queue_depth"] == 0
+    assert (body["waiting_tasks"], body["free_slots"]) == (0, 4)
+
+    monkeypatch.setattr(settings, "max_concurrent_tasks", 0)
+    assert ready(client)[1]["free_slots"] is None
+
+
+@pytest.mark.parametrize("database", [SlowDatabase(delay=0.5), SlowDatabase(error=ConnectionError("down"))],
+                         ids=["slow", "down"])
+def test_mongo(client, settings, monkeypatch, database):
+    monkeypatch.setattr(settings, "ready_max_mongo_ping_ms", 50)
+    monkeypatch.setattr(health, "get_database", lambda: database)
+    status, body = ready(client)
+    assert status == 503 and body["status"] == "not_ready"
+    assert body["failed"] == ["mongo"] and body["mongo_ping_ms"] is None
+
+
+def test_loop_lag(client, settings, monkeypatch):
+    monkeypatch.setattr(loop_monitor, "recent_lag", lambda window: 0.8)
+    status, body = ready(client)
+    assert (status, body["failed"], body["loop_lag_ms"]) == (503, ["loop_lag"], 800.0)
+
+    # 0 turns the check off
+    monkeypatch.setattr(settings, "ready_max_loop_lag_ms", 0)
+    assert ready(client)[0] == 200
+
+
+def test_queues(client, settings, monkeypatch):
+    monkeypatch.setattr(LogPipeline, "queue_depth", property(lambda self: 20))
+    monkeypatch.setattr(claude_executor, "_waiting", 3)
+    assert ready(client)[0] == 200  # waiting-task limit is off by default
+
+    monkeypatch.setattr(settings, "ready_max_log_queue", 10)
+    monkeypatch.setattr(settings, "ready_max_waiting_tasks", 2)
+    status, body = ready(client)
+    assert status == 503 and body["failed"] == ["log_queue", "waiting_tasks"]
+    assert (body["log_queue_depth"], body["waiting_tasks"]) == (20, 3)
@@ -0,0 +1,81 @@
+"""Write-behind log pipeline: batching, flush on stop, drop/block overflow."""
+import asyncio
+
+import pytest
+
+from app.models.log import LogDocument, LogLevel
+from app.services.log_pipeline import LogPipeline
+
+
+def entry(i: int) -> LogDocument:
+    return LogDocument(log_id=f"l{i:03d}", agent_name="alpha", level=LogLevel.INFO, message=f"m{i}")
+
+
+@pytest.fixture
+def pipeline_settings(settings, monkeypatch):
+    """Settings with an interval long enough that only full batches and stop() flush."""
+    def configure(queue_size: int = 100, batch_size: int = 50, interval: float = 0.3, policy: str = "drop"):
+        monkeypatch.setattr(settings, "log_queue_size", queue_size)
+        monkeypatch.setattr(settings, "log_batch_size", batch_size)
+        monkeypatch.setattr(settings, "log_flush_interval_sec", interval)
+        monkeypatch.setattr(settings, "log_overflow_policy", policy)
+    return configure
+
+
+async def stored_ids(db) -> list:
+    return sorted([doc["log_id"] async for doc in db.logs.find({}, {"log_id": 1})])
+
+
+def test_full_batches_flush_and_stop_flushes_the_rest(pipeline_settings, open_db):
+    pipeline_settings(batch_size=5)
+
+    async def scenario():
+        db = await open_db("memory")
+        pipeline = LogPipeline()
+        pipeline.start(db)
+        for i in range(12):
+            await pipeline.submit(entry(i))
+        await asyncio.sleep(0.05)
+        before_stop = len(await stored_ids(db))
+        await asyncio.wait_for(pipeline.stop(), timeout=5)
+        # Not running any more: written straight through
+        await pipeline.submit(entry(12))
+        return before_stop, await stored_ids(db), pipeline.written
+
+    before_stop, stored, written = asyncio.run(scenario())
+    assert before_stop == 10
+    assert stored == [f"l{i:03d}" for i in range(13)] and written == 12
+
+
+def test_drop_policy(pipeline_settings, open_db):
+    pipeline_settings(queue_size=10)
+
+    async def scenario():
+        db = await open_db("memory")
+        pipeline = LogPipeline()
+        pipeline.start(db)
+        # submit() doesn't yield under "drop", so the flusher can't drain in between
+        for i in range(25):
+            await pipeline.submit(entry(i))
+        depth = pipeline.queue_depth
+        await pipeline.stop()
+        return depth, pipeline.dropped, await stored_ids(db)
+
+    depth, dropped, stored = asyncio.run(scenario())
+    assert (depth, dropped) == (10, 15)
+    assert stored == [f"l{i:03d}" for i in range(10)]
+
+
+def test_block_policy(pipeline_settings, open_db):
+    pipeline_settings(queue_size=3, batch_size=2, policy="block")
+
+    async def scenario():
+        db = await open_db("memory")
+        pipeline = LogPipeline()
+        pipeline.start(db)
+        await asyncio.wait_for(asyncio.gather(*(pipeline.submit(entry(i)) for i in range(20))), timeout=2)
+        await pipeline.stop()
+        return pipeline.dropped, await stored_ids(db)
+
+    dropped, stored = asyncio.run(scenario())
+    assert dropped == 0 and stored == [f"l{i:03d}" for i in range(20)]
@@ -0,0 +1,83 @@
+"""/logs/stream: backfill, then `ready`, then live entries."""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.models.log import LogDocument, LogLevel
+from app.routes.logs import stream_logs
+from app.services.log_broadcaster import log_broadcaster
+from app.services.log_service import LogService
+
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class OpenConnection:
+    """Stands in for the Request of a client that stays connected."""
+
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def entry(log_id: str, agent_name: str = "alpha", seconds: int = 0, level=LogLevel.INFO) -> LogDocument:
+    return LogDocument(
+        log_id=log_id, agent_name=agent_name, level=level,
+        message=f"message {log_id}", timestamp=START + timedelta(seconds=seconds),
+    )
+
+
+def parse(frame: str) -> tuple:
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+async def open_stream(db, **filters):
+    service = LogService(db, timeseries=False)
+    filters = {"agent_name": None, "task_id": None, "level": None, "backfill": 50, **filters}
+    response = await stream_logs(OpenConnection(), service=service, _="key", **filters)
+    return response.body_iterator
+
+
+def test_backfill_ready_then_live(open_db):
+    async def scenario():
+        db = await open_db("memory")
+        await LogService(db, timeseries=False).create_logs(
+            [entry(f"l{i}", seconds=i) for i in range(3)] + [entry("b0", agent_name="beta")]
+        )
+        baseline = log_broadcaster.subscriber_count
+        frames = await open_stream(db, agent_name="alpha", backfill=2)
+        # Nothing subscribed until the response is streamed
+        assert log_broadcaster.subscriber_count == baseline
+        backfill = [parse(await frames.__anext__()) for _ in range(3)]
+
+        log_broadcaster.publish(entry("l2", seconds=2))  # written during the backfill query
+        log_broadcaster.publish(entry("b1", agent_name="beta"))
+        log_broadcaster.publish(entry("l3", seconds=3))
+        live = parse(await asyncio.wait_for(frames.__anext__(), 2))
+        subscribed = log_broadcaster.subscriber_count - baseline
+        await frames.aclose()
+        return backfill, live, subscribed, log_broadcaster.subscriber_count - baseline
+
+    backfill, live, subscribed, after_close = asyncio.run(scenario())
+    assert [(event, data.get("log_id")) for event, data in backfill] == [
+        ("log", "l1"), ("log", "l2"), ("ready", None),
+    ]
+    assert backfill[2][1] == {"backfill": 2}
+    assert live[0] == "log" and live[1]["log_id"] == "l3" and live[1]["message"] == "message l3"
+    assert (subscribed, after_close) == (1, 0)
+
+
+def test_ready_without_backfill(open_db):
+    async def scenario():
+        db = await open_db("memory")
+        await LogService(db, timeseries=False).create_logs([entry("l0")])
+        frames = await open_stream(db, backfill=0, level="error")
+        ready = parse(await frames.__anext__())
+        log_broadcaster.publish(entry("l1"))
+        log_broadcaster.publish(entry("l2", level=LogLevel.ERROR))
+        live = parse(await asyncio.wait_for(frames.__anext__(), 2))
+        await frames.aclose()
+        return ready, live
+
+    ready, live = asyncio.run(scenario())
+    assert ready == ("ready", {"backfill": 0})
+    assert live[1]["log_id"] == "l2" and live[1]["level"] == "error"
@@ -0,0 +1,46 @@
+"""Metric labels stay bounded without touching the disk on every lookup."""
+import os
+
+import pytest
+
+from app.services import metrics
+
+
+@pytest.fixture
+def agents(settings, tmp_path, monkeypatch):
+    agents_dir = tmp_path / "agents"
+    for name in ("alpha", "beta"):
+        (agents_dir / name).mkdir(parents=True)
+    monkeypatch.setattr(settings, "agents_dir", str(agents_dir))
+    monkeypatch.setattr(metrics, "_agent_labels", set())
+    monkeypatch.setattr(metrics, "_agent_dirs", frozenset())
+    monkeypatch.setattr(metrics, "_agent_dirs_listed", ("", float("-inf")))
+
+    listings = []
+    scandir = os.scandir
+    monkeypatch.setattr(metrics.os, "scandir", lambda path: listings.append(path) or scandir(path))
+    return agents_dir, listings
+
+
+def test_agent_label(agents, settings, monkeypatch):
+    agents_dir, listings = agents
+    assert metrics.agent_label("alpha") == "alpha"
+    assert metrics.agent_label("nope") == metrics.UNKNOWN_AGENT
+    assert metrics.agent_label("") == metrics.UNKNOWN_AGENT
+
+    monkeypatch.setattr(settings, "metrics_max_agents", 1)
+    assert metrics.agent_label("beta") == metrics.OTHER_AGENT
+    assert len(listings) == 1
+
+
+def test_misses_relist_at_most_once_per_interval(agents, monkeypatch):
+    agents_dir, listings = agents
+    for _ in range(100):
+        assert metrics.agent_label("gamma") == metrics.UNKNOWN_AGENT
+    assert len(listings) == 1
+
+    # A new agent shows up after the next refresh
+    (agents_dir / "gamma").mkdir()
+    monkeypatch.setattr(metrics, "_agent_dirs_listed", (str(agents_dir), float("-inf")))
+    assert metrics.agent_label("gamma") == "gamma"
+    assert len(listings) == 2
@@ -0,0 +1,60 @@
+"""Cursor pagination on /tasks and /logs: pages chain, bad cursors are 400."""
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+def walk(client, path: str, rows: str, key: str, **params) -> list:
+    """IDs on each page, following next_cursor to the end."""
+    pages, cursor = [], None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages.append([row[key] for row in body[rows]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    moment = datetime(2024, 5, 1, 12, 0, 0, 123456)
+    cursor = encode_cursor(moment, "t-1")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (moment, "t-1")
+
+
+def test_task_pages(client, submit):
+    task_ids = [submit(f"prompt {i}") for i in range(7)]
+    pages = walk(client, "/api/tasks", "tasks", "task_id", limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [task_id for page in pages for task_id in page] == task_ids[::-1]
+    assert walk(client, "/api/tasks", "tasks", "task_id", limit=7) == [task_ids[::-1]]
+    assert walk(client, "/api/tasks", "tasks", "task_id", limit=3, agent_name="other") == [[]]
+
+
+def test_log_pages(client, submit, wait_for_logs):
+    submit("one")
+    submit("two")
+    wait_for_logs(4)
+    everything = client.get("/api/logs").json()
+    assert everything["count"] > 2 and everything["next_cursor"] is None
+    pages = walk(client, "/api/logs", "logs", "log_id", limit=2)
+    assert [log_id for page in pages for log_id in page] == [log["log_id"] for log in everything["logs"]]
+
+
+@pytest.mark.parametrize("cursor", [
+    "zzz",
+    base64.urlsafe_b64encode(b'["not a date","t"]').decode(),
+    base64.urlsafe_b64encode(b'{"a":1}').decode(),
+])
+@pytest.mark.parametrize("path", ["/api/tasks", "/api/logs"])
+def test_bad_cursor(client, path, cursor):
+    response = client.get(path, params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid cursor")
+    # Also on the If-None-Match path, which runs a different query
+    assert client.get(path, params={"cursor": cursor}, headers={"If-None-Match": "*"}).status_code == 400
@@ -0,0 +1,81 @@
+"""/tasks/{id}/result: whole body, single byte ranges (206) and 416."""
+from pathlib import Path
+
+import pytest
+
+from app import database
+from app.models.task import TaskStatus
+from app.services.blob_store import CHUNK_SIZE
+from app.services.task_service import TaskService
+
+# Spans several read chunks; each line is its own offset, zero-padded
+BIG = "".join(f"{i:07d}\n" for i in range(CHUNK_SIZE * 3 // 8))
+
+
+@pytest.fixture
+def finish(client, settings, monkeypatch):
+    """Complete a new task with the given result, inside the app's event loop."""
+    monkeypatch.setattr(settings, "result_blob_threshold", 64 * 1024)
+
+    def finish(result: str) -> str:
+        async def run():
+            service = TaskService(database.get_database())
+            task = await service.create_task("alpha", "p", 60)
+            await service.update_status(task.task_id, TaskStatus.RUNNING)
+            await service.update_status(task.task_id, TaskStatus.COMPLETED, result=result)
+            return task.task_id
+        return client.portal.call(run)
+    return finish
+
+
+@pytest.mark.parametrize("result", [BIG, "short inline result"], ids=["blob", "inline"])
+def test_ranges(client, finish, result):
+    task_id = finish(result)
+    url = f"/api/tasks/{task_id}/result"
+    size = len(result)
+
+    whole = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert whole.status_code == 200 and whole.text == result
+    assert whole.headers["accept-ranges"] == "bytes" and whole.headers["content-length"] == str(size)
+
+    for header, start, end in (
+        ("bytes=8-15", 8, 15),
+        ("bytes=-8", size - 8, size - 1),
+        (f"bytes={size - 3}-", size - 3, size - 1),
+        (f"bytes=2-{size + 100}", 2, size - 1),
+    ):
+        part = client.get(url, headers={"Range": header})
+        assert part.status_code == 206, header
+        assert part.content == result.encode()[start:end + 1]
+        assert part.headers["content-range"] == f"bytes {start}-{end}/{size}"
+        assert part.headers["content-length"] == str(end - start + 1)
+
+    # Unsupported forms fall back to the whole body
+    for header in ("bytes=0-1,4-5", "items=0-1", "bytes=x-y"):
+        assert client.get(url, headers={"Range": header}).status_code == 200
+
+    for header in (f"bytes={size}-", "bytes=-0", "bytes=9-3"):
+        refused = client.get(url, headers={"Range": header})
+        assert refused.status_code == 416 and refused.headers["content-range"] == f"bytes */{size}"
+
+
+def test_range_across_chunks(client, finish):
+    task_id = finish(BIG)
+    start, end = CHUNK_SIZE - 4, 2 * CHUNK_SIZE + 3
+    part = client.get(f"/api/tasks/{task_id}/result", headers={"Range": f"bytes={start}-{end}"})
+    assert part.status_code == 206 and part.content == BIG.encode()[start:end + 1]
+
+
+def test_blob_deleted_with_task(client, finish, settings):
+    def blob_files() -> list:
+        return [path for path in Path(settings.result_blob_dir).rglob("*") if path.is_file()]
+
+    task_id = finish(BIG)
+    status = client.get(f"/api/status/{task_id}").json()
+    assert status["result"] is None and status["result_size"] == len(BIG)
+    assert status["result_url"] == f"/api/tasks/{task_id}/result"
+    assert len(blob_files()) == 1
+
+    assert client.delete(f"/api/tasks/{task_id}").status_code == 200
+    assert blob_files() == []
+    assert client.get(f"/api/tasks/{task_id}/result").status_code == 404
@@ -0,0 +1,61 @@
+"""Retention: opt-in, policies validated at startup, purges per scope."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.models.log import LogDocument, LogLevel
+from app.models.task import TaskDocument, TaskStatus
+from app.services.retention_service import RetentionService
+
+
+def test_disabled_by_default(settings):
+    assert Settings().retention_enabled is False
+
+    async def start():
+        service = RetentionService()
+        service.start(None)
+        return service._worker
+
+    assert asyncio.run(start()) is None
+
+
+@pytest.mark.parametrize("policy", ['{"running": 3}', '{"pending": 3}', '{"complted": 3}'])
+def test_bad_task_policy_fails_at_startup(monkeypatch, policy):
+    monkeypatch.setenv("TASK_RETENTION_DAYS", policy)
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+def test_bad_log_policy_fails_at_startup(monkeypatch):
+    monkeypatch.setenv("LOG_RETENTION_DAYS", '{"dbg": 3}')
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+def test_run_once(settings, open_db, monkeypatch):
+    monkeypatch.setattr(settings, "log_retention_days", {LogLevel.DEBUG: 3})
+    monkeypatch.setattr(settings, "task_retention_days", {TaskStatus.COMPLETED: 30})
+    old = datetime.now(timezone.utc) - timedelta(days=40)
+
+    async def scenario():
+        db = await open_db("memory")
+        await db.logs.insert_many([
+            LogDocument(agent_name="a", level=level, message="m", timestamp=old).to_mongo()
+            for level in (LogLevel.DEBUG, LogLevel.DEBUG, LogLevel.ERROR)
+        ])
+        await db.tasks.insert_many([
+            TaskDocument(agent_name="a", prompt="p", status=status, updated_at=old).to_mongo()
+            for status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.RUNNING)
+        ])
+        service = RetentionService()
+        service._db = db
+        purged = await service.run_once()
+        return purged, service.status()
+
+    purged, status = asyncio.run(scenario())
+    assert purged["logs.debug"] == 2 and purged["tasks.completed"] == 1
+    assert status.log_retention_days == {"debug": 3}
+    assert status.task_retention_days == {"completed": 30}
@@ -0,0 +1,42 @@
+"""Task search reaches the whole of compressed and blob-stored values."""
+import asyncio
+
+from app.models.compression import TERMS_MAX_CHARS, search_terms
+from app.models.task import TaskStatus
+from app.services.search_service import SearchService
+from app.services.task_service import TaskService
+
+# Far past what a 2,000-character excerpt or the result preview would hold
+FILLER = "lorem ipsum dolor sit amet " * 2000
+
+
+def test_search_terms():
+    assert search_terms("Deploy the API, then deploy_v2 the api.") == "deploy the api then deploy_v2"
+    words = " ".join(f"w{i}" for i in range(20000))
+    terms = search_terms(words)
+    assert len(terms) <= TERMS_MAX_CHARS and words.startswith(terms + " ")
+
+
+def test_compressed_and_blob_values_are_searched_in_full(settings, open_db, monkeypatch):
+    monkeypatch.setattr(settings, "task_compression_threshold", 1024)
+    monkeypatch.setattr(settings, "result_blob_threshold", 32 * 1024)
+
+    async def scenario():
+        db = await open_db("memory")
+        service = TaskService(db)
+        compressed = await service.create_task("alpha", FILLER + "needle", 60)
+        blob = await service.create_task("alpha", "short", 60)
+        await service.update_status(blob.task_id, TaskStatus.RUNNING)
+        await service.update_status(blob.task_id, TaskStatus.COMPLETED, result=FILLER * 2 + "haystack")
+        stored = [await db.tasks.find_one({"task_id": t.task_id}) for t in (compressed, blob)]
+        search = SearchService(db)
+        hits = [[hit.id for hit in (await search.search_tasks(word))[0]] for word in ("needle", "haystack", "lorem")]
+        return stored, hits, (compressed.task_id, blob.task_id)
+
+    (prompt_doc, blob_doc), hits, (compressed_id, blob_id) = asyncio.run(scenario())
+    assert prompt_doc["compressed"] and prompt_doc["prompt_terms"].endswith(" needle")
+    assert "prompt_excerpt" not in prompt_doc
+    assert blob_doc["result_ref"] and blob_doc["result_terms"].endswith(" haystack")
+    assert hits[:2] == [[compressed_id], [blob_id]]
+    # Prompt matches outrank result matches
+    assert hits[2] == [compressed_id, blob_id]
@@ -0,0 +1,75 @@
+"""STORAGE_BACKEND=memory-sqlite: what's written survives a restart unchanged."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app import database
+from app.models.task import TaskStatus
+from app.services.log_service import LogService
+from app.services.task_service import TaskService
+from app.storage import open_embedded
+
+
+@pytest.fixture
+def sqlite_settings(settings, monkeypatch):
+    monkeypatch.setattr(settings, "storage_backend", "memory-sqlite")
+    return settings
+
+
+async def snapshot(db) -> dict:
+    return {
+        name: await db[name].find({}).sort("_id", 1).to_list(None)
+        for name in ("tasks", "logs", "task_stats")
+    }
+
+
+def test_reopen_round_trip(sqlite_settings):
+    async def write():
+        await database.connect_to_mongo()
+        db = database.get_database()
+        tasks = TaskService(db)
+        done = await tasks.create_task("alpha", "word " * 2000, 60, model="sonnet")
+        await tasks.update_status(done.task_id, TaskStatus.RUNNING,
+                                  started_at=datetime.now(timezone.utc) - timedelta(seconds=5))
+        await tasks.update_status(done.task_id, TaskStatus.COMPLETED, result="ok")
+        removed = await tasks.create_task("alpha", "gone", 60)
+        await tasks.delete_task(removed.task_id)
+        await tasks.create_task("beta", "pending", 60)
+        await LogService(db, timeseries=False).create_log("alpha", "info", "started", task_id=done.task_id)
+        before = await snapshot(db)
+        await database.close_mongo_connection()
+        return before
+
+    async def reopen():
+        await database.connect_to_mongo()
+        db = database.get_database()
+        after = await snapshot(db)
+        task = await TaskService(db).get_task(after["tasks"][0]["task_id"])
+        await database.close_mongo_connection()
+        return after, task
+
+    before = asyncio.run(write())
+    after, task = asyncio.run(reopen())
+    assert after == before
+    assert [len(docs) for docs in after.values()] == [2, 1, 2]
+    assert task.status == "completed" and task.prompt == "word " * 2000 and task.duration_sec >= 5
+
+
+def test_reopen_checks_unique_indexes(sqlite_settings):
+    """Loaded documents skip the unique checks; creating the index catches duplicates."""
+    async def write():
+        db = await open_embedded("memory-sqlite", sqlite_settings.sqlite_path)
+        await db.tasks.insert_many([{"task_id": "t1"}, {"task_id": "t1"}])
+        db.close()
+
+    async def reopen():
+        try:
+            await database.connect_to_mongo()
+        finally:
+            await database.close_mongo_connection()
+
+    asyncio.run(write())
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(reopen())
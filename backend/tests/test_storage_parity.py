@@ -0,0 +1,241 @@
+"""The services must behave the same on the embedded engine as on MongoDB.
+
+Each scenario runs on a fresh `memory` database and on mongomock (standing
+in for MongoDB) and the results are compared. mongomock can't evaluate
+`$round` or `$text`, so the update-pipeline transition and text search are
+checked against expected values on the embedded engine only.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app import database
+from app.models.log import LogDocument, LogLevel
+from app.models.task import TaskDocument, TaskStatus
+from app.services.log_service import LogService
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
+from app.services.task_service import TaskService
+
+# Set from the clock at write time, so they differ between runs
+VOLATILE_FIELDS = ("_id", "task_id", "created_at", "updated_at", "started_at", "duration_sec")
+
+START = datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def stable(doc: dict) -> dict:
+    return {key: value for key, value in doc.items() if key not in VOLATILE_FIELDS}
+
+
+async def seed_tasks(db, count: int = 7) -> None:
+    """Insert tasks with fixed IDs and times; t2/t3 share created_at."""
+    docs = []
+    for i in range(count):
+        created = START + timedelta(minutes=min(i, 2) if i <= 3 else i)
+        docs.append(TaskDocument(
+            task_id=f"t{i}",
+            agent_name="alpha" if i % 2 else "beta",
+            prompt=f"prompt {i}",
+            status=TaskStatus.COMPLETED if i < 4 else TaskStatus.RUNNING,
+            created_at=created,
+            updated_at=created,
+            metadata={"prompt_preview": f"prompt {i}"},
+        ).to_mongo())
+    await db.tasks.insert_many(docs)
+
+
+async def seed_logs(service: LogService, count: int = 9) -> None:
+    await service.create_logs([
+        LogDocument(
+            log_id=f"l{i}",
+            agent_name="alpha" if i % 3 else "beta",
+            task_id=f"t{i % 2}",
+            level=LogLevel.DEBUG if i % 2 else LogLevel.INFO,
+            message=f"step {i} {'failed to connect' if i % 4 == 0 else 'done'}",
+            timestamp=START + timedelta(seconds=i // 2),
+        )
+        for i in range(count)
+    ])
+
+
+async def all_pages(fetch, **filters) -> list:
+    pages, cursor = [], None
+    while True:
+        rows, cursor = await fetch(limit=3, cursor=cursor, **filters)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+def test_create_task(on_each_backend):
+    async def scenario(db):
+        service = TaskService(db)
+        short = await service.create_task("alpha", "hello", 60, model="sonnet")
+        long = await service.create_task("alpha", "word " * 2000, 60)
+        stored = [await db.tasks.find_one({"task_id": t.task_id}) for t in (short, long)]
+        read = [await service.get_task(t.task_id) for t in (short, long)]
+        assert all(doc["created_at"].tzinfo is None for doc in stored)
+        return [stable(doc) for doc in stored], [stable(task.model_dump()) for task in read]
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    stored, read = results["memory"]
+    assert stored[1]["compressed"] and not stored[0]["compressed"]
+    assert read[1]["prompt"] == "word " * 2000
+
+
+def test_guarded_transitions(on_each_backend):
+    async def scenario(db):
+        service = TaskService(db)
+        task = await service.create_task("alpha", "hello", 60)
+        started = datetime.now(timezone.utc) - timedelta(seconds=90)
+        applied = [
+            await service.update_status(task.task_id, TaskStatus.RUNNING, started_at=started),
+            await service.update_status(task.task_id, TaskStatus.COMPLETED, result="ok", started_at=started),
+            await service.update_status(task.task_id, TaskStatus.CANCELLED, error="late"),
+            await service.update_status(task.task_id, TaskStatus.RUNNING),
+            await service.update_status("missing", TaskStatus.RUNNING),
+        ]
+        doc = await db.tasks.find_one({"task_id": task.task_id})
+        return applied, stable(doc), round(doc["duration_sec"])
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    applied, doc, duration = results["memory"]
+    assert applied == [True, True, False, False, False]
+    assert doc["status"] == "completed" and doc["result"] == "ok" and doc["error"] is None
+    assert duration == 90
+
+
+def test_pipeline_transition(open_db):
+    """Without a caller-side started_at the duration comes from the stored one."""
+    async def scenario():
+        db = await open_db("memory")
+        service = TaskService(db)
+        running = await service.create_task("alpha", "hello", 60)
+        pending = await service.create_task("alpha", "hello", 60)
+        started = datetime.now(timezone.utc) - timedelta(seconds=30)
+        await db.tasks.update_one(
+            {"task_id": running.task_id}, {"$set": {"status": "running", "started_at": started}}
+        )
+        # Values that look like expressions are stored verbatim ($literal)
+        await service.update_status(running.task_id, TaskStatus.FAILED, result="$result", error="$$ROOT")
+        await service.update_status(pending.task_id, TaskStatus.CANCELLED)
+        return [await db.tasks.find_one({"task_id": t.task_id}) for t in (running, pending)]
+
+    failed, cancelled = asyncio.run(scenario())
+    assert failed["status"] == "failed"
+    assert (failed["result"], failed["error"]) == ("$result", "$$ROOT")
+    assert 30 <= failed["duration_sec"] < 31 and failed["duration_sec"] == round(failed["duration_sec"], 2)
+    assert cancelled["status"] == "cancelled" and cancelled["duration_sec"] is None
+
+
+def test_keyset_pagination(on_each_backend):
+    async def scenario(db):
+        tasks = TaskService(db)
+        logs = LogService(db, timeseries=False)
+        await seed_tasks(db)
+        await seed_logs(logs)
+        return [
+            await all_pages(tasks.list_task_summaries),
+            await all_pages(tasks.list_task_summaries, agent_name="alpha"),
+            await all_pages(tasks.list_task_summaries, status=TaskStatus.RUNNING),
+            await all_pages(logs.list_logs_page),
+            await all_pages(logs.list_logs_page, level=LogLevel.DEBUG, task_id="t1"),
+        ]
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    task_pages, _, _, log_pages, _ = results["memory"]
+    assert [[row["task_id"] for row in page] for page in task_pages] == [
+        ["t6", "t5", "t4"], ["t3", "t2", "t1"], ["t0"],
+    ]
+    assert [row["log_id"] for page in log_pages for row in page] == [
+        "l8", "l7", "l6", "l5", "l4", "l3", "l2", "l1", "l0",
+    ]
+
+
+def test_log_search(on_each_backend, monkeypatch):
+    """Time-series layout: case-insensitive match inside the time window."""
+    async def scenario(db):
+        # After open_backend(), which resets it for the embedded engine
+        monkeypatch.setattr(database.db, "logs_timeseries", True)
+        await seed_logs(LogService(db, timeseries=True))
+        search = SearchService(db)
+        hits, more = await search.search_logs("FAILED to", limit=2)
+        window, _ = await search.search_logs("done", agent_name="alpha", since=START + timedelta(seconds=2))
+        return [hit.id for hit in hits], more, [hit.id for hit in window]
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    assert results["memory"] == (["l8", "l4"], True, ["l7", "l5"])
+
+
+def test_text_search(open_db):
+    """Prompt matches outrank result matches; filters apply."""
+    async def scenario():
+        db = await open_db("memory")
+        await seed_tasks(db)
+        await db.tasks.update_one({"task_id": "t5"}, {"$set": {"result": "the deploy prompt"}})
+        await db.tasks.update_one({"task_id": "t1"}, {"$set": {"prompt": "deploy the service"}})
+        search = SearchService(db)
+        hits, more = await search.search_tasks("deploy")
+        alpha, _ = await search.search_tasks("prompt", agent_name="beta", status=TaskStatus.RUNNING)
+        return [hit.id for hit in hits], more, [hit.id for hit in alpha]
+
+    assert asyncio.run(scenario()) == (["t1", "t5"], False, ["t6", "t4"])
+
+
+def test_retention_deletes(on_each_backend):
+    async def scenario(db):
+        tasks = TaskService(db)
+        logs = LogService(db, timeseries=False)
+        await seed_tasks(db)
+        await seed_logs(logs)
+        now = datetime.now(timezone.utc)
+        old = now - timedelta(days=30)
+        await db.tasks.update_many({}, {"$set": {"updated_at": now}})
+        await db.tasks.update_many({"task_id": {"$in": ["t0", "t1", "t4"]}}, {"$set": {"updated_at": old}})
+        await db.logs.update_many({}, {"$set": {"timestamp": now}})
+        await db.logs.update_many({"log_id": {"$in": ["l1", "l2", "l3"]}}, {"$set": {"timestamp": old}})
+
+        deleted = [
+            await tasks.delete_finished_tasks(TaskStatus.COMPLETED, days=7, batch_size=1),
+            await logs.delete_old_logs(days=7, level=LogLevel.DEBUG, batch_size=1),
+        ]
+        with pytest.raises(ValueError):
+            await tasks.delete_finished_tasks(TaskStatus.RUNNING, days=7)
+        remaining = [
+            sorted([doc["task_id"] async for doc in db.tasks.find({}, {"task_id": 1})]),
+            sorted([doc["log_id"] async for doc in db.logs.find({}, {"log_id": 1})]),
+        ]
+        return deleted, remaining
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    assert results["memory"] == (
+        [2, 2],
+        [["t2", "t3", "t4", "t5", "t6"], ["l0", "l2", "l4", "l5", "l6", "l7", "l8"]],
+    )
+
+
+def test_stats_upserts(on_each_backend):
+    async def scenario(db):
+        stats = StatsService(db)
+        for duration in (1.5, 40.0, None, 3.25):
+            await stats.record("alpha", "sonnet", TaskStatus.COMPLETED, duration, finished_at=START)
+        await stats.record("alpha", None, TaskStatus.FAILED, 2.0, finished_at=START)
+        docs = await db.task_stats.find({}, {"_id": 0}).to_list(None)
+        with pytest.raises(DuplicateKeyError):
+            await db.task_stats.insert_one({key: docs[0][key] for key in ("granularity", "agent_name", "model", "bucket")})
+        return sorted(docs, key=lambda doc: (doc["granularity"], doc["model"]))
+
+    results = on_each_backend(scenario)
+    assert results["memory"] == results["mongomock"]
+    sonnet = [doc for doc in results["memory"] if doc["model"] == "sonnet"]
+    assert len(results["memory"]) == 4 and len(sonnet) == 2
+    assert sonnet[0]["total"] == 4 and sonnet[0]["by_status"] == {"completed": 4}
+    assert sonnet[0]["duration_count"] == 3 and sonnet[0]["duration_sum"] == 44.75
+    assert sonnet[0]["duration_max"] == 40.0
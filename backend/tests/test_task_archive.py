@@ -0,0 +1,57 @@
+"""Cold archive: tasks move out of the database and stay readable and deletable."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.models.task import TaskDocument, TaskStatus
+from app.services import task_archive
+from app.services.task_archive import TaskArchive
+from app.services.task_service import TaskService
+
+
+def test_archive_fetch_and_delete(open_db):
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+
+    async def scenario():
+        db = await open_db("memory")
+        service = TaskService(db)
+        await db.tasks.insert_many([
+            TaskDocument(task_id=f"t{i}", agent_name="a", prompt=f"p{i}", result=f"r{i}",
+                         status=TaskStatus.COMPLETED, created_at=old, updated_at=old).to_mongo()
+            for i in range(3)
+        ] + [TaskDocument(task_id="live", agent_name="a", prompt="p", status=TaskStatus.RUNNING,
+                          updated_at=old).to_mongo()])
+
+        archived = await service.archive_finished_tasks(days=30, batch_size=2)
+        in_db = sorted([doc["task_id"] async for doc in db.tasks.find({}, {"task_id": 1})])
+        fetched = await service.get_task("t1")
+        version = await service.get_task_version("t1")
+        deleted = [await service.delete_task("t1"), await service.delete_task("t1")]
+        after = [await service.get_task(f"t{i}") for i in range(3)]
+        return archived, in_db, fetched, version, deleted, after
+
+    archived, in_db, fetched, version, deleted, after = asyncio.run(scenario())
+    assert archived == 3 and in_db == ["live"]
+    assert fetched.result == "r1" and fetched.status == "completed"
+    assert version == fetched.updated_at
+    assert deleted == [True, False]
+    # Line numbers of the tasks after the deleted one were shifted
+    assert after[0].prompt == "p0" and after[1] is None and after[2].prompt == "p2"
+
+
+def test_missing_archive_is_not_looked_for_on_every_miss(settings, tmp_path, monkeypatch):
+    archive = TaskArchive(str(tmp_path / "nowhere"))
+    checks = []
+    exists = Path.exists
+    monkeypatch.setattr(Path, "exists", lambda path: checks.append(path) or exists(path))
+
+    async def misses():
+        return [await archive.get_task("t1") for _ in range(50)]
+
+    assert asyncio.run(misses()) == [None] * 50
+    assert len(checks) == 1
+
+    # Rechecked once the window has passed
+    monkeypatch.setitem(task_archive._absent_until, archive.index_path, 0.0)
+    asyncio.run(archive.get_task("t1"))
+    assert len(checks) == 2
@@ -0,0 +1,74 @@
+"""Status cache: write-through, and invalidation on every path that changes a task."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.task import TaskStatus
+from app.services.task_cache import task_cache
+from app.services.task_service import TaskService
+
+
+@pytest.fixture
+def cache():
+    task_cache.start(100, 60.0)
+    yield task_cache
+    asyncio.run(task_cache.stop())
+
+
+def test_purge_invalidates_only_deleted_tasks(cache, open_db):
+    async def scenario():
+        db = await open_db("memory")
+        service = TaskService(db)
+        purged = await service.create_task("a", "p", 60)
+        kept = await service.create_task("a", "p", 60)
+        for task in (purged, kept):
+            await service.update_status(task.task_id, TaskStatus.RUNNING)
+            await service.update_status(task.task_id, TaskStatus.COMPLETED, result="r")
+        old = datetime.now(timezone.utc) - timedelta(days=40)
+        await db.tasks.update_one({"task_id": purged.task_id}, {"$set": {"updated_at": old}})
+        deleted = await service.delete_finished_tasks(TaskStatus.COMPLETED, days=30, batch_size=1)
+        return deleted, purged.task_id, kept.task_id
+
+    deleted, purged_id, kept_id = asyncio.run(scenario())
+    assert deleted == 1
+    assert cache.get(purged_id) is None
+    assert cache.get(kept_id).status == "completed"
+
+
+def test_change_stream_skips_own_writes(cache, open_db):
+    async def scenario():
+        db = await open_db("memory")
+        service = TaskService(db)
+        task = await service.create_task("a", "p", 60)
+        await service.update_status(task.task_id, TaskStatus.RUNNING)
+        return task.task_id, await db.tasks.find_one({"task_id": task.task_id})
+
+    task_id, doc = asyncio.run(scenario())
+
+    def update(_id, updated_at):
+        return {
+            "operationType": "update",
+            "documentKey": {"_id": _id},
+            "updateDescription": {"updatedFields": {"status": "running", "updated_at": updated_at}},
+        }
+
+    # The event of the write-through update itself
+    cache.on_change(update(doc["_id"], doc["updated_at"]))
+    assert cache.get(task_id).status == "running"
+
+    # Another worker's write
+    cache.on_change(update(doc["_id"], doc["updated_at"] + timedelta(milliseconds=5)))
+    assert cache.get(task_id) is None
+
+
+def test_change_stream_delete_evicts(cache, open_db):
+    async def scenario():
+        db = await open_db("memory")
+        task = await TaskService(db).create_task("a", "p", 60)
+        return task.task_id, await db.tasks.find_one({"task_id": task.task_id})
+
+    task_id, doc = asyncio.run(scenario())
+    assert cache.get(task_id) is not None
+    cache.on_change({"operationType": "delete", "documentKey": {"_id": doc["_id"]}})
+    assert cache.get(task_id) is None
@@ -0,0 +1,63 @@
+"""/stop: cancels a task still waiting for a slot, kills a running one."""
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from app.routes.tasks import stop_running_task
+from app.services import claude_executor
+from app.services.task_service import TaskService
+
+FAKE_CLAUDE = str(Path(__file__).resolve().parent.parent / "loadtest" / "fake_claude.py")
+
+
+@pytest.fixture
+def one_slot(settings, tmp_path, monkeypatch):
+    """One execution slot; the fake CLI runs long enough to stop it."""
+    monkeypatch.setattr(settings, "claude_cli", FAKE_CLAUDE)
+    monkeypatch.setattr(settings, "max_concurrent_tasks", 1)
+    monkeypatch.setattr(settings, "agents_dir", str(tmp_path / "agents"))
+    monkeypatch.setattr(settings, "logs_dir", str(tmp_path / "logs"))
+    monkeypatch.setattr(claude_executor, "_slots", None)
+    monkeypatch.setenv("FAKE_CLAUDE_LATENCY_MS", "10000")
+    (tmp_path / "agents" / "alpha").mkdir(parents=True)
+    return settings
+
+
+async def wait_for(condition) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_stop_queued_and_running(one_slot, open_db):
+    async def scenario():
+        service = TaskService(await open_db("memory"))
+        running, queued = [await service.create_task("alpha", "hi", 60) for _ in range(2)]
+        runs = [
+            asyncio.create_task(claude_executor.run_claude_command(service, task.task_id, "alpha", "hi", 60))
+            for task in (running, queued)
+        ]
+        await wait_for(lambda: running.task_id in claude_executor.running_processes
+                       and claude_executor.waiting_tasks() == 1)
+
+        replies = [
+            await stop_running_task(queued.task_id, service),
+            await stop_running_task(running.task_id, service),
+        ]
+        await asyncio.wait_for(asyncio.gather(*runs), timeout=10)
+        with pytest.raises(HTTPException) as rejected:
+            await stop_running_task(queued.task_id, service)
+        tasks = [await service.get_task(task.task_id) for task in (running, queued)]
+        return replies, rejected.value.status_code, tasks
+
+    replies, rejected, (running, queued) = asyncio.run(scenario())
+    assert [reply["message"] for reply in replies] == ["Task cancelled", "Task stopped"]
+    assert rejected == 400
+    assert running.status == "cancelled" and running.started_at is not None
+    # Skipped when it got the slot: never started
+    assert queued.status == "cancelled" and queued.started_at is None
+    assert queued.error == "Task was cancelled by user"
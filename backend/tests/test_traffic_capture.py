@@ -0,0 +1,105 @@
+"""Traffic capture keeps no user content; replay maps captured task IDs."""
+import asyncio
+import json
+import uuid
+
+import httpx
+import pytest
+
+from app.services.traffic_capture import TrafficCapture, redact, traffic_capture
+from loadtest.replay import Lane, replay_one
+
+SECRET = "do the secret thing"
+
+
+@pytest.fixture
+def captured(client, tmp_path):
+    """`client`, with its requests captured to tmp_path/capture.jsonl."""
+    path = tmp_path / "capture.jsonl"
+    traffic_capture.start(str(path), max_body=4096)
+    try:
+        yield client
+    finally:
+        traffic_capture.stop()
+
+
+def read_records(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_capture_is_redacted(captured, tmp_path, settings):
+    submitted = captured.post("/api/run", json={
+        "agent_name": "missing", "prompt": SECRET, "options": {"system_prompt": SECRET, "model": "sonnet"},
+    }).json()
+    captured.get(f"/api/status/{submitted['task_id']}")
+    captured.get("/api/search", params={"q": SECRET, "limit": 5})
+    captured.get("/health")
+    traffic_capture.stop()
+
+    text = (tmp_path / "capture.jsonl").read_text()
+    assert "secret" not in text and settings.claude_api_key not in text
+    run, status, search = records = read_records(tmp_path / "capture.jsonl")
+    assert [record["path"] for record in records] == [
+        "/api/run", f"/api/status/{submitted['task_id']}", "/api/search",
+    ]
+    assert all("x-api-key" not in record["headers"] for record in records)
+
+    body = json.loads(run["body"])
+    assert body["prompt"] == body["options"]["system_prompt"] == redact(SECRET)
+    assert body["agent_name"] == "missing" and body["options"]["model"] == "sonnet"
+    # Of the responses only the created task_id is kept, for the replayer
+    assert json.loads(run["response_body"]) == {"task_id": submitted["task_id"]}
+    assert "response_body" not in status and status["status"] == 200
+    assert search["query"] == f"q={redact(SECRET)}&limit=5"
+
+
+def test_sanitize():
+    capture = TrafficCapture()
+    assert capture.sanitize({"body": "not json"}) == {"body": "", "body_dropped": True}
+    assert capture.sanitize({"body": '{"prompt": "cut', "body_truncated": True})["body_dropped"]
+    nested = capture.sanitize({"body": json.dumps({"items": [{"prompt": SECRET}], "n": 1})})
+    assert json.loads(nested["body"]) == {"items": [{"prompt": redact(SECRET)}], "n": 1}
+    assert redact(SECRET) == redact(SECRET) != redact(SECRET + "!")
+    assert capture.sanitize({"response_body": '{"detail": "x"}'}) == {}
+
+    capture.keep_prompts = True
+    kept = {"query": f"q={SECRET}", "body": json.dumps({"prompt": SECRET})}
+    assert capture.sanitize(kept) == kept
+
+
+def test_replay_maps_task_ids():
+    """Each lane polls the tasks it created, not the captured ones."""
+    captured_id = str(uuid.uuid4())
+    records = [
+        {"method": "POST", "path": "/api/run", "body": '{"agent_name": "a", "prompt": "p"}',
+         "response_body": json.dumps({"task_id": captured_id}), "status": 200},
+        {"method": "GET", "path": f"/api/status/{captured_id}", "query": f"task={captured_id}", "status": 200},
+        {"method": "POST", "path": "/api/run", "body": '{"prompt": "cut', "body_truncated": True},
+    ]
+    seen = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        if request.url.path == "/api/run":
+            return httpx.Response(200, json={"task_id": str(uuid.uuid4())})
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        lanes = [Lane(0), Lane(1)]
+        results = []
+        async with httpx.AsyncClient(base_url="http://replay", transport=httpx.MockTransport(handle)) as client:
+            for lane in lanes:
+                for record in records:
+                    await replay_one(client, lane, record, results)
+        return lanes, results
+
+    lanes, results = asyncio.run(scenario())
+    created = [lane.ids[captured_id] for lane in lanes]
+    assert len(set(created)) == 2 and captured_id not in created
+    assert seen == [
+        url
+        for new_id in created
+        for url in ("http://replay/api/run", f"http://replay/api/status/{new_id}?task={new_id}")
+    ]
+    assert [result["route"] for result in results[:2]] == ["POST /api/run", "GET /api/status/{id}"]
+    assert results[2]["status"] == "skipped_truncated"
@@ -13,3 +13,31 @@ db.tasks.createIndex({ "agent_name": 1 });
 db.tasks.createIndex({ "status": 1 });
 db.tasks.createIndex({ "created_at": -1 });
 db.tasks.createIndex({ "agent_name": 1, "created_at": -1 });
+
+// Keyset pagination: (filter, sort key, id tie-breaker)
+db.tasks.createIndex({ "created_at": -1, "task_id": -1 });
+db.tasks.createIndex({ "agent_name": 1, "created_at": -1, "task_id": -1 });
+db.tasks.createIndex({ "status": 1, "created_at": -1, "task_id": -1 });
+
+// Stats rollups: one document per (granularity, agent, model, bucket)
+db.createCollection('task_stats');
+db.task_stats.createIndex({ "granularity": 1, "agent_name": 1, "model": 1, "bucket": 1 }, { unique: true });
+db.task_stats.createIndex({ "granularity": 1, "bucket": 1 });
+
+// Retention purges: (status, age)
+db.tasks.createIndex({ "status": 1, "updated_at": 1 });
+
+// Full-text search, prompt matches rank above result matches.
+// Compressed fields are searched through their plain excerpts,
+// blob results through their preview.
+db.tasks.createIndex(
+  {
+    "prompt": "text", "prompt_excerpt": "text",
+    "result": "text", "result_excerpt": "text", "result_preview": "text"
+  },
+  {
+    weights: { "prompt": 5, "prompt_excerpt": 5, "result": 1, "result_excerpt": 1, "result_preview": 1 },
+    default_language: "none",
+    name: "tasks_text"
+  }
+);
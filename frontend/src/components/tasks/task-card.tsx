@@ -6,8 +6,8 @@ import { Button } from '@/components/ui/button';
 import { TaskStatusBadge } from './task-status-badge';
 import { TaskListItem, Task } from '@/types/task';
 import { api } from '@/lib/api';
-import { formatDate, truncate, formatDuration } from '@/lib/utils';
-import { Trash2, ChevronDown, ChevronUp, Eye, Square } from 'lucide-react';
+import { formatDate, truncate, formatDuration, formatBytes } from '@/lib/utils';
+import { Trash2, ChevronDown, ChevronUp, Eye, Square, Download } from 'lucide-react';
 import { JsonViewer } from '@/components/ui/json-viewer';
 
 interface TaskCardProps {
@@ -95,6 +95,20 @@ export function TaskCard({ task, onDelete }: TaskCardProps) {
     }
   };
 
+  const handleDownloadResult = async () => {
+    try {
+      const text = await api.getTaskResult(task.task_id);
+      const url = URL.createObjectURL(new Blob([text], { type: 'text/plain' }));
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `${task.task_id}.txt`;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Failed to download result:', error);
+    }
+  };
+
   return (
     <Card className="mb-3">
       <CardHeader className="py-3 px-4">
@@ -191,6 +205,23 @@ export function TaskCard({ task, onDelete }: TaskCardProps) {
                 </div>
               )}
 
+              {details.result_url && (
+                <div>
+                  <div className="flex items-center gap-2">
+                    <span className="font-medium text-green-600 dark:text-green-400">
+                      Результат ({formatBytes(details.result_size)}, превью):
+                    </span>
+                    <Button variant="ghost" size="sm" onClick={handleDownloadResult}>
+                      <Download className="h-4 w-4 mr-1" />
+                      Скачать
+                    </Button>
+                  </div>
+                  <pre className="mt-1 p-2 bg-green-50 dark:bg-green-950 border border-green-200 dark:border-green-800 rounded text-xs whitespace-pre-wrap max-h-96 overflow-auto">
+                    {details.result_preview}
+                  </pre>
+                </div>
+              )}
+
               {details.error && (
                 <div>
                   <span className="font-medium text-destructive">Ошибка:</span>
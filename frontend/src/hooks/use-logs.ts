@@ -4,28 +4,56 @@ import { useState, useEffect, useCallback } from 'react';
 import { api } from '@/lib/api';
 import { Log } from '@/types/task';
 
-export function useLogs(agentFilter?: string, pollInterval = 2000) {
+const MAX_LOGS = 50;
+
+export function useLogs(agentFilter?: string, reconnectDelay = 2000) {
   const [logs, setLogs] = useState<Log[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [generation, setGeneration] = useState(0);
 
-  const fetchLogs = useCallback(async () => {
-    try {
-      const response = await api.listLogs(agentFilter, 50);
-      setLogs(response.logs);
-      setError(null);
-    } catch (err) {
-      setError(err instanceof Error ? err.message : 'Failed to fetch logs');
-    } finally {
-      setLoading(false);
-    }
-  }, [agentFilter]);
+  const refetch = useCallback(() => setGeneration((g) => g + 1), []);
 
   useEffect(() => {
-    fetchLogs();
-    const interval = setInterval(fetchLogs, pollInterval);
-    return () => clearInterval(interval);
-  }, [fetchLogs, pollInterval]);
+    const controller = new AbortController();
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const connect = async () => {
+      setLogs([]);
+      try {
+        await api.streamLogs(
+          (log) => {
+            setLogs((prev) => [log, ...prev].slice(0, MAX_LOGS));
+            setLoading(false);
+            setError(null);
+          },
+          controller.signal,
+          agentFilter,
+          MAX_LOGS,
+          () => {
+            // Поток открыт и бэкфилл пришёл — даже если логов нет, спиннер не нужен
+            setLoading(false);
+            setError(null);
+          },
+        );
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        setError(err instanceof Error ? err.message : 'Failed to stream logs');
+      } finally {
+        setLoading(false);
+      }
+      // Сервер закрыл поток или упал — переподключаемся
+      if (!controller.signal.aborted) {
+        reconnectTimer = setTimeout(connect, reconnectDelay);
+      }
+    };
+
+    connect();
+    return () => {
+      controller.abort();
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+    };
+  }, [agentFilter, reconnectDelay, generation]);
 
-  return { logs, loading, error, refetch: fetchLogs };
+  return { logs, loading, error, refetch };
 }
@@ -1,4 +1,4 @@
-import { Task, TaskListResponse, AgentsResponse, LogListResponse, ClaudeOptions } from '@/types/task';
+import { Task, TaskListResponse, AgentsResponse, Log, LogListResponse, ClaudeOptions } from '@/types/task';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 const API_KEY = process.env.NEXT_PUBLIC_API_KEY || '';
@@ -58,6 +58,17 @@ export const api = {
   getTaskStatus: (taskId: string) =>
     apiRequest<Task>(`/status/${taskId}`),
 
+  // Полный результат задачи текстом (для больших результатов)
+  getTaskResult: async (taskId: string): Promise<string> => {
+    const response = await fetch(`${API_BASE}/tasks/${taskId}/result`, {
+      headers: { 'X-API-Key': API_KEY },
+    });
+    if (!response.ok) {
+      throw new Error(`API error: ${response.status}`);
+    }
+    return response.text();
+  },
+
   listTasks: (agentName?: string) =>
     apiRequest<TaskListResponse>(`/tasks${agentName ? `?agent_name=${agentName}` : ''}`),
 
@@ -78,4 +89,52 @@ export const api = {
     params.append('limit', limit.toString());
     return apiRequest<LogListResponse>(`/logs?${params.toString()}`);
   },
+
+  // SSE поток логов: сначала последние `backfill` записей, потом новые по мере записи
+  streamLogs: async (
+    onLog: (log: Log) => void,
+    signal: AbortSignal,
+    agentName?: string,
+    backfill: number = 50,
+    onReady?: () => void,
+  ) => {
+    const params = new URLSearchParams();
+    if (agentName) params.append('agent_name', agentName);
+    params.append('backfill', backfill.toString());
+
+    // EventSource не умеет в заголовки, поэтому читаем поток через fetch
+    const response = await fetch(`${API_BASE}/logs/stream?${params.toString()}`, {
+      headers: { 'X-API-Key': API_KEY, Accept: 'text/event-stream' },
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`API error: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let data = '';
+        for (const line of frame.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        if (event === 'log' && data) onLog(JSON.parse(data));
+        // Бэкфилл отдан (может быть пустым), дальше только новые логи
+        else if (event === 'ready') onReady?.();
+      }
+    }
+  },
 };
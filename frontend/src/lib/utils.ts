@@ -22,3 +22,10 @@ export function formatDuration(seconds: number | undefined | null): string {
   const secs = (seconds % 60).toFixed(0);
   return `${mins}м ${secs}с`;
 }
+
+export function formatBytes(bytes: number | undefined | null): string {
+  if (bytes === undefined || bytes === null) return '';
+  if (bytes < 1024) return `${bytes} Б`;
+  if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(1)} КБ`;
+  return `${(bytes / 1024 / 1024).toFixed(1)} МБ`;
+}
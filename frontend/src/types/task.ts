@@ -69,11 +69,17 @@ export interface Task {
   status: TaskStatusType;
   prompt?: string;
   result?: string;
+  // Большой результат лежит отдельно: тут превью, целиком — через result_url
+  result_preview?: string;
+  result_size?: number;
+  result_url?: string;
   error?: string;
   created_at: string;
   started_at?: string;
   updated_at: string;
   duration_sec?: number;
+  // Этап -> мс от created_at (accepted, queued, dequeued, spawned, first_output, ...)
+  timings?: Record<string, number>;
   prompt_preview?: string;
 }
 
@@ -82,6 +88,7 @@ export interface TaskListItem {
   agent_name: string;
   status: TaskStatusType;
   created_at: string;
+  updated_at?: string;
   duration_sec?: number;
   prompt_preview?: string;
 }
@@ -89,6 +96,7 @@ export interface TaskListItem {
 export interface TaskListResponse {
   count: number;
   tasks: TaskListItem[];
+  next_cursor?: string | null;
 }
 
 export interface Agent {
@@ -115,4 +123,5 @@ export interface Log {
 export interface LogListResponse {
   count: number;
   logs: Log[];
+  next_cursor?: string | null;
 }